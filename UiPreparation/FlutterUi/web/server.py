@@ -1,20 +1,281 @@
+"""
+Static server for the Flutter web build (run from the build/web directory)
+
+Threaded HTTP/1.1 with keep-alive, so the browser fetches the bundle over
+parallel connections. Compressible assets are precompressed once to .gz (and
+.br when the brotli package is installed) next to the originals and served by
+Accept-Encoding. Responses carry strong content-hash ETags and honour
+If-None-Match / If-Modified-Since and single byte ranges. Files with a content
+hash in their name are cached as immutable; everything else is revalidated on
+each load (a cheap 304). Paths without a file extension fall back to
+index.html for Flutter's path URL strategy.
+
+Usage:
+    server.exe                       # serve the current directory on localhost:8000
+    python server.py --port 8080 --directory ../build/web --no-browser
+"""
+
+import argparse
+import email.utils
+import gzip
+import hashlib
 import http.server
-import socketserver
-import _thread
+import mimetypes
+import os
+import re
+import threading
 import webbrowser
+from urllib.parse import unquote, urlsplit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 #? pip install -r requirements.txt --no-index --find-links
 #? pyinstaller  --icon=app.ico --onefile server.py
 
-def start_server():
-    handler = http.server.SimpleHTTPRequestHandler
-    port = 8000
-    httpd = socketserver.TCPServer(("localhost", port), handler)
-    print(f"Serving on port {port}")
-    httpd.serve_forever()
-
-_thread.start_new_thread(start_server,())
-url = 'http://localhost:8000'
-webbrowser.open_new(url)
-while True:
-    pass
\ No newline at end of file
+DEFAULT_PORT = 8000
+INDEX = 'index.html'
+
+COMPRESSIBLE_EXTENSIONS = {'.html', '.js', '.mjs', '.css', '.json', '.wasm', '.svg', '.txt', '.map', '.otf',
+                           '.ttf', '.frag', '.symbols'}
+MIN_COMPRESS_SIZE = 1024
+# (Content-Encoding, file suffix), preferred first
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')] if brotli else [('gzip', '.gz')]
+
+# main.dart.3f2a9c1b.js, chunk-5d41402abc4b2a76.js, ...: content can never change under that name
+HASHED_NAME = re.compile(r'[.-][0-9a-f]{8,}\.[A-Za-z0-9]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+mimetypes.add_type('application/wasm', '.wasm')
+mimetypes.add_type('text/javascript', '.js')
+mimetypes.add_type('text/javascript', '.mjs')
+mimetypes.add_type('application/json', '.json')
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def precompress(root):
+    """Write .gz/.br siblings for compressible files that lack an up-to-date one"""
+    written = 0
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            stat = os.stat(path)
+            if stat.st_size < MIN_COMPRESS_SIZE:
+                continue
+            data = None
+            for encoding, suffix in ENCODINGS:
+                target = path + suffix
+                if os.path.exists(target) and os.stat(target).st_mtime >= stat.st_mtime:
+                    continue
+                if data is None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                packed = brotli.compress(data) if encoding == 'br' else gzip.compress(data, 9, mtime=0)
+                if len(packed) >= len(data):
+                    continue
+                with open(target + '.tmp', 'wb') as f:
+                    f.write(packed)
+                os.replace(target + '.tmp', target)
+                written += 1
+    return written
+
+
+class FileInfo:
+    """Stat and content hash of one file, cached until it changes on disk"""
+    __slots__ = ('size', 'mtime', 'etag')
+
+    _cache = {}
+    _lock = threading.Lock()
+
+    def __init__(self, size, mtime, etag):
+        self.size = size
+        self.mtime = mtime
+        self.etag = etag
+
+    @classmethod
+    def of(cls, path):
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        info = cls._cache.get(key)
+        if info is None:
+            digest = hashlib.blake2b(digest_size=16)
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            info = cls(stat.st_size, stat.st_mtime, f'"{digest.hexdigest()}"')
+            with cls._lock:
+                cls._cache[key] = info
+        return info
+
+
+class FlutterWebHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def resolve(self):
+        """File to serve for the request path, with the SPA fallback; None when missing"""
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, INDEX)
+        if os.path.isfile(path):
+            return path
+        if not os.path.splitext(unquote(urlsplit(self.path).path))[1]:
+            index = os.path.join(self.directory, INDEX)
+            if os.path.isfile(index):
+                return index
+        return None
+
+    def select_encoding(self, path):
+        accepted = {token.split(';', 1)[0].strip()
+                    for token in self.headers.get('Accept-Encoding', '').split(',')}
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted and os.path.isfile(path + suffix):
+                return encoding, path + suffix
+        return None, path
+
+    def not_modified(self, info):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return '*' in tags or info.etag in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(info.mtime) <= since
+        return False
+
+    def byte_range(self, info):
+        """(start, end) of a satisfiable single range, None for the full body, or 'invalid' for a 416"""
+        header = self.headers.get('Range')
+        if not header:
+            return None
+        if_range = self.headers.get('If-Range')
+        if if_range and if_range.strip() != info.etag:
+            return None
+        match = RANGE.match(header.strip())
+        if not match or match.groups() == ('', ''):
+            return None  # multiple or malformed ranges: serve the whole file
+        first, last = match.groups()
+        if first:
+            start, end = int(first), min(int(last), info.size - 1) if last else info.size - 1
+        else:
+            start, end = max(0, info.size - int(last)), info.size - 1
+        if start > end or start >= info.size:
+            return 'invalid'
+        return start, end
+
+    def send_head(self):
+        source = self.resolve()
+        if source is None:
+            self.send_error(404, 'File not found')
+            return None
+
+        encoding, path = self.select_encoding(source)
+        info = FileInfo.of(path)
+        name = os.path.basename(source)
+        cache_control = IMMUTABLE if HASHED_NAME.search(name) else REVALIDATE
+
+        def common_headers():
+            self.send_header('ETag', info.etag)
+            self.send_header('Last-Modified', self.date_time_string(info.mtime))
+            self.send_header('Cache-Control', cache_control)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('Accept-Ranges', 'bytes')
+
+        if self.not_modified(info):
+            self.send_response(304)
+            common_headers()
+            self.end_headers()
+            return None
+
+        span = self.byte_range(info)
+        if span == 'invalid':
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{info.size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return None
+
+        start, end = span or (0, info.size - 1)
+        self.send_response(206 if span else 200)
+        self.send_header('Content-Type', self.guess_type(source))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if span:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{info.size}')
+        self.send_header('Content-Length', str(end - start + 1))
+        common_headers()
+        self.end_headers()
+        return open(path, 'rb'), start, end - start + 1
+
+    def do_GET(self):
+        head = self.send_head()
+        if head:
+            f, offset, count = head
+            with f:
+                if count:
+                    self.connection.sendfile(f, offset, count)  # zero-copy where the OS supports it
+
+    def do_HEAD(self):
+        head = self.send_head()
+        if head:
+            head[0].close()
+
+
+class FlutterWebServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    verbose = False
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Serve the Flutter web build')
+    parser.add_argument('--host', default='localhost', help='Bind address')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('--directory', default=os.getcwd(), help='Build directory (default: current directory)')
+    parser.add_argument('--no-precompress', action='store_true', help='Do not write .gz/.br siblings at startup')
+    parser.add_argument('--no-browser', action='store_true', help='Do not open a browser tab')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    directory = os.path.abspath(args.directory)
+
+    if not args.no_precompress:
+        written = precompress(directory)
+        if written:
+            print(f"Precompressed {written} files ({', '.join(encoding for encoding, _ in ENCODINGS)})")
+
+    handler = lambda *handler_args: FlutterWebHandler(*handler_args, directory=directory)
+    httpd = FlutterWebServer((args.host, args.port), handler)
+    httpd.verbose = args.verbose
+
+    url = f'http://{args.host}:{args.port}'
+    print(f"Serving {directory} on {url}")
+    if not args.no_browser:
+        threading.Timer(0.5, webbrowser.open_new, (url,)).start()
+
+    # serve_forever blocks in select(); the main thread sleeps until a request or Ctrl+C
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
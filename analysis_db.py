@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Shared Postgres verification layer for the plant analysis test scripts
+
+Keeps a small connection pool, prepares the lookups once per connection as
+server-side prepared statements and fetches the state of any number of
+AnalysisIds in one round trip (WHERE "AnalysisId" = ANY($1)). Rows come back
+as AnalysisState / AnalysisDetails records with named fields, keyed by
+AnalysisId. Sponsorship codes are checked the same way, keyed by Code.
+
+Usage:
+    with AnalysisDb() as db:
+        states = db.poll_until_completed(analysis_ids, timeout=60)
+        details = db.get_details(analysis_id)
+"""
+
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import psycopg2
+import psycopg2.pool
+
+# Database connection
+DB_CONFIG = {
+    "host": "localhost",
+    "database": "devarchitecture",
+    "user": "postgres",
+    "password": "Admin01!"
+}
+
+FINAL_STATUSES = ("Completed", "Failed", "QueueFailed")
+
+
+@dataclass
+class AnalysisState:
+    """Progress columns of one PlantAnalyses row"""
+    __slots__ = ("analysis_id", "status", "created_date", "processing_timestamp", "updated_date")
+
+    analysis_id: str
+    status: Optional[str]
+    created_date: Optional[datetime]
+    processing_timestamp: Optional[datetime]
+    updated_date: Optional[datetime]
+
+    @property
+    def is_final(self) -> bool:
+        return self.status in FINAL_STATUSES
+
+
+@dataclass
+class AnalysisDetails:
+    """Request fields, image and AI result columns the flow tests verify"""
+    __slots__ = ("id", "analysis_id", "user_id", "farmer_id", "sponsor_id", "location", "crop_type",
+                 "field_id", "urgency_level", "notes", "latitude", "longitude", "altitude", "temperature",
+                 "humidity", "weather_conditions", "soil_type", "planting_date", "contact_phone",
+                 "contact_email", "status", "image_path", "image_size_kb", "created_date",
+                 "plant_species", "plant_variety", "growth_stage", "overall_health_score",
+                 "primary_concern", "has_analysis_result")
+
+    id: int
+    analysis_id: str
+    user_id: Optional[int]
+    farmer_id: Optional[str]
+    sponsor_id: Optional[str]
+    location: Optional[str]
+    crop_type: Optional[str]
+    field_id: Optional[str]
+    urgency_level: Optional[str]
+    notes: Optional[str]
+    latitude: Optional[Decimal]
+    longitude: Optional[Decimal]
+    altitude: Optional[int]
+    temperature: Optional[Decimal]
+    humidity: Optional[Decimal]
+    weather_conditions: Optional[str]
+    soil_type: Optional[str]
+    planting_date: Optional[datetime]
+    contact_phone: Optional[str]
+    contact_email: Optional[str]
+    status: Optional[str]
+    image_path: Optional[str]
+    image_size_kb: Optional[Decimal]
+    created_date: Optional[datetime]
+    plant_species: Optional[str]
+    plant_variety: Optional[str]
+    growth_stage: Optional[str]
+    overall_health_score: Optional[int]
+    primary_concern: Optional[str]
+    has_analysis_result: bool
+
+    def missing(self, fields: Iterable[str]) -> List[str]:
+        """Names of the given fields that are NULL"""
+        return [name for name in fields if getattr(self, name) is None]
+
+
+@dataclass
+class StoredImage:
+    """Image columns of one PlantAnalyses row"""
+    __slots__ = ("id", "analysis_id", "image_path", "image_size_kb", "created_date")
+
+    id: int
+    analysis_id: str
+    image_path: str
+    image_size_kb: Optional[Decimal]
+    created_date: Optional[datetime]
+
+
+@dataclass
+class CodeRedemption:
+    """Redemption columns of one SponsorshipCodes row and the subscriptions created from it"""
+    __slots__ = ("code", "code_id", "is_used", "used_by_user_id", "used_date", "subscriptions",
+                 "subscribed_users")
+
+    code: str
+    code_id: int
+    is_used: bool
+    used_by_user_id: Optional[int]
+    used_date: Optional[datetime]
+    subscriptions: int
+    subscribed_users: int
+
+    @property
+    def redeemed_more_than_once(self) -> bool:
+        return self.subscriptions > 1
+
+
+# name -> (record type, SQL); column order matches the record's fields
+PREPARED_STATEMENTS = {
+    "analysis_state": (AnalysisState, """
+        SELECT "AnalysisId", "AnalysisStatus", "CreatedDate", "ProcessingTimestamp", "UpdatedDate"
+        FROM "PlantAnalyses"
+        WHERE "AnalysisId" = ANY($1::text[])
+    """),
+    "analysis_details": (AnalysisDetails, """
+        SELECT
+            "Id", "AnalysisId", "UserId", "FarmerId", "SponsorId",
+            "Location", "CropType", "FieldId", "UrgencyLevel", "Notes",
+            "Latitude", "Longitude", "Altitude", "Temperature", "Humidity",
+            "WeatherConditions", "SoilType", "PlantingDate", "ContactPhone",
+            "ContactEmail", "AnalysisStatus", "ImagePath", "ImageSizeKb", "CreatedDate",
+            "PlantSpecies", "PlantVariety", "GrowthStage", "OverallHealthScore",
+            "PrimaryConcern", "AnalysisResult" IS NOT NULL
+        FROM "PlantAnalyses"
+        WHERE "AnalysisId" = ANY($1::text[])
+    """),
+    "recent_images": (StoredImage, """
+        SELECT "Id", "AnalysisId", "ImagePath", "ImageSizeKb", "CreatedDate"
+        FROM "PlantAnalyses"
+        WHERE "ImagePath" IS NOT NULL AND "ImagePath" <> ''
+        ORDER BY "CreatedDate" DESC
+        LIMIT $1::int
+    """),
+    "code_redemptions": (CodeRedemption, """
+        SELECT c."Code", c."Id", c."IsUsed", c."UsedByUserId", c."UsedDate",
+               COUNT(s."Id"), COUNT(DISTINCT s."UserId")
+        FROM "SponsorshipCodes" c
+        LEFT JOIN "UserSubscriptions" s ON s."SponsorshipCodeId" = c."Id"
+        WHERE c."Code" = ANY($1::text[])
+        GROUP BY c."Id", c."Code", c."IsUsed", c."UsedByUserId", c."UsedDate"
+    """),
+}
+
+# Keeps each ANY($1) array, and the result set, bounded for very large runs
+BATCH_SIZE = 5000
+
+
+class AnalysisDb:
+    """Pooled, batched access to "PlantAnalyses" (and "SponsorshipCodes") for verification and polling"""
+
+    def __init__(self, db_config: Optional[Dict] = None, max_connections: int = 4):
+        # minconn = maxconn: the pool closes connections returned while it holds minconn idle ones,
+        # which would throw away their prepared statements
+        self.pool = psycopg2.pool.ThreadedConnectionPool(max_connections, max_connections,
+                                                         **(db_config or DB_CONFIG))
+        # Keyed by the connection object, not id(): ids of closed connections get reused
+        self._prepared = weakref.WeakKeyDictionary()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.closeall()
+
+    @contextmanager
+    def connection(self) -> Iterator:
+        conn = self.pool.getconn()
+        try:
+            # Autocommit: every poll sees rows committed since the last one
+            if not conn.autocommit:
+                conn.autocommit = True
+            yield conn
+        finally:
+            self.pool.putconn(conn)
+
+    def _execute(self, conn, name: str, parameter) -> list:
+        record_type, sql = PREPARED_STATEMENTS[name]
+        prepared = self._prepared.setdefault(conn, set())
+        with conn.cursor() as cursor:
+            if name not in prepared:
+                cursor.execute(f"PREPARE {name} AS {sql}")
+                prepared.add(name)
+            cursor.execute(f"EXECUTE {name} (%s)", (parameter,))
+            return [record_type(*row) for row in cursor.fetchall()]
+
+    def _fetch(self, name: str, keys: Iterable[str], key_field: str = "analysis_id") -> Dict[str, object]:
+        keys = list(keys)
+        records = {}
+        with self.connection() as conn:
+            for start in range(0, len(keys), BATCH_SIZE):
+                for record in self._execute(conn, name, keys[start:start + BATCH_SIZE]):
+                    records[getattr(record, key_field)] = record
+        return records
+
+    def fetch_states(self, analysis_ids: Iterable[str]) -> Dict[str, AnalysisState]:
+        return self._fetch("analysis_state", analysis_ids)
+
+    def fetch_details(self, analysis_ids: Iterable[str]) -> Dict[str, AnalysisDetails]:
+        return self._fetch("analysis_details", analysis_ids)
+
+    def get_details(self, analysis_id: str) -> Optional[AnalysisDetails]:
+        return self.fetch_details([analysis_id]).get(analysis_id)
+
+    def fetch_code_redemptions(self, codes: Iterable[str]) -> Dict[str, CodeRedemption]:
+        """Used flag and number of subscriptions created per sponsorship code"""
+        return self._fetch("code_redemptions", codes, key_field="code")
+
+    def recent_images(self, limit: int) -> List[StoredImage]:
+        """Newest analyses that have a stored image"""
+        with self.connection() as conn:
+            return self._execute(conn, "recent_images", limit)
+
+    def poll_until_completed(self, analysis_ids: Iterable[str], timeout: float = 60,
+                             initial_delay: float = 0.05, max_delay: float = 2.0,
+                             on_progress: Optional[Callable[[AnalysisState], None]] = None
+                             ) -> Dict[str, AnalysisState]:
+        """
+        Poll "PlantAnalyses" until every AnalysisId reaches a final status or `timeout` passes.
+
+        All pending ids are checked with a single query per round. The delay resets
+        to `initial_delay` whenever a round observes progress and doubles (up to
+        `max_delay`) when nothing changed. `on_progress` is called with each state whose
+        status changed. Returns the last state seen per AnalysisId.
+        """
+        pending = set(analysis_ids)
+        latest: Dict[str, AnalysisState] = {}
+        delay = initial_delay
+        deadline = time.monotonic() + timeout
+
+        while pending and time.monotonic() < deadline:
+            progressed = False
+
+            for analysis_id, state in self.fetch_states(pending).items():
+                previous = latest.get(analysis_id)
+                if previous is None or previous.status != state.status:
+                    progressed = True
+                    if on_progress:
+                        on_progress(state)
+                latest[analysis_id] = state
+                if state.is_final:
+                    pending.discard(analysis_id)
+
+            if not pending:
+                break
+            delay = initial_delay if progressed else min(delay * 2, max_delay)
+            time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+
+        return latest
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Runtime for the swagger-generated API throughput smoke suite
+
+test_api_smoke.py is generated by claudedocs/swagger_to_postman.py
+(--target benchmark) and holds the endpoint model; this module logs in once,
+then hits every endpoint from one pooled keep-alive aiohttp session at a
+configurable concurrency and prints a per-endpoint latency/throughput table.
+Results can be saved as JSON and compared against an earlier run to spot
+regressions between releases.
+
+Examples:
+    python test_api_smoke.py --email admin@ziraai.com --password <pw> --save before.json
+    python test_api_smoke.py --token <jwt> --tag Sponsorship --requests 50 --concurrency 10
+    python test_api_smoke.py --token <jwt> --baseline before.json --save after.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from perf_stats import format_ms, print_error_breakdown, print_table, summarize
+
+DEFAULT_BASE_URL = "https://localhost:5001"
+LOGIN_PATH = "/api/v1/Auth/login"
+PATH_PARAMETER = re.compile(r"\{(\w+)\}")
+
+# Path parameters without a --param value
+DEFAULT_PATH_VALUES = {"version": "1"}
+FALLBACK_PATH_VALUE = "1"
+
+
+def endpoint_key(endpoint: Dict) -> str:
+    return f"{endpoint['method']} {endpoint['path']}"
+
+
+class EndpointResult:
+    """Samples collected for one endpoint"""
+
+    def __init__(self, endpoint: Dict):
+        self.endpoint = endpoint
+        self.latencies: List[float] = []
+        self.errors: Counter = Counter()
+        self.sent = 0
+        self.elapsed = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return len(self.latencies)
+
+    def to_dict(self) -> Dict:
+        stats = summarize(self.latencies)
+        return {
+            "key": endpoint_key(self.endpoint),
+            "sent": self.sent,
+            "succeeded": self.succeeded,
+            "errors": dict(self.errors),
+            "elapsed": self.elapsed,
+            "rps": self.succeeded / self.elapsed if self.elapsed else 0.0,
+            "p50": stats["p50"],
+            "p95": stats["p95"],
+            "p99": stats["p99"],
+        }
+
+
+def build_url(base_url: str, endpoint: Dict, path_values: Dict[str, str]) -> str:
+    path = PATH_PARAMETER.sub(
+        lambda m: path_values.get(m.group(1), DEFAULT_PATH_VALUES.get(m.group(1), FALLBACK_PATH_VALUE)),
+        endpoint["path"])
+    return base_url.rstrip("/") + path
+
+
+async def login(session: aiohttp.ClientSession, base_url: str, email: str, password: str) -> Optional[str]:
+    """POST Auth/login once and return the access token"""
+    async with session.post(base_url.rstrip("/") + LOGIN_PATH, json={"email": email, "password": password}) as response:
+        payload = await response.json(content_type=None)
+    data = (payload or {}).get("data") or {}
+    return data.get("token")
+
+
+async def hit_endpoint(session: aiohttp.ClientSession, url: str, endpoint: Dict, headers: Dict[str, str],
+                       requests: int, concurrency: int, warmup: int) -> EndpointResult:
+    """Send `warmup` unrecorded requests, then `requests` recorded ones with `concurrency` in flight"""
+    result = EndpointResult(endpoint)
+    body = json.dumps(endpoint["body"]).encode("utf-8") if "body" in endpoint else None
+    params = {name: str(value) for name, value in endpoint["query"].items()}
+
+    async def send(record: bool):
+        started = time.perf_counter()
+        if record:
+            result.sent += 1
+        try:
+            async with session.request(endpoint["method"], url, params=params, data=body,
+                                       headers=headers) as response:
+                await response.read()
+                elapsed = time.perf_counter() - started
+                if not record:
+                    return
+                if response.status >= 400:
+                    result.errors[f"HTTP {response.status}"] += 1
+                else:
+                    result.latencies.append(elapsed)
+        except asyncio.TimeoutError:
+            if record:
+                result.errors["Timeout"] += 1
+        except aiohttp.ClientError as e:
+            if record:
+                result.errors[type(e).__name__] += 1
+
+    for _ in range(warmup):
+        await send(record=False)
+
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await send(record=True)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def select_endpoints(endpoints: List[Dict], tags: Optional[List[str]], match: Optional[str]) -> List[Dict]:
+    selected = [e for e in endpoints if not tags or e["tag"] in tags]
+    if match:
+        pattern = re.compile(match)
+        selected = [e for e in selected if pattern.search(endpoint_key(e))]
+    return selected
+
+
+def load_baseline(path: Optional[str]) -> Dict[str, Dict]:
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {entry["key"]: entry for entry in json.load(f)["endpoints"]}
+
+
+def print_results(results: List[EndpointResult], baseline: Dict[str, Dict], regression_pct: float) -> List[str]:
+    """Print the per-endpoint table; returns the keys whose p95 regressed past the threshold"""
+    headers = ["Endpoint", "OK", "Err", "Req/s", "p50", "p95", "p99"]
+    if baseline:
+        headers.append("p95 vs base")
+
+    rows = []
+    regressions = []
+    for result in results:
+        entry = result.to_dict()
+        row = [entry["key"], entry["succeeded"], sum(result.errors.values()), f"{entry['rps']:.1f}",
+               format_ms(entry["p50"]), format_ms(entry["p95"]), format_ms(entry["p99"])]
+        if baseline:
+            before = baseline.get(entry["key"])
+            if before and before["p95"] and entry["succeeded"]:
+                change = (entry["p95"] - before["p95"]) / before["p95"] * 100
+                row.append(f"{change:+.0f}%")
+                if change > regression_pct:
+                    regressions.append(entry["key"])
+            else:
+                row.append("-")
+        rows.append(row)
+
+    print_table(headers, rows, title="API SMOKE BENCHMARK")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Per-endpoint API throughput smoke suite")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="API base URL")
+    parser.add_argument("--token", default=os.environ.get("ZIRAAI_TOKEN"),
+                        help="Bearer token (default: $ZIRAAI_TOKEN); otherwise --email/--password log in once")
+    parser.add_argument("--email", default=os.environ.get("ZIRAAI_EMAIL"), help="Login email (default: $ZIRAAI_EMAIL)")
+    parser.add_argument("--password", default=os.environ.get("ZIRAAI_PASSWORD"),
+                        help="Login password (default: $ZIRAAI_PASSWORD)")
+    parser.add_argument("--requests", type=int, default=20, help="Recorded requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=4, help="In-flight requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=1, help="Unrecorded requests per endpoint first")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                        help="Value for a path parameter such as userId=42 (repeatable, default 1)")
+    parser.add_argument("--tag", action="append", default=None, help="Only endpoints with this tag (repeatable)")
+    parser.add_argument("--match", default=None, help="Only endpoints whose 'METHOD /path' matches this regex")
+    parser.add_argument("--save", default=None, help="Write results as JSON for a later --baseline")
+    parser.add_argument("--baseline", default=None, help="Earlier --save output to compare p95 against")
+    parser.add_argument("--regression-pct", type=float, default=25,
+                        help="p95 increase over the baseline that counts as a regression (exit 1)")
+    return parser.parse_args()
+
+
+async def run_suite(endpoints: List[Dict], args) -> List[EndpointResult]:
+    path_values = dict(param.split("=", 1) for param in args.param)
+    connector = aiohttp.TCPConnector(limit=args.concurrency, ssl=False)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+
+    results = []
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        token = args.token
+        if not token and args.email and args.password:
+            token = await login(session, args.base_url, args.email, args.password)
+            print("✓ Logged in" if token else "✗ Login failed - authenticated endpoints will return 401")
+        # Sent to every endpoint, whatever swagger declares: [AllowAnonymous] controllers such as
+        # user-groups/users/{id} still dispatch to [SecuredOperation] handlers
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        for index, endpoint in enumerate(endpoints, 1):
+            url = build_url(args.base_url, endpoint, path_values)
+            result = await hit_endpoint(session, url, endpoint, headers, args.requests, args.concurrency,
+                                        args.warmup)
+            stats = summarize(result.latencies)
+            print(f"[{index}/{len(endpoints)}] {endpoint_key(endpoint)}: {result.succeeded}/{result.sent} ok, "
+                  f"p95 {format_ms(stats['p95'])}")
+            results.append(result)
+    return results
+
+
+def main(endpoints: List[Dict]):
+    args = parse_args()
+    selected = select_endpoints(endpoints, args.tag, args.match)
+
+    print("=" * 60)
+    print("API THROUGHPUT SMOKE SUITE")
+    print("=" * 60)
+    print(f"Target: {args.base_url}")
+    print(f"Endpoints: {len(selected)} of {len(endpoints)}, {args.requests} requests each, "
+          f"concurrency {args.concurrency}")
+    if not (args.token or (args.email and args.password)):
+        print("⚠ No token or credentials given - authenticated endpoints will return 401")
+
+    started = time.perf_counter()
+    results = asyncio.run(run_suite(selected, args))
+    elapsed = time.perf_counter() - started
+
+    regressions = print_results(results, load_baseline(args.baseline), args.regression_pct)
+
+    errors = Counter()
+    for result in results:
+        errors.update(result.errors)
+    print_error_breakdown(errors, sum(result.sent for result in results))
+    print(f"\nTotal: {sum(result.succeeded for result in results)} ok requests in {elapsed:.1f} s")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"base_url": args.base_url, "requests": args.requests, "concurrency": args.concurrency,
+                       "endpoints": [result.to_dict() for result in results]}, f, indent=2)
+        print(f"✓ Results saved to {args.save}")
+
+    if regressions:
+        print(f"\n✗ {len(regressions)} endpoints regressed more than {args.regression_pct:g}% at p95:")
+        for key in regressions:
+            print(f"   - {key}")
+        sys.exit(1)
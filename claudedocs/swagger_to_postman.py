@@ -7,17 +7,69 @@ Fixes:
 - Comprehensive endpoint coverage
 """
 
+import argparse
 import json
+import pprint
+import re
+import tempfile
 import uuid
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Tuple
 
-def generate_postman_collection(swagger_path: str, output_path: str):
-    """Convert swagger.json to Postman Collection v2.1"""
+try:
+    import ijson  # optional: stream-parse `paths` instead of loading the whole spec
+except ImportError:
+    ijson = None
+
+HTTP_METHODS = ['GET', 'POST', 'PUT', 'DELETE', 'PATCH']
+
+# Stands in for the folder list while the collection skeleton is serialized
+ITEMS_SENTINEL = '@@ITEMS@@'
+
+# POST endpoints that only read or validate and can be hammered by the benchmark suite
+DEFAULT_SAFE_POSTS = [r'/Referral/validate$']
+
+BENCHMARK_RUNNER = 'api_smoke_runner'
+
+def read_spec(swagger_path: str) -> Tuple[Dict[str, Dict], Iterator[Tuple[str, str, Dict]]]:
+    """
+    Return (component schemas, operations), operations yielding (path, METHOD, details).
+    With ijson the schemas are read in a first pass and `paths` is then
+    stream-parsed one path at a time; otherwise the spec is loaded once.
+    """
+    if ijson is not None:
+        with open(swagger_path, 'rb') as f:
+            schemas = dict(ijson.kvitems(f, 'components.schemas', use_float=True))
+        return schemas, _iter_streamed_operations(swagger_path)
 
-    # Read swagger
     with open(swagger_path, 'r', encoding='utf-8') as f:
         swagger = json.load(f)
+    schemas = swagger.get('components', {}).get('schemas', {})
+    return schemas, _iter_operations(swagger.get('paths', {}).items())
+
+def _iter_streamed_operations(swagger_path: str) -> Iterator[Tuple[str, str, Dict]]:
+    with open(swagger_path, 'rb') as f:
+        yield from _iter_operations(ijson.kvitems(f, 'paths', use_float=True))
+
+def _iter_operations(paths) -> Iterator[Tuple[str, str, Dict]]:
+    for path, methods in paths:
+        for method, details in methods.items():
+            if method.upper() in HTTP_METHODS:
+                yield path, method.upper(), details
+
+def write_indented(out, value: Any, level: int):
+    """Write value as json.dump(indent=2) would at the given nesting depth"""
+    text = json.dumps(value, indent=2, ensure_ascii=False)
+    out.write(text.replace('\n', '\n' + '  ' * level))
+
+def generate_postman_collection(swagger_path: str, output_path: str):
+    """
+    Convert swagger.json to Postman Collection v2.1
+
+    Requests are built one operation at a time and spooled to a temporary
+    file grouped by tag; the collection is then written folder by folder,
+    so memory stays flat however large the spec is.
+    """
 
     # Initialize Postman collection
     collection = {
@@ -27,7 +79,7 @@ def generate_postman_collection(swagger_path: str, output_path: str):
             "description": "Auto-generated from Swagger - All endpoints with proper auth",
             "schema": "https://schema.getpostman.com/json/collection/v2.1.0/collection.json"
         },
-        "item": [],
+        "item": ITEMS_SENTINEL,
         "auth": {
             "type": "bearer",
             "bearer": [
@@ -106,43 +158,55 @@ def generate_postman_collection(swagger_path: str, output_path: str):
         ]
     }
 
-    # Group endpoints by tag
-    folders: Dict[str, List[Dict]] = {}
+    # Build each request once and spool it; only offsets per tag stay in memory
+    offsets: Dict[str, List[Tuple[int, int]]] = {}
 
-    for path, methods in swagger.get('paths', {}).items():
-        for method, details in methods.items():
-            if method.upper() not in ['GET', 'POST', 'PUT', 'DELETE', 'PATCH']:
-                continue
+    schemas, operations = read_spec(swagger_path)
+    examples = ExampleGenerator(schemas)
+    examples.warm()
 
+    with tempfile.TemporaryFile() as spool:
+        for path, method, details in operations:
             # Get tag (folder name)
             tags = details.get('tags', ['Other'])
             tag = tags[0] if tags else 'Other'
 
-            # Create folder if not exists
-            if tag not in folders:
-                folders[tag] = []
-
-            # Build request
-            request = build_postman_request(path, method.upper(), details)
-            folders[tag].append(request)
-
-    # Convert folders to Postman format
-    for folder_name in sorted(folders.keys()):
-        collection['item'].append({
-            "name": folder_name,
-            "item": folders[folder_name],
-            "description": f"{folder_name} endpoints"
-        })
-
-    # Write output
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(collection, f, indent=2, ensure_ascii=False)
+            request = build_postman_request(path, method, details, examples)
+            data = json.dumps(request, ensure_ascii=False).encode('utf-8')
+            offsets.setdefault(tag, []).append((spool.tell(), len(data)))
+            spool.write(data)
+
+        # Write the collection around the folder list, one folder at a time
+        head, tail = json.dumps(collection, indent=2, ensure_ascii=False).split(json.dumps(ITEMS_SENTINEL))
+
+        with open(output_path, 'w', encoding='utf-8') as out:
+            out.write(head)
+            if not offsets:
+                out.write('[]')
+            else:
+                out.write('[')
+                for folder_index, folder_name in enumerate(sorted(offsets.keys())):
+                    out.write(',\n    {\n' if folder_index else '\n    {\n')
+                    out.write(f'      "name": {json.dumps(folder_name, ensure_ascii=False)},\n')
+                    out.write('      "item": [')
+                    for request_index, (offset, length) in enumerate(offsets[folder_name]):
+                        out.write(',\n        ' if request_index else '\n        ')
+                        spool.seek(offset)
+                        write_indented(out, json.loads(spool.read(length)), 4)
+                    out.write('\n      ],\n')
+                    description = json.dumps(f"{folder_name} endpoints", ensure_ascii=False)
+                    out.write(f'      "description": {description}\n    }}')
+                out.write('\n  ]')
+            out.write(tail)
 
     print(f"[OK] Postman collection created: {output_path}")
-    print(f"Total folders: {len(folders)}")
-    print(f"Total requests: {sum(len(items) for items in folders.values())}")
+    print(f"Total folders: {len(offsets)}")
+    print(f"Total requests: {sum(len(items) for items in offsets.values())}")
+    print(f"Schemas memoized: {len(examples.cache)} of {len(schemas)} "
+          f"({examples.truncated} recursive/deep references cut)")
 
-def build_postman_request(path: str, method: str, details: Dict) -> Dict:
+def build_postman_request(path: str, method: str, details: Dict,
+                          examples: 'ExampleGenerator' = None) -> Dict:
     """Build a Postman request item"""
 
     # Convert swagger path params to Postman variables
@@ -169,7 +233,7 @@ def build_postman_request(path: str, method: str, details: Dict) -> Dict:
             # Get example body from schema
             body = {
                 "mode": "raw",
-                "raw": json.dumps(get_example_body(json_schema), indent=2),
+                "raw": json.dumps(get_example_body(json_schema, examples), indent=2),
                 "options": {
                     "raw": {
                         "language": "json"
@@ -230,36 +294,202 @@ def build_postman_request(path: str, method: str, details: Dict) -> Dict:
 
     return request
 
-def get_example_body(schema: Dict) -> Dict:
+class ExampleGenerator:
+    """
+    Builds example values from OpenAPI schemas, resolving #/components/schemas
+    references. Each component is expanded once and memoized, so warm()
+    covers the whole spec in one linear pass and request bodies are lookups.
+    A reference back to a component that is still being expanded (recursive
+    DTOs) or nested deeper than max_depth components is cut to an empty value.
+    Where such a cut falls depends on what was being expanded at the time, so
+    only expansions without a cut are memoized, together with their nesting
+    height, and a memoized example is reused only where it fits under max_depth.
+    """
+
+    REF_PREFIX = '#/components/schemas/'
+
+    STRING_FORMATS = {
+        'date-time': '2025-01-01T00:00:00Z',
+        'date': '2025-01-01',
+        'date-span': '00:00:00',
+        'uuid': '00000000-0000-0000-0000-000000000000',
+        'uri': 'https://example.com',
+        'email': 'user@example.com',
+        'binary': '',
+    }
+
+    def __init__(self, schemas: Dict[str, Dict], max_depth: int = 8):
+        self.schemas = schemas
+        self.max_depth = max_depth
+        self.cache: Dict[str, Tuple[Any, int]] = {}  # name -> (example, nesting height)
+        self.truncated = 0
+        self._resolving: List[str] = []
+        self._deepest = 0
+
+    def warm(self):
+        """Expand every component schema once"""
+        for name in self.schemas:
+            self.for_component(name)
+
+    def for_component(self, name: str) -> Any:
+        depth = len(self._resolving)
+        if name in self.cache:
+            example, height = self.cache[name]
+            if depth + height < self.max_depth:
+                self._deepest = max(self._deepest, depth + height)
+                return example
+        schema = self.schemas.get(name)
+        if schema is None:
+            return None
+        if name in self._resolving or depth >= self.max_depth:
+            self.truncated += 1
+            return [] if schema.get('type') == 'array' else {} if schema.get('type', 'object') == 'object' else None
+
+        truncated, deepest = self.truncated, self._deepest
+        self._deepest = depth
+        self._resolving.append(name)
+        try:
+            example = self.for_schema(schema, name.rsplit('.', 1)[-1])
+        finally:
+            self._resolving.pop()
+        if self.truncated == truncated:
+            self.cache[name] = (example, self._deepest - depth)
+        self._deepest = max(deepest, self._deepest)
+        return example
+
+    def for_schema(self, schema: Dict, name: str = 'value') -> Any:
+        if '$ref' in schema:
+            ref = schema['$ref']
+            if not ref.startswith(self.REF_PREFIX):
+                return None
+            return self.for_component(ref[len(self.REF_PREFIX):])
+
+        if 'example' in schema:
+            return schema['example']
+        if schema.get('enum'):
+            return schema['enum'][0]
+
+        for combinator in ('allOf', 'oneOf', 'anyOf'):
+            if schema.get(combinator):
+                if combinator != 'allOf':
+                    return self.for_schema(schema[combinator][0], name)
+                merged = {}
+                for part in schema['allOf']:
+                    part_example = self.for_schema(part, name)
+                    if isinstance(part_example, dict):
+                        merged.update(part_example)
+                return merged
+
+        schema_type = schema.get('type')
+        if schema_type is None:
+            schema_type = 'object' if 'properties' in schema else 'string'
+
+        if schema_type == 'object':
+            example = {}
+            for prop_name, prop_schema in schema.get('properties', {}).items():
+                # Server-populated fields do not belong in request bodies
+                if not prop_schema.get('readOnly'):
+                    example[prop_name] = self.for_schema(prop_schema, prop_name)
+            return example
+        if schema_type == 'array':
+            item = self.for_schema(schema.get('items', {}), name)
+            return [item] if item is not None else []
+        if schema_type == 'integer':
+            return 0
+        if schema_type == 'number':
+            return 0.0
+        if schema_type == 'boolean':
+            return False
+        return self.STRING_FORMATS.get(schema.get('format'), f"example_{name}")
+
+def get_example_body(schema: Dict, examples: ExampleGenerator = None) -> Any:
     """Generate example request body from schema"""
 
-    # Try to get $ref
-    if '$ref' in schema:
-        # Can't resolve refs without full schema, return placeholder
-        return {"placeholder": "Fill with actual data"}
+    example = (examples or ExampleGenerator({})).for_schema(schema)
+    return example if example not in (None, {}, []) else {"placeholder": "Fill with actual data"}
+
+def build_benchmark_endpoint(path: str, method: str, details: Dict, examples: ExampleGenerator,
+                             safe_posts: List[str]) -> Dict:
+    """Endpoint entry for the benchmark suite, or None when it must not be called repeatedly"""
+
+    if method != 'GET' and not (method == 'POST' and any(re.search(p, path) for p in safe_posts)):
+        return None
 
-    # Get properties
-    properties = schema.get('properties', {})
-    example = {}
+    # Required query parameters get example values; path parameters are filled in at run time
+    query = {}
+    for parameter in details.get('parameters', []):
+        if parameter.get('in') == 'query' and parameter.get('required'):
+            query[parameter['name']] = examples.for_schema(parameter.get('schema', {}), parameter['name'])
 
-    for prop_name, prop_schema in properties.items():
-        prop_type = prop_schema.get('type', 'string')
+    endpoint = {
+        'name': details.get('summary') or details.get('operationId') or f"{method} {path}",
+        'tag': (details.get('tags') or ['Other'])[0],
+        'method': method,
+        'path': path,
+        'query': query,
+    }
 
-        if prop_type == 'string':
-            example[prop_name] = prop_schema.get('example', f"example_{prop_name}")
-        elif prop_type == 'integer':
-            example[prop_name] = prop_schema.get('example', 0)
-        elif prop_type == 'boolean':
-            example[prop_name] = prop_schema.get('example', False)
-        elif prop_type == 'array':
-            example[prop_name] = []
-        elif prop_type == 'object':
-            example[prop_name] = {}
+    json_schema = details.get('requestBody', {}).get('content', {}).get('application/json', {}).get('schema')
+    if json_schema:
+        endpoint['body'] = get_example_body(json_schema, examples)
+    return endpoint
+
+def generate_benchmark_suite(swagger_path: str, output_path: str, safe_posts: List[str]):
+    """
+    Write an executable throughput smoke suite: the endpoint model as
+    ENDPOINTS plus a call into api_smoke_runner. Endpoints are written
+    as they are read, like the collection target.
+    """
+
+    schemas, operations = read_spec(swagger_path)
+    examples = ExampleGenerator(schemas)
+    examples.warm()
+
+    counts = {'GET': 0, 'POST': 0}
+    with open(output_path, 'w', encoding='utf-8') as out:
+        out.write('#!/usr/bin/env python3\n')
+        out.write('"""\n')
+        out.write('API throughput smoke suite - GENERATED, do not edit\n\n')
+        out.write(f'Source: {Path(swagger_path).name}\n')
+        out.write('Regenerate: python claudedocs/swagger_to_postman.py --target benchmark\n')
+        out.write(f'Run: python {Path(output_path).name} --help\n')
+        out.write('"""\n\n')
+        out.write(f'from {BENCHMARK_RUNNER} import main\n\n')
+        out.write('ENDPOINTS = [\n')
+        for path, method, details in operations:
+            endpoint = build_benchmark_endpoint(path, method, details, examples, safe_posts)
+            if endpoint is None:
+                continue
+            counts[method] += 1
+            text = pprint.pformat(endpoint, indent=1, width=110, sort_dicts=False)
+            out.write('    ' + text.replace('\n', '\n    ') + ',\n')
+        out.write(']\n\n')
+        out.write("if __name__ == '__main__':\n")
+        out.write('    main(ENDPOINTS)\n')
 
-    return example if example else {"placeholder": "Fill with actual data"}
+    print(f"[OK] Benchmark suite created: {output_path}")
+    print(f"Endpoints: {counts['GET']} GET, {counts['POST']} safe POST")
 
 if __name__ == '__main__':
-    swagger_path = Path(__file__).parent / 'swagger.json'
-    output_path = Path(__file__).parent / 'ZiraAI_Complete_Collection.postman_collection.json'
+    repo_root = Path(__file__).resolve().parent.parent
+    default_outputs = {
+        'postman': Path(__file__).parent / 'ZiraAI_Complete_Collection.postman_collection.json',
+        'benchmark': repo_root / 'test_api_smoke.py',
+    }
 
-    generate_postman_collection(str(swagger_path), str(output_path))
+    parser = argparse.ArgumentParser(description="Convert Swagger/OpenAPI JSON to a Postman Collection v2.1 "
+                                                 "or an API throughput smoke suite")
+    parser.add_argument('swagger_path', nargs='?', default=str(Path(__file__).parent / 'swagger.json'))
+    parser.add_argument('output_path', nargs='?', default=None,
+                        help='Default: ZiraAI_Complete_Collection.postman_collection.json / test_api_smoke.py')
+    parser.add_argument('--target', choices=['postman', 'benchmark'], default='postman', help='What to generate')
+    parser.add_argument('--safe-post', action='append', default=None, metavar='REGEX',
+                        help='Path pattern of a POST endpoint the benchmark may call (repeatable, '
+                             f'default: {DEFAULT_SAFE_POSTS})')
+    args = parser.parse_args()
+    output_path = args.output_path or str(default_outputs[args.target])
+
+    if args.target == 'benchmark':
+        generate_benchmark_suite(args.swagger_path, output_path, args.safe_post or DEFAULT_SAFE_POSTS)
+    else:
+        generate_postman_collection(args.swagger_path, output_path)
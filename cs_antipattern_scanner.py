@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Multi-rule C# performance anti-pattern scanner built on fix_tracking.py
+
+Every file is tokenized once into a shared SourceView (tokens with comments
+and string literals set apart, bracket matching, loop nesting). Rules declare
+the tokens that trigger them and all rules are compiled into one dispatch
+table, so a single pass over the tokens evaluates every rule. Files are
+scanned in a process pool and findings can be printed or written as JSON or
+SARIF 2.1.0.
+
+Rules:
+    EF001  GetAsync result passed to Update/Delete (needs GetTrackedAsync)
+    EF002  Repository/EF query awaited inside a loop (N+1)
+    EF003  ToList()/ToArray() materialized before Where()
+    EF004  Query() in a read-only handler without AsNoTracking()
+    ASY001 Blocking .Result/.Wait()/.GetAwaiter().GetResult() on an async call
+
+New rules subclass Rule and are added with @register.
+
+Examples:
+    python cs_antipattern_scanner.py
+    python cs_antipattern_scanner.py Business --format sarif --output findings.sarif
+    python cs_antipattern_scanner.py --base-ref origin/master --check
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+from fix_tracking import DEFAULT_DIRECTORIES, LOOKAHEAD_CHARS, REPO_ROOT, changed_files, iter_cs_files
+
+TOKEN_PATTERN = re.compile(r'''
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>"""[\s\S]*?"""|\$?@"(?:[^"]|"")*"|@\$"(?:[^"]|"")*"|\$?"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])+')
+  | (?P<ident>@?[A-Za-z_]\w*)
+  | (?P<number>\d[\w.]*)
+  | (?P<punct>=>|\?\.|\?\?|&&|\|\||==|!=|<=|>=|[{}()\[\];,.<>=!?:+\-*/%&|^~#])
+  | (?P<ws>\s+)
+  | (?P<other>.)
+''', re.VERBOSE | re.DOTALL)
+
+OPENERS = {'(': ')', '{': '}', '[': ']'}
+LOOP_KEYWORDS = ('for', 'foreach', 'while')
+STATEMENT_BOUNDARIES = (';', '{', '}')
+
+
+class SourceView:
+    """
+    Token-level view of one C# file shared by all rules: parallel lists of
+    token text and source offset (comments and whitespace dropped, string
+    literals kept as opaque tokens), bracket partners and loop nesting.
+    """
+
+    def __init__(self, path, content):
+        self.path = path
+        self.content = content
+        self.texts = []
+        self.kinds = []
+        self.offsets = []
+
+        for match in TOKEN_PATTERN.finditer(content):
+            kind = match.lastgroup
+            if kind in ('ws', 'comment'):
+                continue
+            self.texts.append(match.group() if kind != 'string' else '""')
+            self.kinds.append(kind)
+            self.offsets.append(match.start())
+
+        self.line_starts = [0] + [m.end() for m in re.finditer('\n', content)]
+        self.partner = self._match_brackets()
+        self.loop_depth = self._loop_depths()
+
+    def _match_brackets(self):
+        partner = [-1] * len(self.texts)
+        stack = []
+        for index, text in enumerate(self.texts):
+            if text in OPENERS:
+                stack.append(index)
+            elif text in (')', '}', ']'):
+                # Unbalanced input (preprocessor branches): unwind to the matching opener
+                while stack and OPENERS[self.texts[stack[-1]]] != text:
+                    stack.pop()
+                if stack:
+                    opener = stack.pop()
+                    partner[opener] = index
+                    partner[index] = opener
+        return partner
+
+    def _loop_depths(self):
+        """Number of enclosing loop bodies for every token"""
+        delta = [0] * (len(self.texts) + 1)
+        for index, text in enumerate(self.texts):
+            if text not in LOOP_KEYWORDS or self.kinds[index] != 'ident':
+                continue
+            header = index + 1
+            if header >= len(self.texts) or self.texts[header] != '(' or self.partner[header] < 0:
+                continue
+            body_start = self.partner[header] + 1
+            if body_start >= len(self.texts):
+                continue
+            if self.texts[body_start] == '{' and self.partner[body_start] > 0:
+                body_end = self.partner[body_start]
+            elif self.texts[body_start] == ';':
+                continue  # do { } while (...);
+            else:
+                body_end = self.statement_end(body_start)
+            delta[body_start] += 1
+            delta[body_end + 1] -= 1
+
+        depths = []
+        current = 0
+        for index in range(len(self.texts)):
+            current += delta[index]
+            depths.append(current)
+        return depths
+
+    def statement_start(self, index):
+        """Index of the first token of the statement containing `index`"""
+        while index > 0:
+            previous = self.texts[index - 1]
+            if previous in STATEMENT_BOUNDARIES:
+                break
+            if previous in (')', ']') and self.partner[index - 1] >= 0:
+                index = self.partner[index - 1]
+            else:
+                index -= 1
+        return index
+
+    def statement_end(self, index):
+        """Index of the ';' that ends the statement containing `index` (skipping nested brackets)"""
+        while index < len(self.texts):
+            text = self.texts[index]
+            if text == ';':
+                return index
+            if text in OPENERS and self.partner[index] > index:
+                index = self.partner[index] + 1
+            else:
+                index += 1
+        return len(self.texts) - 1
+
+    def next_is(self, index, *expected):
+        """True when the tokens right after `index` are `expected`"""
+        end = index + 1 + len(expected)
+        return end <= len(self.texts) and tuple(self.texts[index + 1:end]) == expected
+
+    def is_member_call(self, index):
+        """`.Name(` at `index`"""
+        return index > 0 and self.texts[index - 1] in ('.', '?.') and self.next_is(index, '(')
+
+    def location(self, index):
+        offset = self.offsets[index]
+        line = bisect_right(self.line_starts, offset)
+        column = offset - self.line_starts[line - 1] + 1
+        return line, column
+
+    def line_text(self, line):
+        start = self.line_starts[line - 1]
+        end = self.line_starts[line] - 1 if line < len(self.line_starts) else len(self.content)
+        return self.content[start:end].strip()
+
+
+class Rule(ABC):
+    id = ''
+    name = ''
+    level = 'warning'  # SARIF level: error, warning or note
+    description = ''
+    triggers = ()      # token texts that make the engine call check()
+    markers = ()       # byte strings; files containing none of them skip this rule
+
+    @abstractmethod
+    def check(self, view, index):
+        """Return a finding message for the trigger token at `index`, or None"""
+
+
+RULES = []
+
+
+def register(rule_class):
+    RULES.append(rule_class())
+    return rule_class
+
+
+@register
+class TrackedUpdateRule(Rule):
+    id = 'EF001'
+    name = 'tracked-update-after-getasync'
+    description = 'Entity loaded with GetAsync (AsNoTracking) is passed to Update/Delete; use GetTrackedAsync'
+    triggers = ('GetAsync',)
+    markers = (b'.GetAsync',)
+
+    def check(self, view, index):
+        if not view.is_member_call(index):
+            return None
+
+        # var something = await _repo.GetAsync(...);
+        start = view.statement_start(index)
+        texts = view.texts
+        if not (texts[start] == 'var' and start + 3 < index and texts[start + 2] == '=' and texts[start + 3] == 'await'):
+            return None
+        var_name = texts[start + 1]
+
+        end = view.statement_end(index)
+        limit = view.offsets[end] + LOOKAHEAD_CHARS
+        position = end + 1
+        while position + 4 < len(texts) and view.offsets[position] < limit:
+            if (texts[position] in ('Update', 'Delete') and texts[position - 1] == '.'
+                    and view.next_is(position, '(', var_name, ')')):
+                return f"'{var_name}' is loaded with GetAsync (no tracking) and then passed to {texts[position]}()"
+            position += 1
+        return None
+
+
+@register
+class QueryInLoopRule(Rule):
+    id = 'EF002'
+    name = 'query-in-loop'
+    description = 'Database query awaited inside a loop (N+1); load the data once before the loop'
+    triggers = ('GetAsync', 'GetTrackedAsync', 'GetListAsync', 'GetCountAsync', 'FirstOrDefaultAsync',
+                'SingleOrDefaultAsync', 'FirstAsync', 'SingleAsync', 'ToListAsync', 'ToArrayAsync',
+                'AnyAsync', 'CountAsync', 'FindAsync')
+    markers = (b'foreach', b'for (', b'for(', b'while')
+
+    def check(self, view, index):
+        if view.loop_depth[index] == 0 or not view.is_member_call(index):
+            return None
+        start = view.statement_start(index)
+        if 'await' not in view.texts[start:index]:
+            return None
+        return f"{view.texts[index]}() is awaited inside a loop - one round trip per iteration"
+
+
+@register
+class ToListBeforeWhereRule(Rule):
+    id = 'EF003'
+    name = 'tolist-before-where'
+    description = 'Query materialized with ToList/ToArray before Where; filter in the database first'
+    triggers = ('ToList', 'ToArray', 'ToListAsync', 'ToArrayAsync')
+    markers = (b'.ToList', b'.ToArray')
+
+    def check(self, view, index):
+        if not view.is_member_call(index):
+            return None
+        close = view.partner[index + 1]
+        if close < 0:
+            return None
+        after = close + 1
+        # (await query.ToListAsync()).Where(...)
+        if after < len(view.texts) and view.texts[after] == ')':
+            after += 1
+        if view.next_is(after - 1, '.', 'Where'):
+            return f"{view.texts[index]}() loads every row before .Where() filters them in memory"
+        return None
+
+
+@register
+class MissingAsNoTrackingRule(Rule):
+    id = 'EF004'
+    name = 'missing-asnotracking'
+    description = 'Read-only query handler uses Query() without AsNoTracking()'
+    triggers = ('Query',)
+    markers = (b'.Query()',)
+
+    def check(self, view, index):
+        if not (view.is_member_call(index) and view.next_is(index, '(', ')')):
+            return None
+        normalized = view.path.replace('\\', '/')
+        if '/Queries/' not in normalized and not normalized.endswith('Query.cs'):
+            return None
+        end = view.statement_end(index)
+        if 'AsNoTracking' in view.texts[index:end]:
+            return None
+        return "Query() in a read-only handler is tracked; add .AsNoTracking()"
+
+
+@register
+class SyncOverAsyncRule(Rule):
+    id = 'ASY001'
+    name = 'sync-over-async'
+    level = 'error'
+    description = 'Blocking on an async call with .Result, .Wait() or .GetAwaiter().GetResult()'
+    triggers = ('Result', 'Wait', 'GetResult')
+    markers = (b'.Result', b'.Wait(', b'.GetResult(')
+
+    def called_method(self, view, index):
+        """Name of the method whose call ends right before the '.' at index - 1"""
+        close = index - 2
+        if close < 0 or view.texts[close] != ')' or view.partner[close] < 1:
+            return None
+        return view.texts[view.partner[close] - 1]
+
+    def check(self, view, index):
+        if index < 1 or view.texts[index - 1] != '.':
+            return None
+        token = view.texts[index]
+        method = self.called_method(view, index)
+        if method is None:
+            return None
+
+        if token == 'Result' and method.endswith('Async'):
+            return f"{method}().Result blocks the thread; await it instead"
+        if token == 'Wait' and view.next_is(index, '(') and method.endswith('Async'):
+            return f"{method}().Wait() blocks the thread; await it instead"
+        if token == 'GetResult' and method == 'GetAwaiter':
+            return ".GetAwaiter().GetResult() blocks the thread; await the task instead"
+        return None
+
+
+def build_dispatch(rules):
+    """Trigger token -> rules, so one pass over the tokens evaluates every rule"""
+    dispatch = {}
+    for rule in rules:
+        for trigger in rule.triggers:
+            dispatch.setdefault(trigger, []).append(rule)
+    return dispatch
+
+
+def scan_file(filepath, rule_ids=None):
+    """Return (filepath, findings, prefiltered, error) for one file"""
+    rules = [rule for rule in RULES if not rule_ids or rule.id in rule_ids]
+    try:
+        with open(filepath, 'rb') as f:
+            data = f.read()
+
+        active = [rule for rule in rules if any(marker in data for marker in rule.markers)]
+        if not active:
+            return filepath, [], True, None
+
+        view = SourceView(filepath, data.decode('utf-8-sig'))
+        dispatch = build_dispatch(active)
+        relative = os.path.relpath(filepath, REPO_ROOT).replace(os.sep, '/')
+
+        findings = []
+        for index, text in enumerate(view.texts):
+            handlers = dispatch.get(text)
+            if not handlers:
+                continue
+            for rule in handlers:
+                message = rule.check(view, index)
+                if message:
+                    line, column = view.location(index)
+                    findings.append({
+                        'ruleId': rule.id,
+                        'rule': rule.name,
+                        'level': rule.level,
+                        'path': relative,
+                        'line': line,
+                        'column': column,
+                        'message': message,
+                        'snippet': view.line_text(line),
+                    })
+        return filepath, findings, False, None
+    except (OSError, UnicodeDecodeError) as e:
+        return filepath, [], False, str(e)
+
+
+def scan_files(filepaths, rule_ids=None, jobs=None):
+    filepaths = list(filepaths)
+    if jobs == 1 or len(filepaths) < 2:
+        return [scan_file(path, rule_ids) for path in filepaths]
+
+    jobs = jobs or os.cpu_count() or 1
+    chunksize = max(1, len(filepaths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(scan_file, filepaths, [rule_ids] * len(filepaths), chunksize=chunksize))
+
+
+def to_sarif(findings, rules):
+    return {
+        '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+        'version': '2.1.0',
+        'runs': [{
+            'tool': {
+                'driver': {
+                    'name': 'cs_antipattern_scanner',
+                    'rules': [{
+                        'id': rule.id,
+                        'name': rule.name,
+                        'shortDescription': {'text': rule.description},
+                        'defaultConfiguration': {'level': rule.level},
+                    } for rule in rules],
+                }
+            },
+            'results': [{
+                'ruleId': finding['ruleId'],
+                'level': finding['level'],
+                'message': {'text': finding['message']},
+                'locations': [{
+                    'physicalLocation': {
+                        'artifactLocation': {'uri': finding['path'], 'uriBaseId': '%SRCROOT%'},
+                        'region': {'startLine': finding['line'], 'startColumn': finding['column']},
+                    }
+                }],
+            } for finding in findings],
+        }],
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scan C# sources for EF Core / async performance anti-patterns")
+    parser.add_argument('directories', nargs='*', default=DEFAULT_DIRECTORIES,
+                        help='Directories to scan (default: Business/Handlers and Business/Services)')
+    parser.add_argument('--rules', nargs='+', default=None, choices=[rule.id for rule in RULES],
+                        help='Only run these rule ids')
+    parser.add_argument('--format', choices=['text', 'json', 'sarif'], default='text', help='Output format')
+    parser.add_argument('--output', default=None, help='Write JSON/SARIF here instead of stdout')
+    parser.add_argument('--base-ref', default=None, help='Only scan .cs files changed against this git ref')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--check', action='store_true', help='Exit 1 when there are findings')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    started = time.perf_counter()
+
+    if args.base_ref:
+        roots = [os.path.abspath(directory) + os.sep for directory in args.directories]
+        filepaths = [path for path in changed_files(args.base_ref) if any(path.startswith(root) for root in roots)]
+    else:
+        filepaths = [path for directory in args.directories for path in iter_cs_files(directory)]
+
+    findings = []
+    prefiltered = 0
+    for filepath, file_findings, skipped, error in scan_files(filepaths, args.rules, args.jobs):
+        prefiltered += skipped
+        if error:
+            print(f"Error processing {filepath}: {error}", file=sys.stderr)
+        findings.extend(file_findings)
+    findings.sort(key=lambda f: (f['path'], f['line'], f['column'], f['ruleId']))
+    elapsed = time.perf_counter() - started
+
+    rules = [rule for rule in RULES if not args.rules or rule.id in args.rules]
+    if args.format == 'text':
+        for finding in findings:
+            print(f"{finding['path']}:{finding['line']}:{finding['column']}: "
+                  f"{finding['ruleId']} {finding['message']}")
+            print(f"    {finding['snippet']}")
+    else:
+        document = findings if args.format == 'json' else to_sarif(findings, rules)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(document, f, indent=2)
+        else:
+            json.dump(document, sys.stdout, indent=2)
+            print()
+
+    counts = {}
+    for finding in findings:
+        counts[finding['ruleId']] = counts.get(finding['ruleId'], 0) + 1
+    summary = ', '.join(f"{rule.id}={counts.get(rule.id, 0)}" for rule in rules)
+    print(f"\nScanned {len(filepaths)} files ({prefiltered} rejected by prefilter) with {len(rules)} rules "
+          f"in {elapsed * 1000:.0f} ms: {len(findings)} findings ({summary})", file=sys.stderr)
+
+    if args.check and findings:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
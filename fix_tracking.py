@@ -1,77 +1,298 @@
+import argparse
+import hashlib
+import json
 import os
 import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-def fix_tracking_issues(directory):
-    """Find and fix GetAsync -> Update/Delete patterns"""
-    fixed_files = []
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DIRECTORIES = [
+    os.path.join(REPO_ROOT, 'Business', 'Handlers'),
+    os.path.join(REPO_ROOT, 'Business', 'Services'),
+]
 
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if not file.endswith('.cs'):
-                continue
+# Pattern: Find variable assignments with GetAsync
+# var something = await _repo.GetAsync(...)
+GET_ASYNC_PATTERN = re.compile(r'(var\s+(\w+)\s*=\s*await\s+[^;]+\.GetAsync\([^)]+\);)')
+
+# How far after the GetAsync line an Update/Delete of the same variable is looked for
+LOOKAHEAD_CHARS = 500
+
+# Per-file scan verdicts from earlier runs, keyed by path; see ScanCache
+DEFAULT_CACHE_FILE = os.path.join(REPO_ROOT, '.fix_tracking_cache.json')
+CACHE_VERSION = 1
+
+
+def has_markers(data):
+    """Cheap byte-level prefilter: skip files without GetAsync or without Update/Delete"""
+    if b'.GetAsync' not in data:
+        return False
+    return b'.Update(' in data or b'.Delete(' in data
+
+
+def rewrite_content(content):
+    """
+    Replace GetAsync with GetTrackedAsync where the fetched variable is passed
+    to Update/Delete shortly after. Single pass over the matches: unchanged text
+    between match offsets is copied through and only matched lines are rewritten.
+    Returns (new_content, fixed_variable_names).
+    """
+    pieces = []
+    fixed = []
+    last = 0
+
+    for match in GET_ASYNC_PATTERN.finditer(content):
+        var_name = match.group(2)
+
+        # Check if this variable is used in Update or Delete within the lookahead window
+        start_pos = match.end()
+        end_pos = start_pos + LOOKAHEAD_CHARS
+        if (content.find(f'.Update({var_name})', start_pos, end_pos) == -1
+                and content.find(f'.Delete({var_name})', start_pos, end_pos) == -1):
+            continue
+
+        pieces.append(content[last:match.start(1)])
+        pieces.append(match.group(1).replace('.GetAsync(', '.GetTrackedAsync('))
+        last = match.end(1)
+        fixed.append(var_name)
+
+    if not fixed:
+        return content, fixed
+
+    pieces.append(content[last:])
+    return ''.join(pieces), fixed
+
+
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def process_file(filepath, write=True, cached_hash=None, cached_verdict=None):
+    """
+    Scan one .cs file and optionally write the fix back.
+    When the content hash equals `cached_hash` the cached verdict is reused
+    without running the regex (e.g. the mtime changed on checkout only).
+    Returns (filepath, fixed_variable_names, prefiltered, error, digest);
+    digest is the hash of the content now on disk.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            data = f.read()
+
+        digest = content_hash(data)
+        if cached_hash == digest and cached_verdict is not None:
+            fixed = list(cached_verdict)
+            if not fixed or not write:
+                return filepath, fixed, False, None, digest
+        elif not has_markers(data):
+            return filepath, [], True, None, digest
+
+        content = data.decode('utf-8')
+        new_content, fixed = rewrite_content(content)
+
+        # Only write if changes were made
+        if fixed and write:
+            encoded = new_content.encode('utf-8')
+            with open(filepath, 'wb') as f:
+                f.write(encoded)
+            digest = content_hash(encoded)
 
-            filepath = os.path.join(root, file)
+        return filepath, fixed, False, None, digest
+    except (OSError, UnicodeDecodeError) as e:
+        return filepath, [], False, str(e), None
 
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
 
-                # Skip if no GetAsync or no Update/Delete
-                if '.GetAsync' not in content:
-                    continue
-                if '.Update(' not in content and '.Delete(' not in content:
-                    continue
+class ScanCache:
+    """
+    On-disk record of each file's last verdict, keyed by path and validated
+    by mtime, size and content hash. Files whose mtime and size are unchanged
+    are not reopened at all; files with a new mtime are rehashed and only
+    rescanned when the content actually changed.
+    """
 
-                original_content = content
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored.get('version') == CACHE_VERSION and stored.get('rule') == self.rule_key():
+                self.entries = stored.get('files', {})
+        except (OSError, ValueError):
+            pass
 
-                # Pattern: Find variable assignments with GetAsync
-                # var something = await _repo.GetAsync(...)
-                pattern = r'(var\s+(\w+)\s*=\s*await\s+[^;]+\.GetAsync\([^)]+\);)'
+    @staticmethod
+    def rule_key():
+        # Verdicts are only valid for the rule that produced them
+        return content_hash(f'{GET_ASYNC_PATTERN.pattern}|{LOOKAHEAD_CHARS}'.encode('utf-8'))
 
-                matches = list(re.finditer(pattern, content))
+    def lookup(self, filepath):
+        """Return (fresh_verdict_or_None, cached_hash, cached_verdict)"""
+        entry = self.entries.get(filepath)
+        if entry is None:
+            return None, None, None
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None, None, None
+        if stat.st_mtime_ns == entry['mtime_ns'] and stat.st_size == entry['size']:
+            return entry['verdict'], entry['hash'], entry['verdict']
+        return None, entry['hash'], entry['verdict']
 
-                for match in matches:
-                    var_name = match.group(2)
-                    get_line = match.group(1)
+    def store(self, filepath, digest, verdict):
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return
+        self.entries[filepath] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'hash': digest,
+            'verdict': verdict,
+        }
+        self.dirty = True
 
-                    # Check if this variable is used in Update or Delete within next 500 chars
-                    start_pos = match.end()
-                    check_region = content[start_pos:start_pos + 500]
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'rule': self.rule_key(), 'files': self.entries}, f)
+        os.replace(tmp_path, self.path)
 
-                    if f'.Update({var_name})' in check_region or f'.Delete({var_name})' in check_region:
-                        # Replace GetAsync with GetTrackedAsync
-                        new_line = get_line.replace('.GetAsync(', '.GetTrackedAsync(')
-                        content = content.replace(get_line, new_line)
-                        print(f"Fixed in {filepath}: {var_name}")
 
-                # Only write if changes were made
-                if content != original_content:
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                    fixed_files.append(filepath)
+def changed_files(base_ref):
+    """.cs files changed against base_ref (committed, staged, unstaged or untracked)"""
+    diff = subprocess.run(['git', 'diff', '--name-only', '--diff-filter=ACMR', base_ref],
+                          cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout
+    untracked = subprocess.run(['git', 'ls-files', '--others', '--exclude-standard'],
+                               cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout
+    names = set(diff.splitlines()) | set(untracked.splitlines())
+    return sorted(os.path.join(REPO_ROOT, name) for name in names if name.endswith('.cs'))
 
-            except Exception as e:
-                print(f"Error processing {filepath}: {e}")
 
+def iter_cs_files(directory):
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            if file.endswith('.cs'):
+                yield os.path.join(root, file)
+
+
+def scan_files(filepaths, write=True, jobs=None, cache=None):
+    """
+    Run process_file over all paths, spread across a process pool.
+    With a cache, unchanged files are answered from it without being opened.
+    Returns (results, cache_hits).
+    """
+    results = []
+    to_scan = []
+    hints = []
+    for path in filepaths:
+        if cache is None:
+            to_scan.append(path)
+            hints.append((None, None))
+            continue
+        verdict, cached_hash, cached_verdict = cache.lookup(path)
+        if verdict is not None and not (verdict and write):
+            results.append((path, list(verdict), False, None, cached_hash))
+        else:
+            to_scan.append(path)
+            hints.append((cached_hash, cached_verdict))
+    cache_hits = len(results)
+
+    if jobs == 1 or len(to_scan) < 2:
+        scanned = [process_file(path, write, *hint) for path, hint in zip(to_scan, hints)]
+    else:
+        jobs = jobs or os.cpu_count() or 1
+        chunksize = max(1, len(to_scan) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            scanned = list(pool.map(process_file, to_scan, [write] * len(to_scan),
+                                    [h for h, _ in hints], [v for _, v in hints], chunksize=chunksize))
+
+    if cache is not None:
+        for filepath, fixed, _, error, digest in scanned:
+            if error is None:
+                # Rewritten files no longer contain the fixed pattern
+                cache.store(filepath, digest, [] if write else fixed)
+
+    return results + scanned, cache_hits
+
+
+def report_results(results, write=True):
+    """Print per-variable fixes and errors. Returns (affected_files, prefiltered_count)."""
+    affected = []
+    prefiltered = 0
+    for filepath, fixed, skipped, error, _ in results:
+        prefiltered += skipped
+        if error:
+            print(f"Error processing {filepath}: {error}")
+            continue
+        for var_name in fixed:
+            print(f"{'Fixed' if write else 'Found'} in {filepath}: {var_name}")
+        if fixed:
+            affected.append(filepath)
+    return affected, prefiltered
+
+
+def fix_tracking_issues(directory, write=True, jobs=None):
+    """Find and fix GetAsync -> Update/Delete patterns"""
+    results, _ = scan_files(iter_cs_files(directory), write, jobs)
+    fixed_files, _ = report_results(results, write)
     return fixed_files
 
-if __name__ == '__main__':
-    handlers_dir = r'C:\Users\Asus\Documents\Visual Studio 2022\ziraai\Business\Handlers'
-    services_dir = r'C:\Users\Asus\Documents\Visual Studio 2022\ziraai\Business\Services'
 
-    print("Scanning Handlers for GetAsync -> Update/Delete patterns...")
-    fixed_handlers = fix_tracking_issues(handlers_dir)
+def run(directories, write=True, jobs=None, cache=None, base_ref=None):
+    """Scan all directories in one pool and print a timed summary. Returns the affected files."""
+    started = time.perf_counter()
+    if base_ref:
+        roots = [os.path.abspath(directory) + os.sep for directory in directories]
+        filepaths = [path for path in changed_files(base_ref) if any(path.startswith(root) for root in roots)]
+    else:
+        filepaths = [path for directory in directories for path in iter_cs_files(directory)]
+    results, cache_hits = scan_files(filepaths, write, jobs, cache)
+    if cache is not None:
+        cache.save()
+    elapsed = time.perf_counter() - started
+
+    affected, prefiltered = report_results(results, write)
 
-    print(f"\n\nFixed {len(fixed_handlers)} Handler files:")
-    for f in fixed_handlers:
+    print(f"\n\n{'Fixed' if write else 'Found'} {len(affected)} files:")
+    for f in affected:
         print(f"  - {f}")
 
-    print("\n\nScanning Services for GetAsync -> Update/Delete patterns...")
-    fixed_services = fix_tracking_issues(services_dir)
+    print(f"\nScanned {len(filepaths)} files ({cache_hits} from cache, {len(filepaths) - cache_hits} opened, "
+          f"{prefiltered} rejected by prefilter) in {elapsed * 1000:.0f} ms")
+    return affected
 
-    print(f"\n\nFixed {len(fixed_services)} Service files:")
-    for f in fixed_services:
-        print(f"  - {f}")
 
-    total = len(fixed_handlers) + len(fixed_services)
-    print(f"\n\n=== TOTAL: {total} files fixed ===")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Find and fix GetAsync -> Update/Delete tracking issues")
+    parser.add_argument('directories', nargs='*', default=DEFAULT_DIRECTORIES,
+                        help='Directories to scan (default: Business/Handlers and Business/Services)')
+    parser.add_argument('--check', action='store_true',
+                        help='Report only, do not rewrite; exit 1 when issues are found (pre-commit)')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--base-ref', default=None,
+                        help='Only scan .cs files changed against this git ref (e.g. origin/master)')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE, help='Scan verdict cache location')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore and do not update the verdict cache')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    print("Scanning for GetAsync -> Update/Delete patterns...")
+    for directory in args.directories:
+        print(f"  {directory}")
+
+    cache = None if args.no_cache else ScanCache(args.cache_file)
+    affected = run(args.directories, write=not args.check, jobs=args.jobs, cache=cache, base_ref=args.base_ref)
+
+    print(f"\n\n=== TOTAL: {len(affected)} files {'with issues' if args.check else 'fixed'} ===")
+    if args.check and affected:
+        sys.exit(1)
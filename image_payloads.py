@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Synthetic image payloads for the upload and storage benchmarks
+
+generate_image() encodes a noise image in JPEG, PNG or WebP whose file size
+is within 10% of a target, so benchmarks can sweep payload sizes without
+shipping sample photos. Pillow is optional: without it only PNG is available
+(through a small stdlib encoder).
+"""
+
+import io
+import os
+import struct
+import zlib
+
+try:
+    from PIL import Image  # optional: JPEG/WebP images
+except ImportError:
+    Image = None
+
+IMAGE_MIME_TYPES = {"jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+IMAGE_EXTENSIONS = {"jpeg": "jpg", "png": "png", "webp": "webp"}
+
+
+def parse_size(text):
+    """'100KB' / '5MB' / '2048' -> bytes"""
+    text = text.strip().upper()
+    for suffix, factor in (("MB", 1024 * 1024), ("KB", 1024), ("B", 1)):
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * factor)
+    return int(text)
+
+
+def encode_png(width, height, pixels):
+    """Minimal RGB PNG encoder so PNG payloads work without Pillow"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+    stride = width * 3
+    raw = b"".join(b"\x00" + pixels[y * stride:(y + 1) * stride] for y in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b""))
+
+
+def encode_image(image_format, width, height):
+    # Noise barely compresses, so pixel count (what the server decodes and resizes) tracks file size
+    pixels = os.urandom(width * height * 3)
+    if Image is None:
+        return encode_png(width, height, pixels)
+    buffer = io.BytesIO()
+    Image.frombytes("RGB", (width, height), pixels).save(buffer, format=image_format.upper(), quality=90)
+    return buffer.getvalue()
+
+
+def generate_image(image_format, target_bytes):
+    """Encode a noise image and rescale it until the file is within 10% of target_bytes"""
+    side = max(16, int((target_bytes / 3) ** 0.5))
+    data = encode_image(image_format, side, side)
+    for _ in range(5):
+        if abs(len(data) - target_bytes) <= target_bytes * 0.1:
+            break
+        side = max(16, int(side * (target_bytes / len(data)) ** 0.5))
+        if image_format == "webp":
+            side = min(side, 16383)  # WebP dimension limit
+        data = encode_image(image_format, side, side)
+    return data, side
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the N8N plant analysis workflow
+
+Consumes plant-analysis-requests and plant-analysis-multi-image-requests and,
+after a configurable simulated processing time, publishes a synthetic result
+built from test_mock_response.json, under the field names the worker's
+PlantAnalysisAsyncResponseDto binds, to the request's ResponseQueue. Lets the
+API -> queue -> worker -> Postgres pipeline be benchmarked offline without AI
+calls.
+
+Latency distributions (seconds):
+    fixed:2            always 2 s
+    uniform:1,5        uniform between 1 and 5 s
+    normal:3,0.5       normal(mean, stddev), clamped at 0
+    lognormal:1,0.4    lognormal(mu, sigma) of the underlying normal
+    exponential:2      exponential with the given mean
+
+Examples:
+    python mock_n8n_service.py --latency lognormal:1,0.4 --concurrency 50
+    python mock_n8n_service.py --latency fixed:0 --failure-rate 0.02 --failure-mode drop
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import random
+import signal
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+import aio_pika
+
+from test_rabbitmq_publisher import (MULTI_IMAGE_RESULT_QUEUE, RABBITMQ_URL, RESULT_QUEUE, check_worker_result,
+                                     load_mock_response, queue_arguments, result_field_name, to_worker_result)
+
+REQUEST_QUEUE = 'plant-analysis-requests'
+MULTI_IMAGE_REQUEST_QUEUE = 'plant-analysis-multi-image-requests'
+
+# Where results go when a request has no ResponseQueue
+DEFAULT_RESULT_QUEUES = {
+    REQUEST_QUEUE: RESULT_QUEUE,
+    MULTI_IMAGE_REQUEST_QUEUE: MULTI_IMAGE_RESULT_QUEUE,
+    'raw-analysis-queue': RESULT_QUEUE,
+}
+
+# Request fields (as the API publishes them) echoed back in the result, as the real workflow does
+ECHOED_FIELDS = (
+    'AnalysisId', 'UserId', 'FarmerId', 'SponsorId', 'SponsorUserId', 'SponsorshipCodeId',
+    'Location', 'GpsCoordinates', 'CropType', 'FieldId', 'UrgencyLevel', 'Notes',
+    'Altitude', 'PlantingDate', 'ExpectedHarvestDate', 'LastFertilization', 'LastIrrigation',
+    'PreviousTreatments', 'WeatherConditions', 'Temperature', 'Humidity', 'SoilType',
+    'ContactInfo', 'AdditionalInfo', 'ImageUrl', 'LeafTopUrl', 'LeafBottomUrl',
+    'PlantOverviewUrl', 'RootUrl',
+)
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """Build a sampler from a 'kind:params' latency specification"""
+    kind, _, raw = spec.partition(':')
+    params = [float(p) for p in raw.split(',') if p]
+
+    if kind == 'fixed' and len(params) == 1:
+        return lambda: params[0]
+    if kind == 'uniform' and len(params) == 2:
+        return lambda: random.uniform(params[0], params[1])
+    if kind == 'normal' and len(params) == 2:
+        return lambda: max(0.0, random.gauss(params[0], params[1]))
+    if kind == 'lognormal' and len(params) == 2:
+        return lambda: random.lognormvariate(params[0], params[1])
+    if kind == 'exponential' and len(params) == 1:
+        return lambda: random.expovariate(1.0 / params[0]) if params[0] > 0 else 0.0
+    raise argparse.ArgumentTypeError(f"Invalid latency distribution: {spec}")
+
+
+class ServiceStats:
+    def __init__(self):
+        self.consumed = 0
+        self.published = 0
+        self.failed = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.started = time.perf_counter()
+
+
+class MockN8NService:
+    def __init__(self, args):
+        self.args = args
+        self.sample_latency = parse_latency(args.latency)
+        self.template = to_worker_result(load_mock_response())
+        self.stats = ServiceStats()
+        self.semaphore = asyncio.Semaphore(args.concurrency)
+        self.declared_queues = set()
+        self.tasks = set()
+        self.channel = None
+
+        # A result the worker cannot match to its analysis is stored as a new row
+        sample = self.build_result({'AnalysisId': 'mock_self_check'}, RESULT_QUEUE, '', datetime.utcnow(), 0, False)
+        check_worker_result(json.dumps(sample), 'mock_self_check')
+
+    def build_result(self, request: Dict, result_queue: str, correlation_id: str,
+                     received_at: datetime, processing_ms: int, failed: bool) -> Dict:
+        result = copy.deepcopy(self.template)
+        for field in ECHOED_FIELDS:
+            if request.get(field) is not None:
+                result[result_field_name(field)] = request[field]
+
+        # The metadata classes have no [JsonProperty] names and bind their members by C# name
+        now = datetime.utcnow().isoformat() + 'Z'
+        result['timestamp'] = now
+        result['rabbitmq_metadata'] = dict(result.get('rabbitmq_metadata', {}),
+                                           CorrelationId=correlation_id,
+                                           ResponseQueue=result_queue,
+                                           ReceivedAt=received_at.isoformat() + 'Z')
+        result['processing_metadata'] = dict(result.get('processing_metadata', {}),
+                                             ProcessingTimestamp=now,
+                                             ReceivedAt=received_at.isoformat() + 'Z',
+                                             ProcessingTimeMs=processing_ms,
+                                             AiModel='mock-n8n')
+
+        if failed:
+            result.update({
+                'success': False,
+                'error': True,
+                'message': 'Analysis failed',
+                'error_message': 'Simulated AI provider failure (mock_n8n_service)',
+                'error_type': 'MockFailure',
+            })
+        return result
+
+    async def ensure_queue(self, name: str):
+        if name not in self.declared_queues:
+            await self.channel.declare_queue(name, durable=True, arguments=queue_arguments(name))
+            self.declared_queues.add(name)
+
+    async def handle(self, source_queue: str, message: aio_pika.abc.AbstractIncomingMessage):
+        async with self.semaphore:
+            self.stats.in_flight += 1
+            received_at = datetime.utcnow()
+            started = time.perf_counter()
+            try:
+                try:
+                    request = json.loads(message.body)
+                except ValueError:
+                    self.stats.rejected += 1
+                    await message.reject(requeue=False)
+                    return
+
+                self.stats.consumed += 1
+                await asyncio.sleep(self.sample_latency())
+
+                failed = random.random() < self.args.failure_rate
+                if failed and self.args.failure_mode == 'drop':
+                    # Simulates a workflow that never answers
+                    self.stats.dropped += 1
+                    await message.ack()
+                    return
+
+                result_queue = request.get('ResponseQueue') or DEFAULT_RESULT_QUEUES.get(source_queue, RESULT_QUEUE)
+                correlation_id = message.correlation_id or request.get('CorrelationId') or ''
+                processing_ms = int((time.perf_counter() - started) * 1000)
+                result = self.build_result(request, result_queue, correlation_id, received_at, processing_ms, failed)
+
+                await self.ensure_queue(result_queue)
+                await self.channel.default_exchange.publish(
+                    aio_pika.Message(
+                        body=json.dumps(result).encode('utf-8'),
+                        correlation_id=correlation_id,
+                        content_type='application/json',
+                        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                    ),
+                    routing_key=result_queue,
+                )
+                await message.ack()
+                self.stats.published += 1
+                if failed:
+                    self.stats.failed += 1
+            except Exception as e:
+                print(f"✗ Error handling message: {e}")
+                await message.nack(requeue=True)
+            finally:
+                self.stats.in_flight -= 1
+
+    async def dispatch(self, source_queue: str, message: aio_pika.abc.AbstractIncomingMessage):
+        # Return to aio-pika straight away; prefetch and the semaphore bound the work
+        task = asyncio.create_task(self.handle(source_queue, message))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def report_loop(self):
+        last_published = 0
+        while True:
+            await asyncio.sleep(self.args.report_interval)
+            stats = self.stats
+            rate = (stats.published - last_published) / self.args.report_interval
+            last_published = stats.published
+            print(f"[{datetime.now():%H:%M:%S}] consumed={stats.consumed} published={stats.published} "
+                  f"failed={stats.failed} dropped={stats.dropped} rejected={stats.rejected} "
+                  f"in_flight={stats.in_flight} rate={rate:.1f} msgs/s")
+
+    async def run(self, stop: asyncio.Event):
+        connection = await aio_pika.connect_robust(self.args.url)
+        async with connection:
+            # Publisher confirms keep results durable before the request is acked
+            self.channel = await connection.channel(publisher_confirms=True)
+            await self.channel.set_qos(prefetch_count=self.args.concurrency)
+
+            for name in self.args.queue:
+                queue = await self.channel.declare_queue(name, durable=True, arguments=queue_arguments(name))
+                await queue.consume(lambda message, source=name: self.dispatch(source, message))
+                print(f"✓ Consuming {name}")
+
+            reporter = asyncio.create_task(self.report_loop())
+            await stop.wait()
+            reporter.cancel()
+
+        elapsed = time.perf_counter() - self.stats.started
+        print(f"\nStopped after {elapsed:.0f} s - consumed {self.stats.consumed}, "
+              f"published {self.stats.published} ({self.stats.published / elapsed:.1f} msgs/s)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Mock N8N analysis service for offline pipeline benchmarks")
+    parser.add_argument('--url', default=RABBITMQ_URL, help='AMQP connection URL')
+    parser.add_argument('--queue', nargs='+', default=[REQUEST_QUEUE, MULTI_IMAGE_REQUEST_QUEUE],
+                        help='Request queues to consume')
+    parser.add_argument('--latency', default='uniform:1,3', help='Simulated processing time distribution')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of requests that fail (0-1)')
+    parser.add_argument('--failure-mode', choices=['error', 'drop'], default='error',
+                        help='error: publish a failed result, drop: never answer')
+    parser.add_argument('--concurrency', type=int, default=20, help='Maximum requests processed at once')
+    parser.add_argument('--report-interval', type=float, default=5, help='Seconds between progress lines')
+    args = parser.parse_args()
+    parse_latency(args.latency)  # fail fast on a bad spec
+    return args
+
+
+def main():
+    args = parse_args()
+    print("=" * 60)
+    print("MOCK N8N ANALYSIS SERVICE")
+    print("=" * 60)
+    print(f"Latency: {args.latency}, failure rate: {args.failure_rate:g} ({args.failure_mode}), "
+          f"concurrency: {args.concurrency}")
+
+    async def runner():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:
+                pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+        await MockN8NService(args).run(stop)
+
+    try:
+        asyncio.run(runner())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Shared latency/throughput helpers for the ZiraAI load and flow test scripts.
+Only uses the standard library so every script can import it.
+"""
+
+import math
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted sequence"""
+    if not sorted_values:
+        return float('nan')
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+
+    rank = (len(sorted_values) - 1) * (pct / 100.0)
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return sorted_values[low]
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(values: Iterable[float]) -> Dict[str, float]:
+    """Count, min, mean, p50/p95/p99 and max of a set of samples"""
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0, "min": float('nan'), "mean": float('nan'), "p50": float('nan'),
+                "p95": float('nan'), "p99": float('nan'), "max": float('nan')}
+
+    return {
+        "count": len(ordered),
+        "min": ordered[0],
+        "mean": sum(ordered) / len(ordered),
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1],
+    }
+
+
+def format_ms(seconds: float) -> str:
+    """Render a duration given in seconds as milliseconds"""
+    if seconds != seconds:  # NaN
+        return "-"
+    return f"{seconds * 1000:.1f} ms"
+
+
+def print_latency_summary(title: str, values: Iterable[float]):
+    """Print a one-block latency summary (values are in seconds)"""
+    stats = summarize(values)
+    print(f"\n{title}")
+    if not stats["count"]:
+        print("   (no samples)")
+        return
+    print(f"   Samples: {stats['count']}")
+    print(f"   Min:  {format_ms(stats['min'])}")
+    print(f"   Mean: {format_ms(stats['mean'])}")
+    print(f"   p50:  {format_ms(stats['p50'])}")
+    print(f"   p95:  {format_ms(stats['p95'])}")
+    print(f"   p99:  {format_ms(stats['p99'])}")
+    print(f"   Max:  {format_ms(stats['max'])}")
+
+
+def print_histogram(title: str, values: Iterable[float], buckets: int = 10, width: int = 40):
+    """Print an ASCII histogram of durations (seconds) with equal-width buckets"""
+    ordered = sorted(values)
+    print(f"\n{title}")
+    if not ordered:
+        print("   (no samples)")
+        return
+
+    low, high = ordered[0], ordered[-1]
+    span = (high - low) or 1e-9
+    counts = [0] * buckets
+    for value in ordered:
+        index = min(int((value - low) / span * buckets), buckets - 1)
+        counts[index] += 1
+
+    peak = max(counts)
+    for index, count in enumerate(counts):
+        start = low + span * index / buckets
+        end = low + span * (index + 1) / buckets
+        bar = "█" * (round(count / peak * width) if peak else 0)
+        print(f"   {format_ms(start):>12} - {format_ms(end):>12} │{bar} {count}")
+
+
+def print_error_breakdown(errors: Counter, total: int):
+    """Print error counts grouped by kind, with their share of all requests"""
+    print("\nErrors:")
+    if not errors:
+        print("   ✓ No errors")
+        return
+    for kind, count in errors.most_common():
+        share = count / total * 100 if total else 0
+        print(f"   ✗ {kind}: {count} ({share:.1f}%)")
+
+
+def print_table(headers: List[str], rows: List[List[object]], title: Optional[str] = None):
+    """Print rows as a box-drawn table sized to its content"""
+    cells = [[str(cell) for cell in row] for row in rows]
+    widths = [len(header) for header in headers]
+    for row in cells:
+        for index, cell in enumerate(row):
+            widths[index] = max(widths[index], len(cell))
+
+    def line(left: str, middle: str, right: str) -> str:
+        return left + middle.join("─" * (width + 2) for width in widths) + right
+
+    def render(row: List[str]) -> str:
+        return "│" + "│".join(f" {cell:<{widths[i]}} " for i, cell in enumerate(row)) + "│"
+
+    if title:
+        print(f"\n{title}")
+    print(line("┌", "┬", "┐"))
+    print(render(headers))
+    print(line("├", "┼", "┤"))
+    for row in cells:
+        print(render(row))
+    print(line("└", "┴", "┘"))
+
+
+def read_rss_kb(pid: int) -> Optional[int]:
+    """Resident set size of a local process from /proc (Linux), or None"""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class RssSampler:
+    """Samples a process' RSS in a background thread and keeps the baseline and peak"""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.baseline: Optional[int] = None
+        self.peak: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = read_rss_kb(self.pid)
+            if rss is not None:
+                if self.baseline is None:
+                    self.baseline = rss
+                self.peak = max(self.peak or rss, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def growth_mb(self) -> Optional[float]:
+        if self.baseline is None:
+            return None
+        return (self.peak - self.baseline) / 1024
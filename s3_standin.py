@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Minimal S3-compatible object store for offline storage benchmarks
+
+Implements the subset of the S3 REST API that CloudflareR2StorageService and
+test_storage_throughput.py use, path-style only: create/head bucket,
+put/get/head/delete object and multipart upload (create, upload part,
+complete, abort). Objects are kept in memory; signatures are accepted
+without checking. Not a general S3 emulator - use moto or MinIO for that.
+
+Examples:
+    python s3_standin.py --port 9000
+    python test_storage_throughput.py --provider standin=http://localhost:9000
+"""
+
+import argparse
+import hashlib
+import threading
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.sax.saxutils import escape
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+S3_NAMESPACE = 'http://s3.amazonaws.com/doc/2006-03-01/'
+
+
+def decode_aws_chunked(body: bytes) -> bytes:
+    """Strip aws-chunked framing (size;chunk-signature=...\\r\\n data \\r\\n ... 0\\r\\n trailers)"""
+    out = []
+    position = 0
+    while True:
+        line_end = body.index(b'\r\n', position)
+        size = int(body[position:line_end].split(b';', 1)[0], 16)
+        if size == 0:
+            return b''.join(out)
+        start = line_end + 2
+        out.append(body[start:start + size])
+        position = start + size + 2
+
+
+class ObjectStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = set()
+        self.objects = {}   # (bucket, key) -> (body, content_type, etag, last_modified)
+        self.uploads = {}   # upload id -> (bucket, key, content_type, {part number: (body, etag)})
+
+
+class S3RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, as the SDK clients expect
+    store: ObjectStore = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _target(self):
+        parts = urlsplit(self.path)
+        bucket, _, key = unquote(parts.path).lstrip('/').partition('/')
+        return bucket, key, parse_qs(parts.query, keep_blank_values=True)
+
+    def _read_body(self) -> bytes:
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';', 1)[0], 16)
+                if size == 0:
+                    # Trailer section ends with an empty line
+                    while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            body = b''.join(chunks)
+        else:
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        if ('aws-chunked' in self.headers.get('Content-Encoding', '')
+                or self.headers.get('x-amz-content-sha256', '').startswith('STREAMING-')):
+            body = decode_aws_chunked(body)
+        return body
+
+    def _send(self, status: int, body: bytes = b'', headers: dict = None, head_only: bool = False):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body and not head_only:
+            self.wfile.write(body)
+
+    def _send_xml(self, status: int, root: str, fields: dict):
+        inner = ''.join(f'<{name}>{escape(str(value))}</{name}>' for name, value in fields.items())
+        body = f'{XML_HEADER}<{root} xmlns="{S3_NAMESPACE}">{inner}</{root}>'.encode('utf-8')
+        self._send(status, body, {'Content-Type': 'application/xml'})
+
+    def _send_error(self, status: int, code: str, message: str):
+        self._send_xml(status, 'Error', {'Code': code, 'Message': message, 'RequestId': uuid.uuid4().hex})
+
+    def do_PUT(self):
+        bucket, key, query = self._target()
+        body = self._read_body()
+        store = self.store
+
+        if not key:
+            with store.lock:
+                store.buckets.add(bucket)
+            self._send(200, headers={'Location': f'/{bucket}'})
+            return
+
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if 'uploadId' in query:
+            upload_id = query['uploadId'][0]
+            with store.lock:
+                upload = store.uploads.get(upload_id)
+                if upload is not None:
+                    upload[3][int(query['partNumber'][0])] = (body, etag)
+            if upload is None:
+                self._send_error(404, 'NoSuchUpload', 'The specified upload does not exist')
+            else:
+                self._send(200, headers={'ETag': etag})
+            return
+
+        content_type = self.headers.get('Content-Type', 'application/octet-stream')
+        with store.lock:
+            store.buckets.add(bucket)
+            store.objects[(bucket, key)] = (body, content_type, etag, datetime.utcnow())
+        self._send(200, headers={'ETag': etag})
+
+    def do_POST(self):
+        bucket, key, query = self._target()
+        body = self._read_body()
+        store = self.store
+
+        if 'uploads' in query:
+            upload_id = uuid.uuid4().hex
+            content_type = self.headers.get('Content-Type', 'application/octet-stream')
+            with store.lock:
+                store.uploads[upload_id] = (bucket, key, content_type, {})
+            self._send_xml(200, 'InitiateMultipartUploadResult',
+                           {'Bucket': bucket, 'Key': key, 'UploadId': upload_id})
+            return
+
+        if 'uploadId' in query:
+            # The part list in the body is trusted to be all parts in order
+            with store.lock:
+                upload = store.uploads.pop(query['uploadId'][0], None)
+            if upload is None:
+                self._send_error(404, 'NoSuchUpload', 'The specified upload does not exist')
+                return
+            _, _, content_type, parts = upload
+            data = b''.join(parts[number][0] for number in sorted(parts))
+            digest = hashlib.md5(b''.join(bytes.fromhex(parts[n][1].strip('"')) for n in sorted(parts)))
+            etag = f'"{digest.hexdigest()}-{len(parts)}"'
+            with store.lock:
+                store.objects[(bucket, key)] = (data, content_type, etag, datetime.utcnow())
+            self._send_xml(200, 'CompleteMultipartUploadResult',
+                           {'Location': f'/{bucket}/{key}', 'Bucket': bucket, 'Key': key, 'ETag': etag})
+            return
+
+        self._send_error(400, 'InvalidRequest', 'Unsupported POST')
+
+    def _get(self, head_only: bool):
+        bucket, key, _ = self._target()
+        store = self.store
+
+        if not key:
+            exists = bucket in store.buckets
+            self._send(200 if exists else 404, head_only=True)
+            return
+
+        entry = store.objects.get((bucket, key))
+        if entry is None:
+            if head_only:
+                self._send(404, head_only=True)
+            else:
+                self._send_error(404, 'NoSuchKey', 'The specified key does not exist.')
+            return
+
+        body, content_type, etag, modified = entry
+        self._send(200, body, {
+            'Content-Type': content_type,
+            'ETag': etag,
+            'Last-Modified': modified.strftime('%a, %d %b %Y %H:%M:%S GMT'),
+        }, head_only=head_only)
+
+    def do_GET(self):
+        self._get(head_only=False)
+
+    def do_HEAD(self):
+        self._get(head_only=True)
+
+    def do_DELETE(self):
+        bucket, key, query = self._target()
+        with self.store.lock:
+            if 'uploadId' in query:
+                self.store.uploads.pop(query['uploadId'][0], None)
+            else:
+                self.store.objects.pop((bucket, key), None)
+        self._send(204)
+
+
+def make_server(host: str, port: int) -> ThreadingHTTPServer:
+    """Server with its own empty store"""
+    handler = type('Handler', (S3RequestHandler,), {'store': ObjectStore()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_server(host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Start the stand-in on a background thread; port 0 picks a free port"""
+    server = make_server(host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Minimal in-memory S3-compatible server")
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address')
+    parser.add_argument('--port', type=int, default=9000, help='Port to listen on')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    server = make_server(args.host, args.port)
+    print(f"S3 stand-in listening on http://{args.host}:{args.port} (path-style, in memory)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
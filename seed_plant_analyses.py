@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""
+Bulk-load a production-sized synthetic dataset into local Postgres
+
+Writes sponsors (each with an active SponsorProfile, which the sponsor
+analysis lists require), farmers (with their UserGroups rows), one
+SponsorshipPurchase per sponsor, one SponsorshipCode per farmer and millions of
+PlantAnalyses rows with COPY ... FROM STDIN. Rows are produced by generators and streamed
+straight into COPY, so memory stays flat however many rows are written, and
+every table is split into id ranges that worker processes generate and load
+in parallel.
+
+Ids are reserved up front above the current maximum of every table, so
+workers can compute foreign keys without asking the database; the identity
+sequences are moved past the new rows afterwards. Columns that are NOT NULL
+without a default and that the seeder has no generator for get a neutral value
+for their type, so the seeder keeps working when the schema grows.
+
+Data shape: analysis dates spread over --days with more recent activity,
+per-farmer analysis counts skewed (a few farmers own most analyses, like in
+production), --sponsored-share of farmers redeemed a sponsor's code and their
+analyses carry SponsorshipCodeId / SponsorUserId / SponsorCompanyId.
+
+Seeded rows are tagged (AnalysisId 'seed_*', e-mails '@seed.ziraai.local',
+codes 'SEED-*') and can be removed with --purge. Seeded accounts log in with
+--password.
+
+Examples:
+    python seed_plant_analyses.py --analyses 2000000 --farmers 50000 --sponsors 200
+    python seed_plant_analyses.py --analyses 5000000 --jobs 12 --analyze
+    python seed_plant_analyses.py --purge
+"""
+
+import argparse
+import hashlib
+import hmac
+import math
+import operator
+import os
+import random
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import psycopg2
+
+from analysis_db import DB_CONFIG
+
+SEED_EMAIL_DOMAIN = "seed.ziraai.local"
+SEED_ANALYSIS_PREFIX = "seed_"
+SEED_CODE_PREFIX = "SEED"
+DEFAULT_PASSWORD = "Seed123!"
+
+CHUNK_ROWS = 200_000
+COPY_BUFFER = 1 << 20
+
+CROPS = {  # crop -> (species, varieties)
+    "tomato": ("Solanum lycopersicum", ["Cherry", "Roma", "Beefsteak"]),
+    "wheat": ("Triticum aestivum", ["Bezostaya", "Esperia", "Pehlivan"]),
+    "corn": ("Zea mays", ["Dent", "Sweet", "Flint"]),
+    "cotton": ("Gossypium hirsutum", ["Carmen", "Stoneville", "Flash"]),
+    "grape": ("Vitis vinifera", ["Sultani", "Kalecik Karasi", "Narince"]),
+    "pepper": ("Capsicum annuum", ["Carliston", "Kapia", "Sivri"]),
+    "hazelnut": ("Corylus avellana", ["Tombul", "Palaz", "Sivri"]),
+    "olive": ("Olea europaea", ["Gemlik", "Ayvalik", "Memecik"]),
+}
+GROWTH_STAGES = ["seedling", "vegetative", "flowering", "fruiting", "ripening"]
+CONCERNS = ["Nitrogen deficiency", "Early blight", "Powdery mildew", "Aphid infestation", "Water stress",
+            "Leaf rust", "Potassium deficiency", "No significant issues"]
+SOIL_TYPES = ["clay", "loam", "sandy", "silt", "clay loam"]
+WEATHER = ["sunny", "cloudy", "rainy", "humid", "windy"]
+URGENCY = ["low", "medium", "high"]
+LOCATIONS = [("Antalya", 36.9, 30.7), ("Konya", 37.9, 32.5), ("Adana", 37.0, 35.3), ("Izmir", 38.4, 27.1),
+             ("Bursa", 40.2, 29.1), ("Samsun", 41.3, 36.3), ("Sanliurfa", 37.2, 38.8), ("Manisa", 38.6, 27.4)]
+# AnalysisStatus mix of a long-running system: almost everything finished
+STATUSES = [("Completed", 0.93), ("Failed", 0.03), ("Processing", 0.02), ("pending", 0.02)]
+FIRST_NAMES = ["Ahmet", "Mehmet", "Ayse", "Fatma", "Mustafa", "Emine", "Ali", "Hatice", "Huseyin", "Zeynep"]
+LAST_NAMES = ["Yilmaz", "Kaya", "Demir", "Sahin", "Celik", "Yildiz", "Aydin", "Ozturk", "Arslan", "Dogan"]
+UNIT_PRICES = [49.99, 99.99, 199.99, 499.99]
+
+
+# ---- COPY text format -------------------------------------------------------
+
+ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+NEEDS_ESCAPE = re.compile(r"[\\\t\n\r]").search
+
+
+def copy_text(value: str) -> str:
+    return value.translate(ESCAPES) if NEEDS_ESCAPE(value) else value
+
+
+# Dispatch on the exact type: this runs once per field, tens of millions of times per seed
+FORMATTERS = {
+    type(None): lambda value: "\\N",
+    bool: lambda value: "t" if value else "f",
+    int: str,
+    float: repr,
+    str: copy_text,
+    datetime: lambda value: value.isoformat(sep=" "),
+    bytes: lambda value: "\\\\x" + value.hex(),
+}
+
+
+def copy_value(value) -> str:
+    return FORMATTERS.get(type(value), str)(value)
+
+
+class CopyStream:
+    """File-like object that psycopg2's copy_expert reads; pulls rows from a generator on demand"""
+
+    def __init__(self, rows: Iterator[Tuple]):
+        self.rows = rows
+        self.buffer = b""
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        size = COPY_BUFFER if size is None or size < 0 else size
+        parts = [self.buffer]
+        length = len(self.buffer)
+        for row in self.rows:
+            line = ("\t".join(map(copy_value, row)) + "\n").encode("utf-8")
+            parts.append(line)
+            length += len(line)
+            self.count += 1
+            if length >= size:
+                break
+        data = b"".join(parts)
+        self.buffer = data[size:]
+        return data[:size]
+
+    def readline(self, size: int = -1) -> bytes:
+        return self.read(size)
+
+
+# ---- schema ------------------------------------------------------------------
+
+class Table:
+    """Target columns of one table: generated ones plus fillers for other NOT NULL columns"""
+
+    def __init__(self, name: str, key: str, generated: List[str], schema: Dict[str, Tuple[str, bool]]):
+        self.name = name
+        self.key = key
+        missing = [column for column in generated if column not in schema]
+        if missing:
+            print(f"   {name}: columns not in this database, skipped: {', '.join(missing)}")
+        self.generated = [column for column in generated if column in schema]
+        self.fillers = {column: filler_for(name, column, data_type)
+                        for column, (data_type, needs_value) in schema.items()
+                        if needs_value and column not in generated}
+        self.columns = self.generated + list(self.fillers)
+        self._positions = [generated.index(column) for column in self.generated]
+        self._filler_values = tuple(self.fillers.values())
+
+    def project(self, rows: Iterator[Tuple]) -> Iterator[Tuple]:
+        """Generator rows (in the order of the requested columns) -> rows in `columns` order"""
+        fillers = self._filler_values
+        if self._positions == list(range(len(self._positions))):
+            if not fillers:
+                return rows
+            return (row[:len(self._positions)] + fillers for row in rows)
+        select = operator.itemgetter(*self._positions, *self._positions[:1])  # always returns a tuple
+        width = len(self._positions)
+        return (select(row)[:width] + fillers for row in rows)
+
+    def copy_sql(self) -> str:
+        columns = ", ".join(f'"{column}"' for column in self.columns)
+        return f'COPY "{self.name}" ({columns}) FROM STDIN'
+
+
+FILLERS = {
+    "integer": 0, "bigint": 0, "smallint": 0, "numeric": 0, "real": 0, "double precision": 0,
+    "boolean": False, "text": "", "character varying": "", "character": "", "jsonb": "{}", "json": "{}",
+    "bytea": b"", "uuid": "00000000-0000-0000-0000-000000000000",
+}
+
+
+def filler_for(table: str, column: str, data_type: str):
+    if data_type.startswith("timestamp") or data_type == "date":
+        return datetime(2025, 1, 1)
+    if data_type in FILLERS:
+        return FILLERS[data_type]
+    raise SystemExit(f"✗ {table}.{column} is NOT NULL ({data_type}) and has no generator or filler")
+
+
+def read_schema(conn, table: str) -> Dict[str, Tuple[str, bool]]:
+    """column -> (data type, needs a value: NOT NULL without default or identity)"""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT column_name, data_type,
+                   is_nullable = 'NO' AND column_default IS NULL AND is_identity = 'NO'
+            FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = %s
+        """, (table,))
+        schema = {name: (data_type, needs_value) for name, data_type, needs_value in cursor.fetchall()}
+    if not schema:
+        raise SystemExit(f'✗ Table "{table}" not found - run the API migrations first')
+    return schema
+
+
+def next_id(conn, table: str, key: str) -> int:
+    with conn.cursor() as cursor:
+        cursor.execute(f'SELECT COALESCE(MAX("{key}"), 0) + 1 FROM "{table}"')
+        return cursor.fetchone()[0]
+
+
+# ---- data model ----------------------------------------------------------------
+
+class Plan:
+    """Reserved id ranges and shape parameters; shared by every worker process"""
+
+    def __init__(self, args, user_base: int, profile_base: int, purchase_base: int, code_base: int,
+                 analysis_base: int, tier_ids: List[int], farmer_group: int, sponsor_group: int, password: str):
+        self.sponsors = args.sponsors
+        self.farmers = args.farmers
+        self.analyses = args.analyses
+        self.days = args.days
+        self.skew = args.skew
+        self.sponsored_share = args.sponsored_share
+        self.seed = args.seed
+        self.user_base = user_base
+        self.profile_base = profile_base
+        self.purchase_base = purchase_base
+        self.code_base = code_base
+        self.analysis_base = analysis_base
+        self.tier_ids = tier_ids
+        self.farmer_group = farmer_group
+        self.sponsor_group = sponsor_group
+        self.now = datetime.now().replace(microsecond=0)
+        salt = hashlib.sha512(f"seed-salt-{args.seed}".encode()).digest() * 2  # HMACSHA512 keys are 128 bytes
+        self.password_salt = salt
+        self.password_hash = hmac.new(salt, password.encode("utf-8"), hashlib.sha512).digest()
+
+    # Sponsors take the first user ids, farmers follow
+    def sponsor_user(self, sponsor: int) -> int:
+        return self.user_base + sponsor
+
+    def farmer_user(self, farmer: int) -> int:
+        return self.user_base + self.sponsors + farmer
+
+    def is_sponsored(self, farmer: int) -> bool:
+        return (farmer * 2654435761 % 1000) < self.sponsored_share * 1000
+
+    def sponsor_of(self, farmer: int) -> int:
+        return farmer % self.sponsors
+
+    def code_of(self, farmer: int) -> int:
+        return self.code_base + farmer
+
+    def tier_of(self, sponsor: int) -> int:
+        return self.tier_ids[sponsor % len(self.tier_ids)]
+
+    # Every sponsor buys one code per farmer it is dealt (farmer % sponsors)
+    def codes_bought(self, sponsor: int) -> int:
+        return len(range(sponsor, self.farmers, self.sponsors))
+
+    def codes_redeemed(self, sponsor: int) -> int:
+        return sum(1 for farmer in range(sponsor, self.farmers, self.sponsors) if self.is_sponsored(farmer))
+
+    def unit_price(self, sponsor: int) -> float:
+        return UNIT_PRICES[sponsor % len(UNIT_PRICES)]
+
+
+def generate_users(plan: Plan, start: int, stop: int) -> Iterator[Tuple]:
+    rng = random.Random(plan.seed * 1_000_003 + start)
+    for index in range(start, stop):
+        is_sponsor = index < plan.sponsors
+        user_id = plan.user_base + index
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        registered = plan.now - timedelta(days=rng.uniform(plan.days, plan.days * 2))
+        yield (user_id, 10_000_000_000 + user_id, f"{name} Tarim A.S." if is_sponsor else name,
+               f"{'sponsor' if is_sponsor else 'farmer'}{user_id}@{SEED_EMAIL_DOMAIN}",
+               f"05{user_id % 1_000_000_000:09d}", True, registered, registered, "Person",
+               plan.password_salt, plan.password_hash, True)
+
+
+USER_COLUMNS = ["UserId", "CitizenId", "FullName", "Email", "MobilePhones", "Status", "RecordDate",
+                "UpdateContactDate", "AuthenticationProviderType", "PasswordSalt", "PasswordHash", "IsActive"]
+
+
+def generate_user_groups(plan: Plan, start: int, stop: int) -> Iterator[Tuple]:
+    for index in range(start, stop):
+        yield plan.user_base + index, plan.sponsor_group if index < plan.sponsors else plan.farmer_group
+
+
+USER_GROUP_COLUMNS = ["UserId", "GroupId"]
+
+
+def generate_profiles(plan: Plan, start: int, stop: int) -> Iterator[Tuple]:
+    for sponsor in range(start, stop):
+        user_id = plan.sponsor_user(sponsor)
+        quantity = plan.codes_bought(sponsor)
+        created = plan.now - timedelta(days=plan.days + 30)
+        yield (plan.profile_base + sponsor, user_id, f"Sponsor {sponsor} Tarim A.S.",
+               f"sponsor{user_id}@{SEED_EMAIL_DOMAIN}", f"05{user_id % 1_000_000_000:09d}",
+               LOCATIONS[sponsor % len(LOCATIONS)][0], "Turkey", True, "Agriculture", "B2B", True, True,
+               1, quantity, plan.codes_redeemed(sponsor), round(plan.unit_price(sponsor) * quantity, 2), created)
+
+
+PROFILE_COLUMNS = ["Id", "SponsorId", "CompanyName", "ContactEmail", "ContactPhone", "City", "Country",
+                   "IsVerifiedCompany", "CompanyType", "BusinessModel", "IsVerified", "IsActive", "TotalPurchases",
+                   "TotalCodesGenerated", "TotalCodesRedeemed", "TotalInvestment", "CreatedDate"]
+
+
+def generate_purchases(plan: Plan, start: int, stop: int) -> Iterator[Tuple]:
+    rng = random.Random(plan.seed * 1_000_033 + start)
+    for sponsor in range(start, stop):
+        quantity = plan.codes_bought(sponsor)
+        used = plan.codes_redeemed(sponsor)
+        purchased = plan.now - timedelta(days=plan.days + rng.uniform(0, 30))
+        unit_price = plan.unit_price(sponsor)
+        yield (plan.purchase_base + sponsor, plan.sponsor_user(sponsor), plan.tier_of(sponsor), quantity,
+               unit_price, round(unit_price * quantity, 2), "TRY", purchased, "CreditCard",
+               f"{SEED_CODE_PREFIX}-{plan.purchase_base + sponsor}", "Completed", purchased,
+               f"Sponsor {sponsor} Tarim A.S.", quantity, used, SEED_CODE_PREFIX, plan.days + 365,
+               "Active", purchased)
+
+
+PURCHASE_COLUMNS = ["Id", "SponsorId", "SubscriptionTierId", "Quantity", "UnitPrice", "TotalAmount", "Currency",
+                    "PurchaseDate", "PaymentMethod", "PaymentReference", "PaymentStatus", "PaymentCompletedDate",
+                    "CompanyName", "CodesGenerated", "CodesUsed", "CodePrefix", "ValidityDays", "Status",
+                    "CreatedDate"]
+
+
+def generate_codes(plan: Plan, start: int, stop: int) -> Iterator[Tuple]:
+    rng = random.Random(plan.seed * 1_000_037 + start)
+    for farmer in range(start, stop):
+        sponsor = plan.sponsor_of(farmer)
+        created = plan.now - timedelta(days=plan.days)
+        used = plan.is_sponsored(farmer)
+        code_id = plan.code_of(farmer)
+        yield (code_id, f"{SEED_CODE_PREFIX}-{code_id:09d}", plan.sponsor_user(sponsor), plan.tier_of(sponsor),
+               plan.purchase_base + sponsor, used, plan.farmer_user(farmer) if used else None,
+               created + timedelta(days=rng.uniform(0, 5)) if used else None,
+               created, created + timedelta(days=plan.days + 365), True)
+
+
+CODE_COLUMNS = ["Id", "Code", "SponsorId", "SubscriptionTierId", "SponsorshipPurchaseId", "IsUsed", "UsedByUserId",
+                "UsedDate", "CreatedDate", "ExpiryDate", "IsActive"]
+
+
+def pick(rng: random.Random, weighted: List[Tuple[str, float]]) -> str:
+    point = rng.random()
+    for value, weight in weighted:
+        point -= weight
+        if point < 0:
+            return value
+    return weighted[-1][0]
+
+
+def generate_analyses(plan: Plan, start: int, stop: int) -> Iterator[Tuple]:
+    rng = random.Random(plan.seed * 1_000_039 + start)
+    crops = list(CROPS.items())
+    span = plan.days * 86400
+    for index in range(start, stop):
+        analysis_id = plan.analysis_base + index
+        # u ** skew puts most analyses on low farmer indexes: a few heavy users, a long tail of light ones
+        farmer = min(int(plan.farmers * rng.random() ** plan.skew), plan.farmers - 1)
+        user_id = plan.farmer_user(farmer)
+        # sqrt pushes dates towards "now": activity grows over the period
+        created = plan.now - timedelta(seconds=span * (1 - math.sqrt(rng.random())))
+        status = pick(rng, STATUSES)
+        completed = status == "Completed"
+        crop, (species, varieties) = crops[rng.randrange(len(crops))]
+        location, latitude, longitude = LOCATIONS[rng.randrange(len(LOCATIONS))]
+        health = rng.randint(35, 98) if completed else 0
+        concern = rng.choice(CONCERNS) if completed else None
+
+        sponsored = plan.is_sponsored(farmer)
+        sponsor_user = plan.sponsor_user(plan.sponsor_of(farmer)) if sponsored else None
+
+        yield (created, status, True, created, created + timedelta(seconds=rng.uniform(20, 90)) if completed else None,
+               f"{SEED_ANALYSIS_PREFIX}{analysis_id}_{created:%Y%m%d_%H%M%S}", created,
+               user_id, f"F{user_id:06d}", str(sponsor_user) if sponsored else None,
+               plan.code_of(farmer) if sponsored else None, sponsor_user, sponsor_user,
+               location, round(latitude + rng.uniform(-0.5, 0.5), 6), round(longitude + rng.uniform(-0.5, 0.5), 6),
+               rng.randint(0, 1500), f"FIELD-{farmer % 997:03d}-{rng.randrange(5)}", crop,
+               rng.choice(WEATHER), round(rng.uniform(5, 38), 1), round(rng.uniform(20, 95), 1),
+               rng.choice(SOIL_TYPES), rng.choice(URGENCY),
+               species if completed else None, rng.choice(varieties) if completed else None,
+               rng.choice(GROWTH_STAGES) if completed else None,
+               health, concern, f"Seeded {crop} analysis: {concern}" if completed else "",
+               f"https://storage.seed.ziraai.local/plant-images/{analysis_id}.jpg",
+               f"plant-images/{analysis_id}.jpg", round(rng.uniform(80, 900), 2),
+               "gpt-4o-mini" if completed else "", "2.0" if completed else "",
+               rng.randint(2500, 9000) if completed else 0, created, False)
+
+
+ANALYSIS_COLUMNS = ["AnalysisDate", "AnalysisStatus", "Status", "CreatedDate", "UpdatedDate", "AnalysisId",
+                    "Timestamp", "UserId", "FarmerId", "SponsorId", "SponsorshipCodeId", "SponsorUserId",
+                    "SponsorCompanyId", "Location", "Latitude", "Longitude", "Altitude", "FieldId", "CropType",
+                    "WeatherConditions", "Temperature", "Humidity", "SoilType", "UrgencyLevel", "PlantSpecies",
+                    "PlantVariety", "GrowthStage", "OverallHealthScore", "PrimaryConcern", "FarmerFriendlySummary",
+                    "ImageUrl", "ImagePath", "ImageSizeKb", "AiModel", "WorkflowVersion", "TotalTokens",
+                    "ProcessingTimestamp", "IsOnBehalfOf"]
+
+# table name -> (key column, generated columns, generator); loaded in this order for the foreign keys
+TABLES: Dict[str, Tuple[str, List[str], Callable[[Plan, int, int], Iterator[Tuple]]]] = {
+    "Users": ("UserId", USER_COLUMNS, generate_users),
+    "UserGroups": ("UserId", USER_GROUP_COLUMNS, generate_user_groups),
+    "SponsorProfiles": ("Id", PROFILE_COLUMNS, generate_profiles),
+    "SponsorshipPurchases": ("Id", PURCHASE_COLUMNS, generate_purchases),
+    "SponsorshipCodes": ("Id", CODE_COLUMNS, generate_codes),
+    "PlantAnalyses": ("Id", ANALYSIS_COLUMNS, generate_analyses),
+}
+
+
+# ---- loading -------------------------------------------------------------------
+
+def connect(db_config: Dict):
+    conn = psycopg2.connect(**db_config)
+    with conn.cursor() as cursor:
+        # A lost seed batch is simply re-run; no need to wait for the WAL flush on every commit
+        cursor.execute("SET synchronous_commit = off")
+    return conn
+
+
+def load_chunk(db_config: Dict, table: Table, plan: Plan, start: int, stop: int) -> Tuple[int, float]:
+    """Generate rows [start, stop) of one table and COPY them in; runs in a worker process"""
+    started = time.perf_counter()
+    generator = TABLES[table.name][2]
+    conn = connect(db_config)
+    try:
+        stream = CopyStream(table.project(generator(plan, start, stop)))
+        with conn.cursor() as cursor:
+            cursor.copy_expert(table.copy_sql(), stream, size=COPY_BUFFER)
+        conn.commit()
+    finally:
+        conn.close()
+    return stream.count, time.perf_counter() - started
+
+
+def load_table(pool: ProcessPoolExecutor, db_config: Dict, table: Table, plan: Plan, rows: int, chunk_rows: int):
+    started = time.perf_counter()
+    chunks = [(start, min(start + chunk_rows, rows)) for start in range(0, rows, chunk_rows)]
+    futures = [pool.submit(load_chunk, db_config, table, plan, start, stop) for start, stop in chunks]
+    loaded = 0
+    for future in futures:
+        count, _ = future.result()
+        loaded += count
+    elapsed = time.perf_counter() - started
+    print(f"   {table.name}: {loaded:,} rows in {elapsed:.1f} s ({loaded / elapsed:,.0f} rows/s, "
+          f"{len(chunks)} chunks)")
+    return loaded, elapsed
+
+
+def reset_sequence(conn, table: str, key: str):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", (f'"{table}"', key))
+        sequence = cursor.fetchone()[0]
+        if sequence:
+            cursor.execute(f'SELECT setval(%s, (SELECT MAX("{key}") FROM "{table}"))', (sequence,))
+
+
+def lookup_ids(conn) -> Tuple[List[int], int, int]:
+    with conn.cursor() as cursor:
+        cursor.execute('SELECT "Id" FROM "SubscriptionTiers" WHERE "TierName" <> %s ORDER BY "Id"', ("Trial",))
+        tier_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute('SELECT "GroupName", "Id" FROM "Groups" WHERE "GroupName" IN (%s, %s)', ("Farmer", "Sponsor"))
+        groups = dict(cursor.fetchall())
+    if not tier_ids:
+        raise SystemExit('✗ No rows in "SubscriptionTiers" - run the API once to seed them')
+    if "Farmer" not in groups or "Sponsor" not in groups:
+        raise SystemExit('✗ "Groups" needs Farmer and Sponsor rows - run the API once to seed them')
+    return tier_ids, groups["Farmer"], groups["Sponsor"]
+
+
+def purge(conn):
+    """Delete everything an earlier run seeded, children first"""
+    statements = [
+        ('PlantAnalyses', 'DELETE FROM "PlantAnalyses" WHERE "AnalysisId" LIKE %s', SEED_ANALYSIS_PREFIX + "%"),
+        ('SponsorshipCodes', 'DELETE FROM "SponsorshipCodes" WHERE "Code" LIKE %s', SEED_CODE_PREFIX + "-%"),
+        ('SponsorshipPurchases', 'DELETE FROM "SponsorshipPurchases" WHERE "PaymentReference" LIKE %s',
+         SEED_CODE_PREFIX + "-%"),
+        ('SponsorProfiles', 'DELETE FROM "SponsorProfiles" WHERE "SponsorId" IN '
+                            '(SELECT "UserId" FROM "Users" WHERE "Email" LIKE %s)', "%@" + SEED_EMAIL_DOMAIN),
+        ('UserGroups', 'DELETE FROM "UserGroups" WHERE "UserId" IN '
+                       '(SELECT "UserId" FROM "Users" WHERE "Email" LIKE %s)', "%@" + SEED_EMAIL_DOMAIN),
+        ('Users', 'DELETE FROM "Users" WHERE "Email" LIKE %s', "%@" + SEED_EMAIL_DOMAIN),
+    ]
+    with conn.cursor() as cursor:
+        for table, sql, pattern in statements:
+            started = time.perf_counter()
+            cursor.execute(sql, (pattern,))
+            print(f"   {table}: {cursor.rowcount:,} rows deleted in {time.perf_counter() - started:.1f} s")
+    conn.commit()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="COPY-based synthetic PlantAnalyses dataset seeder")
+    parser.add_argument("--analyses", type=int, default=1_000_000, help="PlantAnalyses rows to create")
+    parser.add_argument("--farmers", type=int, default=20_000, help="Farmer accounts to create")
+    parser.add_argument("--sponsors", type=int, default=100, help="Sponsor accounts to create")
+    parser.add_argument("--sponsored-share", type=float, default=0.4,
+                        help="Fraction of farmers that redeemed a sponsor code")
+    parser.add_argument("--days", type=int, default=365, help="Period the analyses are spread over")
+    parser.add_argument("--skew", type=float, default=2.0,
+                        help="Concentration of analyses on heavy farmers (1 = uniform)")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password of every seeded account")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 4, help="Worker processes")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows per COPY (per worker task)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (same seed, same data)")
+    parser.add_argument("--analyze", action="store_true", help="ANALYZE the seeded tables afterwards")
+    parser.add_argument("--purge", action="store_true", help="Delete previously seeded rows and exit")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.sponsors < 1 or args.farmers < 1:
+        raise SystemExit("--sponsors and --farmers must be at least 1")
+
+    print("=" * 60)
+    print("PLANT ANALYSES DATASET SEEDER")
+    print("=" * 60)
+    print(f"Database: {DB_CONFIG['database']}@{DB_CONFIG['host']}")
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        if args.purge:
+            purge(conn)
+            return
+
+        print(f"Sponsors: {args.sponsors:,}, farmers: {args.farmers:,}, analyses: {args.analyses:,}, "
+              f"jobs: {args.jobs}")
+        tables = {name: Table(name, key, columns, read_schema(conn, name))
+                  for name, (key, columns, _) in TABLES.items()}
+        for table in tables.values():
+            if table.fillers:
+                print(f"   {table.name}: filling {', '.join(table.fillers)}")
+
+        tier_ids, farmer_group, sponsor_group = lookup_ids(conn)
+        plan = Plan(args,
+                    user_base=next_id(conn, "Users", "UserId"),
+                    profile_base=next_id(conn, "SponsorProfiles", "Id"),
+                    purchase_base=next_id(conn, "SponsorshipPurchases", "Id"),
+                    code_base=next_id(conn, "SponsorshipCodes", "Id"),
+                    analysis_base=next_id(conn, "PlantAnalyses", "Id"),
+                    tier_ids=tier_ids, farmer_group=farmer_group, sponsor_group=sponsor_group,
+                    password=args.password)
+        conn.commit()
+
+        rows = {
+            "Users": args.sponsors + args.farmers,
+            "UserGroups": args.sponsors + args.farmers,
+            "SponsorProfiles": args.sponsors,
+            "SponsorshipPurchases": args.sponsors,
+            "SponsorshipCodes": args.farmers,
+            "PlantAnalyses": args.analyses,
+        }
+
+        print("\nLoading...")
+        started = time.perf_counter()
+        total = 0
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            for name, table in tables.items():
+                loaded, _ = load_table(pool, DB_CONFIG, table, plan, rows[name], args.chunk_rows)
+                total += loaded
+
+        for name, table in tables.items():
+            if name != "UserGroups":
+                reset_sequence(conn, name, table.key)
+        conn.commit()
+        elapsed = time.perf_counter() - started
+        print(f"\n✓ {total:,} rows in {elapsed:.1f} s ({total / elapsed:,.0f} rows/s)")
+
+        if args.analyze:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                for name in tables:
+                    analyze_started = time.perf_counter()
+                    cursor.execute(f'ANALYZE "{name}"')
+                    print(f"   ANALYZE {name}: {time.perf_counter() - analyze_started:.1f} s")
+        print(f"\nSeeded accounts: sponsor{plan.sponsor_user(0)}@{SEED_EMAIL_DOMAIN} ... "
+              f"farmer{plan.farmer_user(0)}@{SEED_EMAIL_DOMAIN} ..., password {args.password!r}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
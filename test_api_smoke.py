@@ -0,0 +1,653 @@
+#!/usr/bin/env python3
+"""
+API throughput smoke suite - GENERATED, do not edit
+
+Source: swagger.json
+Regenerate: python claudedocs/swagger_to_postman.py --target benchmark
+Run: python test_api_smoke.py --help
+"""
+
+from api_smoke_runner import main
+
+ENDPOINTS = [
+    {'name': 'GET /api/admin/analytics/user-statistics',
+     'tag': 'AdminAnalytics',
+     'method': 'GET',
+     'path': '/api/admin/analytics/user-statistics',
+     'query': {}},
+    {'name': 'GET /api/admin/analytics/subscription-statistics',
+     'tag': 'AdminAnalytics',
+     'method': 'GET',
+     'path': '/api/admin/analytics/subscription-statistics',
+     'query': {}},
+    {'name': 'GET /api/admin/analytics/sponsorship',
+     'tag': 'AdminAnalytics',
+     'method': 'GET',
+     'path': '/api/admin/analytics/sponsorship',
+     'query': {}},
+    {'name': 'GET /api/admin/analytics/dashboard-overview',
+     'tag': 'AdminAnalytics',
+     'method': 'GET',
+     'path': '/api/admin/analytics/dashboard-overview',
+     'query': {}},
+    {'name': 'GET /api/admin/analytics/activity-logs',
+     'tag': 'AdminAnalytics',
+     'method': 'GET',
+     'path': '/api/admin/analytics/activity-logs',
+     'query': {}},
+    {'name': 'GET /api/admin/analytics/export',
+     'tag': 'AdminAnalytics',
+     'method': 'GET',
+     'path': '/api/admin/analytics/export',
+     'query': {}},
+    {'name': 'GET /api/admin/audit',
+     'tag': 'AdminAudit',
+     'method': 'GET',
+     'path': '/api/admin/audit',
+     'query': {}},
+    {'name': 'GET /api/admin/audit/admin/{adminUserId}',
+     'tag': 'AdminAudit',
+     'method': 'GET',
+     'path': '/api/admin/audit/admin/{adminUserId}',
+     'query': {}},
+    {'name': 'GET /api/admin/audit/target/{targetUserId}',
+     'tag': 'AdminAudit',
+     'method': 'GET',
+     'path': '/api/admin/audit/target/{targetUserId}',
+     'query': {}},
+    {'name': 'GET /api/admin/audit/on-behalf-of',
+     'tag': 'AdminAudit',
+     'method': 'GET',
+     'path': '/api/admin/audit/on-behalf-of',
+     'query': {}},
+    {'name': 'GET /api/admin/plant-analysis/on-behalf-of',
+     'tag': 'AdminPlantAnalysis',
+     'method': 'GET',
+     'path': '/api/admin/plant-analysis/on-behalf-of',
+     'query': {}},
+    {'name': 'GET /api/admin/plant-analysis/user/{userId}',
+     'tag': 'AdminPlantAnalysis',
+     'method': 'GET',
+     'path': '/api/admin/plant-analysis/user/{userId}',
+     'query': {}},
+    {'name': 'GET /api/admin/sponsorship/purchases',
+     'tag': 'AdminSponsorship',
+     'method': 'GET',
+     'path': '/api/admin/sponsorship/purchases',
+     'query': {}},
+    {'name': 'GET /api/admin/sponsorship/purchases/{purchaseId}',
+     'tag': 'AdminSponsorship',
+     'method': 'GET',
+     'path': '/api/admin/sponsorship/purchases/{purchaseId}',
+     'query': {}},
+    {'name': 'GET /api/admin/sponsorship/statistics',
+     'tag': 'AdminSponsorship',
+     'method': 'GET',
+     'path': '/api/admin/sponsorship/statistics',
+     'query': {}},
+    {'name': 'GET /api/admin/sponsorship/codes',
+     'tag': 'AdminSponsorship',
+     'method': 'GET',
+     'path': '/api/admin/sponsorship/codes',
+     'query': {}},
+    {'name': 'GET /api/admin/sponsorship/codes/{codeId}',
+     'tag': 'AdminSponsorship',
+     'method': 'GET',
+     'path': '/api/admin/sponsorship/codes/{codeId}',
+     'query': {}},
+    {'name': 'GET /api/admin/sponsorship/sponsors/{sponsorId}/detailed-report',
+     'tag': 'AdminSponsorship',
+     'method': 'GET',
+     'path': '/api/admin/sponsorship/sponsors/{sponsorId}/detailed-report',
+     'query': {}},
+    {'name': 'GET /api/admin/subscriptions',
+     'tag': 'AdminSubscriptions',
+     'method': 'GET',
+     'path': '/api/admin/subscriptions',
+     'query': {}},
+    {'name': 'GET /api/admin/subscriptions/{subscriptionId}',
+     'tag': 'AdminSubscriptions',
+     'method': 'GET',
+     'path': '/api/admin/subscriptions/{subscriptionId}',
+     'query': {}},
+    {'name': 'GET /api/admin/users',
+     'tag': 'AdminUsers',
+     'method': 'GET',
+     'path': '/api/admin/users',
+     'query': {}},
+    {'name': 'GET /api/admin/users/{userId}',
+     'tag': 'AdminUsers',
+     'method': 'GET',
+     'path': '/api/admin/users/{userId}',
+     'query': {}},
+    {'name': 'GET /api/admin/users/search',
+     'tag': 'AdminUsers',
+     'method': 'GET',
+     'path': '/api/admin/users/search',
+     'query': {}},
+    {'name': 'GET /api/v{version}/BulkOperations/status/{operationId}',
+     'tag': 'BulkOperations',
+     'method': 'GET',
+     'path': '/api/v{version}/BulkOperations/status/{operationId}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/BulkOperations/history',
+     'tag': 'BulkOperations',
+     'method': 'GET',
+     'path': '/api/v{version}/BulkOperations/history',
+     'query': {}},
+    {'name': 'GET /api/v{version}/BulkOperations/templates',
+     'tag': 'BulkOperations',
+     'method': 'GET',
+     'path': '/api/v{version}/BulkOperations/templates',
+     'query': {}},
+    {'name': 'GET /api/v{version}/BulkOperations/statistics',
+     'tag': 'BulkOperations',
+     'method': 'GET',
+     'path': '/api/v{version}/BulkOperations/statistics',
+     'query': {}},
+    {'name': 'GET /api/v{version}/DeepLinks/analytics/{linkId}',
+     'tag': 'DeepLinks',
+     'method': 'GET',
+     'path': '/api/v{version}/DeepLinks/analytics/{linkId}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/DeepLinks/universal-link-config',
+     'tag': 'DeepLinks',
+     'method': 'GET',
+     'path': '/api/v{version}/DeepLinks/universal-link-config',
+     'query': {}},
+    {'name': 'GET /r/{linkId}', 'tag': 'DeepLinks', 'method': 'GET', 'path': '/r/{linkId}', 'query': {}},
+    {'name': 'GET /api/v1/files/voice-messages/{messageId}',
+     'tag': 'Files',
+     'method': 'GET',
+     'path': '/api/v1/files/voice-messages/{messageId}',
+     'query': {}},
+    {'name': 'GET /api/v1/files/attachments/{messageId}/{attachmentIndex}',
+     'tag': 'Files',
+     'method': 'GET',
+     'path': '/api/v1/files/attachments/{messageId}/{attachmentIndex}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/group-claims',
+     'tag': 'GroupClaims',
+     'method': 'GET',
+     'path': '/api/v{version}/group-claims',
+     'query': {}},
+    {'name': 'GET /api/v{version}/group-claims/{id}',
+     'tag': 'GroupClaims',
+     'method': 'GET',
+     'path': '/api/v{version}/group-claims/{id}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/group-claims/groups/{id}',
+     'tag': 'GroupClaims',
+     'method': 'GET',
+     'path': '/api/v{version}/group-claims/groups/{id}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Groups',
+     'tag': 'Groups',
+     'method': 'GET',
+     'path': '/api/v{version}/Groups',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Groups/{id}',
+     'tag': 'Groups',
+     'method': 'GET',
+     'path': '/api/v{version}/Groups/{id}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Groups/lookups',
+     'tag': 'Groups',
+     'method': 'GET',
+     'path': '/api/v{version}/Groups/lookups',
+     'query': {}},
+    {'name': 'GET /health', 'tag': 'Health', 'method': 'GET', 'path': '/health', 'query': {}},
+    {'name': 'GET /health/detailed', 'tag': 'Health', 'method': 'GET', 'path': '/health/detailed', 'query': {}},
+    {'name': 'GET /api/v{version}/Languages/codes',
+     'tag': 'Languages',
+     'method': 'GET',
+     'path': '/api/v{version}/Languages/codes',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Languages/lookups',
+     'tag': 'Languages',
+     'method': 'GET',
+     'path': '/api/v{version}/Languages/lookups',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Languages',
+     'tag': 'Languages',
+     'method': 'GET',
+     'path': '/api/v{version}/Languages',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Languages/{id}',
+     'tag': 'Languages',
+     'method': 'GET',
+     'path': '/api/v{version}/Languages/{id}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Logs',
+     'tag': 'Logs',
+     'method': 'GET',
+     'path': '/api/v{version}/Logs',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Notification/health',
+     'tag': 'Notification',
+     'method': 'GET',
+     'path': '/api/v{version}/Notification/health',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Notification/preferences/{userId}',
+     'tag': 'Notification',
+     'method': 'GET',
+     'path': '/api/v{version}/Notification/preferences/{userId}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/webhooks/whatsapp',
+     'tag': 'Notification',
+     'method': 'GET',
+     'path': '/api/v{version}/webhooks/whatsapp',
+     'query': {}},
+    {'name': 'GET /api/v{version}/operation-claims',
+     'tag': 'OperationClaims',
+     'method': 'GET',
+     'path': '/api/v{version}/operation-claims',
+     'query': {}},
+    {'name': 'GET /api/v{version}/operation-claims/{id}',
+     'tag': 'OperationClaims',
+     'method': 'GET',
+     'path': '/api/v{version}/operation-claims/{id}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/operation-claims/lookups',
+     'tag': 'OperationClaims',
+     'method': 'GET',
+     'path': '/api/v{version}/operation-claims/lookups',
+     'query': {}},
+    {'name': 'GET /api/v{version}/operation-claims/cache',
+     'tag': 'OperationClaims',
+     'method': 'GET',
+     'path': '/api/v{version}/operation-claims/cache',
+     'query': {}},
+    {'name': 'GET /api/v{version}/PlantAnalyses/{id}',
+     'tag': 'PlantAnalyses',
+     'method': 'GET',
+     'path': '/api/v{version}/PlantAnalyses/{id}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/PlantAnalyses/{id}/detail',
+     'tag': 'PlantAnalyses',
+     'method': 'GET',
+     'path': '/api/v{version}/PlantAnalyses/{id}/detail',
+     'query': {}},
+    {'name': 'GET /api/v{version}/PlantAnalyses/my-analyses',
+     'tag': 'PlantAnalyses',
+     'method': 'GET',
+     'path': '/api/v{version}/PlantAnalyses/my-analyses',
+     'query': {}},
+    {'name': 'GET /api/v{version}/PlantAnalyses/list',
+     'tag': 'PlantAnalyses',
+     'method': 'GET',
+     'path': '/api/v{version}/PlantAnalyses/list',
+     'query': {}},
+    {'name': 'GET /api/v{version}/PlantAnalyses/sponsored-analyses',
+     'tag': 'PlantAnalyses',
+     'method': 'GET',
+     'path': '/api/v{version}/PlantAnalyses/sponsored-analyses',
+     'query': {}},
+    {'name': 'GET /api/v{version}/PlantAnalyses',
+     'tag': 'PlantAnalyses',
+     'method': 'GET',
+     'path': '/api/v{version}/PlantAnalyses',
+     'query': {}},
+    {'name': 'GET /api/v{version}/PlantAnalyses/{id}/image',
+     'tag': 'PlantAnalyses',
+     'method': 'GET',
+     'path': '/api/v{version}/PlantAnalyses/{id}/image',
+     'query': {}},
+    {'name': 'GET /redeem/{code}', 'tag': 'Redemption', 'method': 'GET', 'path': '/redeem/{code}', 'query': {}},
+    {'name': 'GET /redeem/success', 'tag': 'Redemption', 'method': 'GET', 'path': '/redeem/success', 'query': {}},
+    {'name': 'GET /api/v1/redemption/success',
+     'tag': 'Redemption',
+     'method': 'GET',
+     'path': '/api/v1/redemption/success',
+     'query': {}},
+    {'name': 'GET /redeem/error', 'tag': 'Redemption', 'method': 'GET', 'path': '/redeem/error', 'query': {}},
+    {'name': 'GET /api/v{version}/redeem/error',
+     'tag': 'Redemption',
+     'method': 'GET',
+     'path': '/api/v{version}/redeem/error',
+     'query': {}},
+    {'name': 'POST /api/v{version}/Referral/validate',
+     'tag': 'Referral',
+     'method': 'POST',
+     'path': '/api/v{version}/Referral/validate',
+     'query': {},
+     'body': {'code': 'example_code'}},
+    {'name': 'GET /api/v{version}/Referral/stats',
+     'tag': 'Referral',
+     'method': 'GET',
+     'path': '/api/v{version}/Referral/stats',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Referral/codes',
+     'tag': 'Referral',
+     'method': 'GET',
+     'path': '/api/v{version}/Referral/codes',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Referral/credits',
+     'tag': 'Referral',
+     'method': 'GET',
+     'path': '/api/v{version}/Referral/credits',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Referral/rewards',
+     'tag': 'Referral',
+     'method': 'GET',
+     'path': '/api/v{version}/Referral/rewards',
+     'query': {}},
+    {'name': 'GET /api/internal/signalr/health',
+     'tag': 'SignalRNotification',
+     'method': 'GET',
+     'path': '/api/internal/signalr/health',
+     'query': {}},
+    {'name': 'GET /api/SponsorRequest/process/{hashedToken}',
+     'tag': 'SponsorRequest',
+     'method': 'GET',
+     'path': '/api/SponsorRequest/process/{hashedToken}',
+     'query': {}},
+    {'name': 'GET /api/SponsorRequest/pending',
+     'tag': 'SponsorRequest',
+     'method': 'GET',
+     'path': '/api/SponsorRequest/pending',
+     'query': {}},
+    {'name': 'GET /api/SponsorRequest/{requestId}/whatsapp-message',
+     'tag': 'SponsorRequest',
+     'method': 'GET',
+     'path': '/api/SponsorRequest/{requestId}/whatsapp-message',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/tiers-for-purchase',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/tiers-for-purchase',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/codes',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/codes',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/purchases',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/purchases',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/farmers',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/farmers',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/statistics',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/statistics',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/dashboard-summary',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/dashboard-summary',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/package-statistics',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/package-statistics',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/code-analysis-statistics',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/code-analysis-statistics',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/link-statistics',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/link-statistics',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/messaging-analytics',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/messaging-analytics',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/impact-analytics',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/impact-analytics',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/temporal-analytics',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/temporal-analytics',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/roi-analytics',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/roi-analytics',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/validate/{code}',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/validate/{code}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/my-sponsor',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/my-sponsor',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/profile',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/profile',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/analysis/{plantAnalysisId}',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/analysis/{plantAnalysisId}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/analyses',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/analyses',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/messages/conversation',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/messages/conversation',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/smart-links',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/smart-links',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/smart-links/performance',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/smart-links/performance',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/logo-permissions/analysis/{plantAnalysisId}',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/logo-permissions/analysis/{plantAnalysisId}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/display-info/analysis/{plantAnalysisId}',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/display-info/analysis/{plantAnalysisId}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/debug/user-info',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/debug/user-info',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/messaging/features',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/messaging/features',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/dealer/invitation-details',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/dealer/invitation-details',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/dealer/analytics/{dealerId}',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/dealer/analytics/{dealerId}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/dealer/summary',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/dealer/summary',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/dealer/invitations',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/dealer/invitations',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/dealer/search',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/dealer/search',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/messages/blocked',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/messages/blocked',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/dealer/invitations/my-pending',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/dealer/invitations/my-pending',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/dealer/my-codes',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/dealer/my-codes',
+     'query': {}},
+    {'name': 'GET /api/v{version}/sponsorship/dealer/my-dashboard',
+     'tag': 'Sponsorship',
+     'method': 'GET',
+     'path': '/api/v{version}/sponsorship/dealer/my-dashboard',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Subscriptions/tiers',
+     'tag': 'Subscriptions',
+     'method': 'GET',
+     'path': '/api/v{version}/Subscriptions/tiers',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Subscriptions/my-subscription',
+     'tag': 'Subscriptions',
+     'method': 'GET',
+     'path': '/api/v{version}/Subscriptions/my-subscription',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Subscriptions/usage-status',
+     'tag': 'Subscriptions',
+     'method': 'GET',
+     'path': '/api/v{version}/Subscriptions/usage-status',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Subscriptions/history',
+     'tag': 'Subscriptions',
+     'method': 'GET',
+     'path': '/api/v{version}/Subscriptions/history',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Subscriptions/usage-logs',
+     'tag': 'Subscriptions',
+     'method': 'GET',
+     'path': '/api/v{version}/Subscriptions/usage-logs',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Test/rabbitmq-health',
+     'tag': 'Test',
+     'method': 'GET',
+     'path': '/api/v{version}/Test/rabbitmq-health',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Test/debug/analysis/{id}',
+     'tag': 'Test',
+     'method': 'GET',
+     'path': '/api/v{version}/Test/debug/analysis/{id}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/TestDatabase/recent-analyses',
+     'tag': 'TestDatabase',
+     'method': 'GET',
+     'path': '/api/v{version}/TestDatabase/recent-analyses',
+     'query': {}},
+    {'name': 'GET /api/v{version}/TestDatabase/subscription-debug',
+     'tag': 'TestDatabase',
+     'method': 'GET',
+     'path': '/api/v{version}/TestDatabase/subscription-debug',
+     'query': {}},
+    {'name': 'GET /api/v{version}/TestDatabase/user-subscription/{userId}',
+     'tag': 'TestDatabase',
+     'method': 'GET',
+     'path': '/api/v{version}/TestDatabase/user-subscription/{userId}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Translates/languages/{lang}',
+     'tag': 'Translates',
+     'method': 'GET',
+     'path': '/api/v{version}/Translates/languages/{lang}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Translates',
+     'tag': 'Translates',
+     'method': 'GET',
+     'path': '/api/v{version}/Translates',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Translates/dtos',
+     'tag': 'Translates',
+     'method': 'GET',
+     'path': '/api/v{version}/Translates/dtos',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Translates/{id}',
+     'tag': 'Translates',
+     'method': 'GET',
+     'path': '/api/v{version}/Translates/{id}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/user-claims',
+     'tag': 'UserClaims',
+     'method': 'GET',
+     'path': '/api/v{version}/user-claims',
+     'query': {}},
+    {'name': 'GET /api/v{version}/user-claims/{id}',
+     'tag': 'UserClaims',
+     'method': 'GET',
+     'path': '/api/v{version}/user-claims/{id}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/user-claims/users/{id}',
+     'tag': 'UserClaims',
+     'method': 'GET',
+     'path': '/api/v{version}/user-claims/users/{id}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/user-groups',
+     'tag': 'UserGroups',
+     'method': 'GET',
+     'path': '/api/v{version}/user-groups',
+     'query': {}},
+    {'name': 'GET /api/v{version}/user-groups/users/{id}',
+     'tag': 'UserGroups',
+     'method': 'GET',
+     'path': '/api/v{version}/user-groups/users/{id}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/user-groups/users/{id}/groups',
+     'tag': 'UserGroups',
+     'method': 'GET',
+     'path': '/api/v{version}/user-groups/users/{id}/groups',
+     'query': {}},
+    {'name': 'GET /api/v{version}/user-groups/groups/{id}/users',
+     'tag': 'UserGroups',
+     'method': 'GET',
+     'path': '/api/v{version}/user-groups/groups/{id}/users',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Users',
+     'tag': 'Users',
+     'method': 'GET',
+     'path': '/api/v{version}/Users',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Users/lookups',
+     'tag': 'Users',
+     'method': 'GET',
+     'path': '/api/v{version}/Users/lookups',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Users/{id}',
+     'tag': 'Users',
+     'method': 'GET',
+     'path': '/api/v{version}/Users/{id}',
+     'query': {}},
+    {'name': 'GET /api/v{version}/Users/avatar/{userId}',
+     'tag': 'Users',
+     'method': 'GET',
+     'path': '/api/v{version}/Users/avatar/{userId}',
+     'query': {}},
+]
+
+if __name__ == '__main__':
+    main(ENDPOINTS)
@@ -1,71 +1,75 @@
 import requests
+import argparse
 import json
+import os
 import time
 import base64
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime
-import psycopg2
 import urllib3
 
+from analysis_db import AnalysisDb
+from perf_stats import RssSampler, format_ms, print_table, summarize
+
 # Disable SSL warnings for local testing
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # API endpoints
 BASE_URL = "https://localhost:5001"
 ASYNC_ANALYZE_URL = f"{BASE_URL}/api/plantanalyses/analyze-async"
+MULTI_ANALYZE_URL = f"{BASE_URL}/api/plantanalyses/analyze-multi-async"
 GET_ANALYSIS_URL = f"{BASE_URL}/api/plantanalyses"
 
-# Database connection
-DB_CONFIG = {
-    "host": "localhost",
-    "database": "devarchitecture",
-    "user": "postgres",
-    "password": "Admin01!"
-}
-
 # Test image - create a small 1x1 red pixel PNG
 test_image_base64 = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8DwHwAFBQIAX8jx0gAAAABJRU5ErkJggg=="
 test_image_data_uri = f"data:image/png;base64,{test_image_base64}"
 
+# Test data - shared with test_async_load.py so load runs use the same payload. PlantAnalysisRequestDto
+# is bound by System.Text.Json, which rejects a number for the string FarmerId/SponsorId and a fraction
+# for the int Altitude (HTTP 400)
+TEST_REQUEST = {
+    "image": test_image_data_uri,
+    "userId": 1,
+    "farmerId": "F101",
+    "sponsorId": "S201",
+    "location": "Test Field A",
+    "gpsCoordinates": {
+        "lat": 41.0082,
+        "lng": 28.9784
+    },
+    "cropType": "Tomato",
+    "fieldId": "FIELD-001",
+    "urgencyLevel": "High",
+    "notes": "Test async flow with complete data",
+    "altitude": 120,
+    "plantingDate": "2024-10-15T00:00:00Z",
+    "expectedHarvestDate": "2025-03-15T00:00:00Z",
+    "lastFertilization": "2024-12-01T00:00:00Z",
+    "lastIrrigation": "2024-12-20T00:00:00Z",
+    "previousTreatments": ["Fertilizer-NPK", "Pesticide-Organic"],
+    "weatherConditions": "Sunny",
+    "temperature": 25.5,
+    "humidity": 65.0,
+    "soilType": "Loamy",
+    "contactInfo": {
+        "phone": "+905551234567",
+        "email": "farmer@test.com"
+    },
+    "additionalInfo": {
+        "plot_size": "2 hectares",
+        "irrigation_type": "Drip"
+    }
+}
+
 def test_async_flow():
     print("=" * 60)
     print("ASYNC PLANT ANALYSIS FLOW TEST")
     print("=" * 60)
     
-    # Test data
-    test_request = {
-        "image": test_image_data_uri,
-        "userId": 1,
-        "farmerId": 101,
-        "sponsorId": 201,
-        "location": "Test Field A",
-        "gpsCoordinates": {
-            "lat": 41.0082,
-            "lng": 28.9784
-        },
-        "cropType": "Tomato",
-        "fieldId": "FIELD-001",
-        "urgencyLevel": "High",
-        "notes": "Test async flow with complete data",
-        "altitude": 120.5,
-        "plantingDate": "2024-10-15T00:00:00Z",
-        "expectedHarvestDate": "2025-03-15T00:00:00Z",
-        "lastFertilization": "2024-12-01T00:00:00Z",
-        "lastIrrigation": "2024-12-20T00:00:00Z",
-        "previousTreatments": ["Fertilizer-NPK", "Pesticide-Organic"],
-        "weatherConditions": "Sunny",
-        "temperature": 25.5,
-        "humidity": 65.0,
-        "soilType": "Loamy",
-        "contactInfo": {
-            "phone": "+905551234567",
-            "email": "farmer@test.com"
-        },
-        "additionalInfo": {
-            "plot_size": "2 hectares",
-            "irrigation_type": "Drip"
-        }
-    }
+    test_request = dict(TEST_REQUEST)
     
+    db = None
     try:
         # Step 1: Submit async analysis request
         print("\n1. Submitting async analysis request...")
@@ -90,44 +94,24 @@ def test_async_flow():
             
         # Step 2: Check database for initial record
         print("\n2. Checking database for initial record...")
-        conn = psycopg2.connect(**DB_CONFIG)
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT 
-                "Id", "AnalysisId", "UserId", "FarmerId", "SponsorId",
-                "Location", "CropType", "FieldId", "UrgencyLevel", "Notes",
-                "Latitude", "Longitude", "Altitude", "Temperature", "Humidity",
-                "WeatherConditions", "SoilType", "PlantingDate", "ContactPhone",
-                "ContactEmail", "AnalysisStatus", "ImagePath", "CreatedDate"
-            FROM "PlantAnalyses"
-            WHERE "AnalysisId" = %s
-        """
-        
-        cursor.execute(query, (analysis_id,))
-        row = cursor.fetchone()
+        db = AnalysisDb(max_connections=1)
+        row = db.get_details(analysis_id)
         
         if row:
             print("   ✓ Initial record found in database")
-            print(f"   Database ID: {row[0]}")
-            print(f"   Status: {row[20]}")
-            print(f"   UserId: {row[2]}")
-            print(f"   FarmerId: {row[3]}")
-            print(f"   Location: {row[5]}")
-            print(f"   CropType: {row[6]}")
-            print(f"   Temperature: {row[13]}")
-            print(f"   ImagePath: {row[21]}")
-            print(f"   CreatedDate: {row[22]}")
+            print(f"   Database ID: {row.id}")
+            print(f"   Status: {row.status}")
+            print(f"   UserId: {row.user_id}")
+            print(f"   FarmerId: {row.farmer_id}")
+            print(f"   Location: {row.location}")
+            print(f"   CropType: {row.crop_type}")
+            print(f"   Temperature: {row.temperature}")
+            print(f"   ImagePath: {row.image_path}")
+            print(f"   CreatedDate: {row.created_date}")
             
             # Check for all important fields
-            missing_fields = []
-            field_names = ["UserId", "FarmerId", "SponsorId", "Location", "CropType", 
-                          "FieldId", "UrgencyLevel", "Latitude", "Longitude", "ContactPhone"]
-            field_indices = [2, 3, 4, 5, 6, 7, 8, 9, 10, 18]
-            
-            for name, idx in zip(field_names, field_indices):
-                if row[idx] is None:
-                    missing_fields.append(name)
+            missing_fields = row.missing(["user_id", "farmer_id", "sponsor_id", "location", "crop_type",
+                                          "field_id", "urgency_level", "latitude", "longitude", "contact_phone"])
             
             if missing_fields:
                 print(f"   ⚠ Missing fields: {', '.join(missing_fields)}")
@@ -188,57 +172,169 @@ def test_async_flow():
         
         # Step 4: Wait and check for update
         print("\n4. Waiting for worker to process...")
-        time.sleep(5)  # Wait for worker to process
+        db.poll_until_completed([analysis_id], timeout=30)
         
         print("   Checking database for updated record...")
-        cursor.execute(query, (analysis_id,))
-        updated_row = cursor.fetchone()
+        updated_row = db.get_details(analysis_id)
         
         if updated_row:
-            print(f"   Status: {updated_row[20]}")
+            print(f"   Status: {updated_row.status}")
             
             # Check if AI results are populated
-            ai_query = """
-                SELECT 
-                    "PlantSpecies", "PlantVariety", "GrowthStage", 
-                    "OverallHealthScore", "PrimaryConcern", "AnalysisResult"
-                FROM "PlantAnalyses"
-                WHERE "AnalysisId" = %s
-            """
-            cursor.execute(ai_query, (analysis_id,))
-            ai_row = cursor.fetchone()
+            print("\n   AI Analysis Results:")
+            print(f"   Plant Species: {updated_row.plant_species}")
+            print(f"   Plant Variety: {updated_row.plant_variety}")
+            print(f"   Growth Stage: {updated_row.growth_stage}")
+            print(f"   Overall Health Score: {updated_row.overall_health_score}")
+            print(f"   Primary Concern: {updated_row.primary_concern}")
             
-            if ai_row:
-                print("\n   AI Analysis Results:")
-                print(f"   Plant Species: {ai_row[0]}")
-                print(f"   Plant Variety: {ai_row[1]}")
-                print(f"   Growth Stage: {ai_row[2]}")
-                print(f"   Overall Health Score: {ai_row[3]}")
-                print(f"   Primary Concern: {ai_row[4]}")
+            if updated_row.has_analysis_result:
+                print("   ✓ Complete analysis result stored")
+            else:
+                print("   ⚠ Analysis result field is empty")
                 
-                if ai_row[5]:
-                    print("   ✓ Complete analysis result stored")
-                else:
-                    print("   ⚠ Analysis result field is empty")
-                    
-                # Final verification
-                if ai_row[0] and updated_row[20] == "Completed":
-                    print("\n   ✅ SUCCESS: Async flow completed successfully!")
-                    print("   All data preserved and AI results stored.")
-                else:
-                    print("\n   ⚠ PARTIAL SUCCESS: Some data may be missing")
+            # Final verification
+            if updated_row.plant_species and updated_row.status == "Completed":
+                print("\n   ✅ SUCCESS: Async flow completed successfully!")
+                print("   All data preserved and AI results stored.")
             else:
-                print("   ✗ No AI results found")
+                print("\n   ⚠ PARTIAL SUCCESS: Some data may be missing")
         else:
             print("   ✗ Record not found after processing")
         
-        cursor.close()
-        conn.close()
-        
     except Exception as e:
         print(f"\n❌ ERROR: {str(e)}")
         import traceback
         traceback.print_exc()
+    finally:
+        if db:
+            db.close()
+
+# Multi-image mode (--multi-image): PlantAnalysisMultiImageRequestDto image fields, main image first
+MULTI_IMAGE_FIELDS = ["image", "leafTopImage", "leafBottomImage", "plantOverviewImage", "rootImage"]
+
+def build_multi_image_request(image_count, image_data_uri):
+    request = {key: value for key, value in TEST_REQUEST.items() if key != "image"}
+    for field in MULTI_IMAGE_FIELDS[:image_count]:
+        request[field] = image_data_uri
+    request["notes"] = f"Multi-image async load test ({image_count} images)"
+    return request
+
+def submit_multi_image(session, body, headers):
+    """POST one prebuilt multi-image body; returns (analysis_id, submitted_at, latency) or None"""
+    started = time.perf_counter()
+    try:
+        response = session.post(MULTI_ANALYZE_URL, data=body, headers=headers, verify=False, timeout=120)
+    except requests.RequestException as e:
+        print(f"   ✗ Submit failed: {e}")
+        return None
+    latency = time.perf_counter() - started
+
+    if response.status_code not in (200, 202):
+        print(f"   ✗ HTTP {response.status_code}: {response.text[:200]}")
+        return None
+    result = response.json()
+    if not result.get("success") or not result.get("analysis_id"):
+        print(f"   ✗ Failed: {result.get('message', 'Unknown error')}")
+        return None
+    return result["analysis_id"], started, latency
+
+def run_multi_image_step(args, session, headers, image_count, image_data_uri):
+    body = json.dumps(build_multi_image_request(image_count, image_data_uri)).encode("utf-8")
+    print(f"\n{image_count} image(s) per request, {len(body) / 1024:.0f} KB body, "
+          f"{args.count} requests, concurrency {args.concurrency}...")
+
+    samplers = [RssSampler(pid) for pid in (args.api_pid, args.worker_pid)]
+    completed_at = {}
+
+    def on_progress(state):
+        if state.status == "Completed":
+            completed_at[state.analysis_id] = time.perf_counter()
+
+    with ExitStack() as stack:
+        for sampler in samplers:
+            if sampler.pid:
+                stack.enter_context(sampler)
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            submissions = [s for s in pool.map(lambda _: submit_multi_image(session, body, headers),
+                                               range(args.count)) if s]
+
+        rows = {}
+        if submissions:
+            with AnalysisDb(max_connections=1) as db:
+                rows = db.poll_until_completed([s[0] for s in submissions], timeout=args.timeout,
+                                               on_progress=on_progress)
+
+    submit_latencies = [latency for _, _, latency in submissions]
+    end_to_end = [completed_at[analysis_id] - started for analysis_id, started, _ in submissions
+                  if analysis_id in completed_at]
+    statuses = [state.status for state in rows.values()]
+    failed = sum(1 for status in statuses if status in ("Failed", "QueueFailed"))
+    pending = len(submissions) - len(completed_at) - failed
+
+    submit_stats = summarize(submit_latencies)
+    e2e_stats = summarize(end_to_end)
+    print(f"   Submitted: {len(submissions)}/{args.count}, completed: {len(completed_at)}, "
+          f"failed: {failed}, still pending: {pending}")
+    print(f"   Submit p50/p95: {format_ms(submit_stats['p50'])} / {format_ms(submit_stats['p95'])}")
+    print(f"   End-to-end p50/p95: {format_ms(e2e_stats['p50'])} / {format_ms(e2e_stats['p95'])}")
+
+    api_growth, worker_growth = (sampler.growth_mb() for sampler in samplers)
+    return [image_count, f"{len(body) / 1024:.0f}", len(submissions), len(completed_at), failed + pending,
+            format_ms(submit_stats["p50"]), format_ms(submit_stats["p95"]),
+            format_ms(e2e_stats["p50"]), format_ms(e2e_stats["p95"]),
+            f"{api_growth:+.1f}" if api_growth is not None else "-",
+            f"{worker_growth:+.1f}" if worker_growth is not None else "-"]
+
+def test_multi_image_flow(args):
+    print("=" * 60)
+    print("MULTI-IMAGE ASYNC ANALYSIS LOAD TEST")
+    print("=" * 60)
+    print("Completion needs a consumer for plant-analysis-multi-image-requests "
+          "(N8N or mock_n8n_service.py) and the worker.")
+
+    if args.image_file:
+        with open(args.image_file, "rb") as f:
+            extension = os.path.splitext(args.image_file)[1].lstrip(".").lower().replace("jpg", "jpeg")
+            image_data_uri = f"data:image/{extension or 'jpeg'};base64,{base64.b64encode(f.read()).decode('ascii')}"
+    else:
+        image_data_uri = test_image_data_uri
+
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    if args.token:
+        headers["Authorization"] = f"Bearer {args.token}"
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    image_counts = [int(n) for n in args.images.split(",")]
+    rows = [run_multi_image_step(args, session, headers, count, image_data_uri) for count in image_counts]
+
+    print_table(["Images", "Body KB", "Sent", "Done", "Failed", "Submit p50", "Submit p95",
+                 "E2E p50", "E2E p95", "API RSS MB", "Worker RSS MB"], rows,
+                title="MULTI-IMAGE SCALING")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Async plant analysis flow test")
+    parser.add_argument("--multi-image", action="store_true",
+                        help="Load test analyze-multi-async across image counts instead of the single flow test")
+    parser.add_argument("--images", default="1,2,3,4,5", help="Comma separated images per request (1-5)")
+    parser.add_argument("--count", type=int, default=10, help="Requests per image count")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum in-flight submits")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds to wait for completion per step")
+    parser.add_argument("--image-file", default=None, help="Image to send in every slot (default: 1x1 PNG)")
+    parser.add_argument("--token", default=os.environ.get("ZIRAAI_TOKEN"),
+                        help="Bearer token of a Farmer/Admin user (default: $ZIRAAI_TOKEN)")
+    parser.add_argument("--api-pid", type=int, default=None, help="Local WebAPI process id to sample RSS from")
+    parser.add_argument("--worker-pid", type=int, default=None, help="Local worker process id to sample RSS from")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    test_async_flow()
\ No newline at end of file
+    args = parse_args()
+    if args.multi_image:
+        test_multi_image_flow(args)
+    else:
+        test_async_flow()
\ No newline at end of file
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Load generator for /api/plantanalyses/analyze-async
+
+Submits the same payload as test_async_flow.py from a pooled keep-alive
+aiohttp session at a configurable concurrency, target rate and duration,
+then reports submit latency percentiles, throughput and an error breakdown.
+
+Examples:
+    python test_async_load.py --token <jwt> --concurrency 20 --duration 60
+    python test_async_load.py --token <jwt> --rate 5,10,20,40 --duration 30
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from perf_stats import (format_ms, print_error_breakdown, print_latency_summary,
+                        print_table, summarize)
+from test_async_flow import ASYNC_ANALYZE_URL, TEST_REQUEST
+
+
+def extract_analysis_id(result: Dict) -> Optional[str]:
+    """analyze-async answers 202 with analysis_id; older builds used data"""
+    return result.get("analysis_id") or result.get("data")
+
+
+class LoadResult:
+    """Samples collected during one load step"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.schedule_lags: List[float] = []
+        self.errors: Counter = Counter()
+        self.analysis_ids: List[str] = []
+        self.sent = 0
+        self.elapsed = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return len(self.latencies)
+
+
+async def submit_once(session: aiohttp.ClientSession, url: str, body: bytes,
+                      headers: Dict[str, str], result: LoadResult, scheduled_at: float):
+    """Send one analyze-async request and record its outcome"""
+    started = time.perf_counter()
+    result.schedule_lags.append(max(0.0, started - scheduled_at))
+    result.sent += 1
+
+    try:
+        async with session.post(url, data=body, headers=headers) as response:
+            payload = await response.read()
+            elapsed = time.perf_counter() - started
+
+            if response.status not in (200, 202):
+                result.errors[f"HTTP {response.status}"] += 1
+                return
+
+            try:
+                data = json.loads(payload)
+            except ValueError:
+                result.errors["Invalid JSON"] += 1
+                return
+
+            if not data.get("success"):
+                result.errors[f"success=false: {data.get('message', 'Unknown error')}"] += 1
+                return
+
+            result.latencies.append(elapsed)
+            analysis_id = extract_analysis_id(data)
+            if analysis_id:
+                result.analysis_ids.append(analysis_id)
+    except asyncio.TimeoutError:
+        result.errors["Timeout"] += 1
+    except aiohttp.ClientError as e:
+        result.errors[type(e).__name__] += 1
+
+
+async def run_step(session: aiohttp.ClientSession, url: str, body: bytes, headers: Dict[str, str],
+                   concurrency: int, rate: float, duration: float) -> LoadResult:
+    """
+    Drive load for `duration` seconds.
+    rate > 0: open loop, requests are scheduled at a fixed interval and queue up
+              behind the workers when the API cannot keep up (visible as schedule lag).
+    rate = 0: closed loop, every worker sends its next request as soon as the last one returns.
+    """
+    result = LoadResult()
+    queue: asyncio.Queue = asyncio.Queue()
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def worker():
+        while True:
+            scheduled_at = await queue.get()
+            if scheduled_at is None:
+                return
+            await submit_once(session, url, body, headers, result, scheduled_at)
+
+    async def closed_loop_worker():
+        while time.perf_counter() < deadline:
+            await submit_once(session, url, body, headers, result, time.perf_counter())
+
+    if rate > 0:
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        interval = 1.0 / rate
+        next_at = started
+        while next_at < deadline:
+            now = time.perf_counter()
+            if next_at > now:
+                await asyncio.sleep(next_at - now)
+            queue.put_nowait(next_at)
+            next_at += interval
+        for _ in workers:
+            queue.put_nowait(None)
+        await asyncio.gather(*workers)
+    else:
+        await asyncio.gather(*(closed_loop_worker() for _ in range(concurrency)))
+
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def print_step_report(label: str, result: LoadResult):
+    print(f"\n--- {label} ---")
+    print(f"   Sent: {result.sent}, succeeded: {result.succeeded}, failed: {sum(result.errors.values())}")
+    print(f"   Elapsed: {result.elapsed:.1f} s")
+    print(f"   Throughput: {result.succeeded / result.elapsed:.1f} req/s (ok), "
+          f"{result.sent / result.elapsed:.1f} req/s (sent)")
+    print_latency_summary("Submit latency:", result.latencies)
+    lag = summarize(result.schedule_lags)
+    if lag["count"]:
+        print(f"   Schedule lag p95: {format_ms(lag['p95'])} (grows when the API is saturated)")
+    print_error_breakdown(result.errors, result.sent)
+
+
+async def run_load(args) -> List[LoadResult]:
+    body = json.dumps(TEST_REQUEST).encode("utf-8")
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    if args.token:
+        headers["Authorization"] = f"Bearer {args.token}"
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency, ssl=False)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    rates = [float(r) for r in str(args.rate).split(",")]
+
+    results = []
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        for rate in rates:
+            label = f"rate {rate:g} req/s" if rate > 0 else "closed loop"
+            print(f"\nRunning {label}, concurrency {args.concurrency}, {args.duration:g} s...")
+            result = await run_step(session, args.url, body, headers, args.concurrency, rate, args.duration)
+            print_step_report(label, result)
+            results.append(result)
+
+    if len(rates) > 1:
+        rows = []
+        for rate, result in zip(rates, results):
+            stats = summarize(result.latencies)
+            rows.append([f"{rate:g}", f"{result.succeeded / result.elapsed:.1f}",
+                         format_ms(stats["p50"]), format_ms(stats["p95"]), format_ms(stats["p99"]),
+                         sum(result.errors.values())])
+        print_table(["Target req/s", "OK req/s", "p50", "p95", "p99", "Errors"], rows,
+                    title="SATURATION SWEEP")
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load generator for the analyze-async endpoint")
+    parser.add_argument("--url", default=ASYNC_ANALYZE_URL, help="analyze-async endpoint URL")
+    parser.add_argument("--token", default=os.environ.get("ZIRAAI_TOKEN"),
+                        help="Bearer token of a Farmer/Admin user (default: $ZIRAAI_TOKEN)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Maximum in-flight requests")
+    parser.add_argument("--rate", default="0",
+                        help="Target req/s, comma separated for a sweep (0 = closed loop)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per load step")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("=" * 60)
+    print("ASYNC PLANT ANALYSIS LOAD TEST")
+    print("=" * 60)
+    print(f"Target: {args.url}")
+    if not args.token:
+        print("⚠ No token given - analyze-async requires a Farmer/Admin bearer token")
+    asyncio.run(run_load(args))
+
+
+if __name__ == "__main__":
+    main()
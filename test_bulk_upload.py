@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Bulk Excel upload generator and end-to-end throughput benchmark
+
+Writes valid .xlsx workbooks for the four bulk upload formats (farmer
+invitations, dealer invitations, code distribution, subscription assignment)
+with a streaming writer: rows go straight into the zip member as inline-string
+cells, so memory stays flat for any row count. The workbooks are then uploaded
+to the matching endpoint, and the queue the service publishes to is followed
+until the worker has drained it. Rows/s are reported for each stage:
+generate, upload (parse + publish in the API) and drain (worker).
+
+The services accept at most 2000 rows and 5 MB per file, so --rows is split
+into files of --rows-per-file rows, each uploaded as its own job. Use
+--rows-per-file 0 to write a single file and exercise the limits.
+
+Farmer and dealer invitation files are rejected unless the sponsor owns an
+unused, unreserved, unexpired code for every row; earlier files reserve theirs,
+so a run needs --rows such codes in total.
+PackageTier is left empty by default, so any tier counts (auto-allocation);
+with --tier all rows name that tier and the codes must all be of it.
+Subscription assignment rows rotate TierName through S/M/L/XL unless --tier
+is given.
+
+With --sponsor-id an admin token uploads on behalf of that sponsor: farmer
+invitations go to admin/farmer/invitations/bulk/excel and code distribution
+passes onBehalfOfSponsorId. Dealer invitations have no such parameter and
+refuse the flag.
+
+Examples:
+    python test_bulk_upload.py --format farmer-invitation --rows 20000 --token <jwt>
+    python test_bulk_upload.py --format subscription-assignment --rows 10000 --upload-concurrency 4 --token <jwt>
+    python test_bulk_upload.py --format dealer-invitation --rows 50000 --rows-per-file 0 --generate-only
+"""
+
+import argparse
+import os
+import threading
+import time
+import zipfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
+
+import pika
+import requests
+import urllib3
+
+from perf_stats import format_ms, print_error_breakdown, print_table, summarize
+from test_queue_drain import (DEALER_INVITATION_QUEUE, FARMER_CODE_DISTRIBUTION_QUEUE, FARMER_INVITATION_QUEUE,
+                              FARMER_SUBSCRIPTION_ASSIGNMENT_QUEUE, sample_depth)
+from test_rabbitmq_publisher import RABBITMQ_URL
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+BASE_URL = 'https://localhost:5001'
+MAX_ROWS_PER_FILE = 2000               # MaxRowCount in the Bulk*Service classes
+MAX_FILE_SIZE_BYTES = 5 * 1024 * 1024  # MaxFileSizeBytes in the Bulk*Service classes
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+PACKAGE_TIERS = ('S', 'M', 'L', 'XL')
+
+
+def phone(number):
+    """Valid Turkish mobile in the 0XXXXXXXXXX form the services normalize to"""
+    return f"05{number % 1_000_000_000:09d}"
+
+
+# format -> columns, row builder, endpoint, admin endpoint taking ?onBehalfOfSponsorId= (obo_path; formats
+# without one have no on-behalf-of upload), extra form fields, file field name and queue
+BULK_FORMATS = {
+    'farmer-invitation': {
+        'columns': ('Phone', 'FarmerName', 'Email', 'PackageTier', 'Notes'),
+        'row': lambda n, run, tier: (phone(n), f"Bulk Farmer {n}", f"farmer{run}-{n}@bulk.test",
+                                     tier or '', 'bulk upload benchmark'),
+        'path': '/api/v1/sponsorship/farmer/invitations/bulk',
+        'obo_path': '/api/v1/sponsorship/admin/farmer/invitations/bulk/excel',
+        'file_field': 'excelFile',
+        'form': {'channel': 'SMS'},
+        'queue': FARMER_INVITATION_QUEUE,
+    },
+    'dealer-invitation': {
+        'columns': ('Email', 'Phone', 'DealerName', 'CodeCount', 'PackageTier'),
+        'row': lambda n, run, tier: (f"dealer{run}-{n}@bulk.test", phone(n), f"Bulk Dealer {n}", 1, tier or ''),
+        'path': '/api/v1/sponsorship/dealer/invite-bulk',
+        'file_field': 'ExcelFile',
+        'form': {'InvitationType': 'Invite', 'SendSms': 'false'},
+        'queue': DEALER_INVITATION_QUEUE,
+    },
+    'code-distribution': {
+        'columns': ('Email', 'Phone', 'FarmerName'),
+        'row': lambda n, run, tier: (f"farmer{run}-{n}@bulk.test", phone(n), f"Bulk Farmer {n}"),
+        'path': '/api/v1/sponsorship/bulk-code-distribution',
+        'obo_path': '/api/v1/sponsorship/bulk-code-distribution',
+        'file_field': 'ExcelFile',
+        'form': {'SendSms': 'false'},
+        'queue': FARMER_CODE_DISTRIBUTION_QUEUE,
+    },
+    'subscription-assignment': {
+        'columns': ('Email', 'Phone', 'FirstName', 'LastName', 'TierName', 'DurationDays', 'Notes'),
+        'row': lambda n, run, tier: (f"farmer{run}-{n}@bulk.test", phone(n), 'Bulk', f"Farmer {n}",
+                                     tier or PACKAGE_TIERS[n % 4], 30, 'bulk upload benchmark'),
+        'path': '/api/v1/admin/subscriptions/bulk-assignment',
+        'file_field': 'ExcelFile',
+        'form': {'SendNotification': 'false', 'AutoActivate': 'true'},
+        'queue': FARMER_SUBSCRIPTION_ASSIGNMENT_QUEUE,
+    },
+}
+
+# Minimal package parts; the sheet itself is streamed
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/>'
+        '</Relationships>'),
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+        '<borders count="1"><border/></borders>'
+        '<cellStyleXfs count="1"><xf/></cellStyleXfs>'
+        '<cellXfs count="1"><xf xfId="0"/></cellXfs>'
+        '</styleSheet>'),
+}
+SHEET_HEADER = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+SHEET_FOOTER = '</sheetData></worksheet>'
+ROWS_PER_WRITE = 500
+
+
+def column_letters(count):
+    letters = []
+    for index in range(count):
+        name = ''
+        index += 1
+        while index:
+            index, remainder = divmod(index - 1, 26)
+            name = chr(65 + remainder) + name
+        letters.append(name)
+    return letters
+
+
+def render_row(row_number, values, letters):
+    cells = []
+    for letter, value in zip(letters, values):
+        reference = f"{letter}{row_number}"
+        if isinstance(value, int):
+            cells.append(f'<c r="{reference}"><v>{value}</v></c>')
+        else:
+            cells.append(f'<c r="{reference}" t="inlineStr"><is><t>{escape(value)}</t></is></c>')
+    return f'<row r="{row_number}">{"".join(cells)}</row>'
+
+
+def write_workbook(path, columns, rows):
+    """Stream `rows` (an iterable of value tuples) into a one-sheet .xlsx; returns the row count"""
+    letters = column_letters(len(columns))
+    count = 0
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((SHEET_HEADER + render_row(1, columns, letters)).encode('utf-8'))
+            buffer = []
+            for values in rows:
+                count += 1
+                buffer.append(render_row(count + 1, values, letters))
+                if len(buffer) >= ROWS_PER_WRITE:
+                    sheet.write(''.join(buffer).encode('utf-8'))
+                    buffer.clear()
+            sheet.write((''.join(buffer) + SHEET_FOOTER).encode('utf-8'))
+    return count
+
+
+def generate_files(spec, total_rows, rows_per_file, output_dir, run, tier=None):
+    """Write the workbooks for one run; returns [(path, rows)]"""
+    os.makedirs(output_dir, exist_ok=True)
+    per_file = rows_per_file or total_rows
+    files = []
+    for first in range(0, total_rows, per_file):
+        last = min(first + per_file, total_rows)
+        path = os.path.join(output_dir, f"bulk_{run}_{first // per_file + 1:04d}.xlsx")
+        rows = (spec['row'](run * 10_000_000 + n, run, tier) for n in range(first, last))
+        files.append((path, write_workbook(path, spec['columns'], rows)))
+    return files
+
+
+class QueueFollower(threading.Thread):
+    """Samples a queue's depth until uploads are done and the queue is empty again"""
+
+    def __init__(self, queue_name, url, interval, idle_timeout):
+        super().__init__(daemon=True)
+        self.queue_name = queue_name
+        self.url = url
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.uploads_done = threading.Event()
+        self.samples = []  # (perf_counter, depth)
+        self.consumers = 0
+        self.error = None
+
+    def run(self):
+        try:
+            connection = pika.BlockingConnection(pika.URLParameters(self.url))
+        except pika.exceptions.AMQPError as e:
+            self.error = e
+            return
+        channel = connection.channel()
+        last_change = time.perf_counter()
+        try:
+            while True:
+                depth, self.consumers = sample_depth(channel, self.queue_name)
+                now = time.perf_counter()
+                if self.samples and depth != self.samples[-1][1]:
+                    last_change = now
+                self.samples.append((now, depth))
+                if self.uploads_done.is_set():
+                    if depth == 0:
+                        return
+                    if now - last_change > self.idle_timeout:
+                        print(f"   ⚠ Depth stuck at {depth} for {self.idle_timeout:g} s (consumers: {self.consumers})")
+                        return
+                time.sleep(self.interval)
+        finally:
+            connection.close()
+
+    @property
+    def peak(self):
+        return max((depth for _, depth in self.samples), default=0)
+
+    @property
+    def drained_at(self):
+        return self.samples[-1][0] if self.samples and self.samples[-1][1] == 0 else None
+
+
+def upload_file(session, url, spec, path, headers, timeout):
+    """POST one workbook; returns (latency, accepted, error)"""
+    started = time.perf_counter()
+    try:
+        with open(path, 'rb') as f:
+            response = session.post(url, headers=headers, data=spec['form'], verify=False, timeout=timeout,
+                                    files={spec['file_field']: (os.path.basename(path), f, XLSX_CONTENT_TYPE)})
+    except requests.RequestException as e:
+        return time.perf_counter() - started, False, type(e).__name__
+    latency = time.perf_counter() - started
+
+    if response.status_code != 200:
+        return latency, False, f"HTTP {response.status_code}"
+    try:
+        payload = response.json()
+    except ValueError:
+        return latency, False, 'Invalid JSON'
+    if not payload.get('success', True):
+        return latency, False, (payload.get('message') or 'success=false')[:80]
+    return latency, True, None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bulk Excel upload generator and throughput benchmark")
+    parser.add_argument('--format', choices=sorted(BULK_FORMATS), default='farmer-invitation', help='Bulk format')
+    parser.add_argument('--rows', type=int, default=10000, help='Total rows to generate')
+    parser.add_argument('--rows-per-file', type=int, default=MAX_ROWS_PER_FILE,
+                        help='Rows per workbook (the services accept at most 2000; 0 = one file)')
+    parser.add_argument('--tier', choices=PACKAGE_TIERS, default=None,
+                        help='PackageTier / TierName of every row (default: empty PackageTier = auto-allocation, '
+                             'rotating TierName)')
+    parser.add_argument('--output-dir', default='bulk_uploads', help='Where the workbooks are written')
+    parser.add_argument('--generate-only', action='store_true', help='Only write the workbooks')
+    parser.add_argument('--base-url', default=BASE_URL, help='API base URL')
+    parser.add_argument('--token', default=os.environ.get('ZIRAAI_TOKEN'), help='Bearer token (Sponsor or Admin)')
+    parser.add_argument('--sponsor-id', type=int, default=None,
+                        help='Upload as an admin on behalf of this sponsor (farmer-invitation, code-distribution)')
+    parser.add_argument('--upload-concurrency', type=int, default=1, help='Workbooks uploaded at the same time')
+    parser.add_argument('--timeout', type=float, default=300, help='Per-upload timeout in seconds')
+    parser.add_argument('--url', default=RABBITMQ_URL, help='AMQP URL of the broker the API publishes to')
+    parser.add_argument('--interval', type=float, default=0.25, help='Queue depth sampling interval in seconds')
+    parser.add_argument('--idle-timeout', type=float, default=120,
+                        help='Stop following the queue when its depth has not changed for this many seconds')
+    args = parser.parse_args()
+    if args.sponsor_id is not None and 'obo_path' not in BULK_FORMATS[args.format]:
+        parser.error(f"--sponsor-id: {args.format} has no on-behalf-of upload; it would run as the caller")
+    return args
+
+
+def main():
+    args = parse_args()
+    spec = BULK_FORMATS[args.format]
+    run = int(time.time()) % 100_000
+
+    print("=" * 60)
+    print("BULK EXCEL UPLOAD BENCHMARK")
+    print("=" * 60)
+    print(f"Format: {args.format} ({', '.join(spec['columns'])})")
+
+    # Stage 1: generate
+    started = time.perf_counter()
+    files = generate_files(spec, args.rows, args.rows_per_file, args.output_dir, run, args.tier)
+    generate_seconds = time.perf_counter() - started
+    total_bytes = sum(os.path.getsize(path) for path, _ in files)
+    print(f"\n1. Wrote {args.rows} rows to {len(files)} workbooks ({total_bytes / 1024 / 1024:.1f} MB) "
+          f"in {generate_seconds:.2f} s")
+    oversized = [path for path, rows in files
+                 if rows > MAX_ROWS_PER_FILE or os.path.getsize(path) > MAX_FILE_SIZE_BYTES]
+    if oversized:
+        print(f"   ⚠ {len(oversized)} workbooks exceed {MAX_ROWS_PER_FILE} rows or 5 MB - the API will reject them")
+
+    stages = [['Generate', args.rows, f"{generate_seconds:.2f}", f"{args.rows / generate_seconds:.0f}"]]
+    if args.generate_only:
+        print_table(['Stage', 'Rows', 'Seconds', 'Rows/s'], stages, title='STAGES')
+        return
+
+    # Stage 2: upload, while following the queue
+    follower = QueueFollower(spec['queue'], args.url, args.interval, args.idle_timeout)
+    follower.start()
+
+    path = spec['path']
+    if args.sponsor_id is not None:
+        path = f"{spec['obo_path']}?onBehalfOfSponsorId={args.sponsor_id}"
+    url = args.base_url.rstrip('/') + path
+    headers = {'Authorization': f"Bearer {args.token}"} if args.token else {}
+    session = requests.Session()
+    session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=args.upload_concurrency))
+
+    print(f"\n2. Uploading to {path} ({args.upload_concurrency} at a time)...")
+    started = time.perf_counter()
+    latencies = []
+    errors = Counter()
+    accepted_rows = 0
+    with ThreadPoolExecutor(max_workers=args.upload_concurrency) as pool:
+        outcomes = pool.map(lambda item: (item[1], upload_file(session, url, spec, item[0], headers, args.timeout)),
+                            files)
+        for rows, (latency, accepted, error) in outcomes:
+            latencies.append(latency)
+            if accepted:
+                accepted_rows += rows
+            else:
+                errors[error] += 1
+    upload_seconds = time.perf_counter() - started
+    follower.uploads_done.set()
+    stats = summarize(latencies)
+    print(f"   ✓ {accepted_rows}/{args.rows} rows accepted in {upload_seconds:.1f} s "
+          f"(per file p50 {format_ms(stats['p50'])}, p95 {format_ms(stats['p95'])})")
+    stages.append(['Upload (parse + publish)', accepted_rows, f"{upload_seconds:.2f}",
+                   f"{accepted_rows / upload_seconds:.0f}"])
+
+    # Stage 3: drain
+    print(f"\n3. Following {spec['queue']} until it drains...")
+    follower.join()
+    if follower.error:
+        print(f"   ✗ Could not connect to RabbitMQ: {follower.error}")
+    elif follower.drained_at is not None and accepted_rows:
+        drain_seconds = follower.drained_at - started
+        print(f"   ✓ Drained {drain_seconds:.1f} s after the first upload "
+              f"(peak depth {follower.peak}, consumers {follower.consumers})")
+        stages.append(['Drain (worker, from first upload)', accepted_rows, f"{drain_seconds:.2f}",
+                       f"{accepted_rows / drain_seconds:.0f}"])
+
+    print_table(['Stage', 'Rows', 'Seconds', 'Rows/s'], stages, title='STAGES')
+    print_error_breakdown(errors, len(files))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Pagination scaling benchmark for the plant analysis list endpoints
+
+Sweeps page number (1, 10, 100, 1000, ...), page size and filters over
+GET plantanalyses/list and sponsorship/analyses, and calls the unpaginated
+plantanalyses/my-analyses and plantanalyses/sponsored-analyses once per round,
+recording response time and response size. Meant to run against a database
+filled by seed_plant_analyses.py.
+
+Next to the HTTP numbers, the SQL each endpoint sends is captured with
+EXPLAIN (ANALYZE, BUFFERS) through psycopg2. The handlers load the caller's
+whole result set and filter and page it in memory, so that query carries no
+filter. It is shown together with the filtered query paged in the database,
+with LIMIT/OFFSET at every swept page and with a keyset (seek) condition. The report shows whether time follows the page
+number (offset pagination) or the size of the caller's data (full fetch), and
+which plans fall back to sequential scans or sorts.
+
+By default the benchmark logs in as the seeded farmer and sponsor with the
+most analyses; pass tokens to use other accounts. sponsored-analyses is
+Admin-only and keys on the caller's SponsorId claim, or else the caller's
+name, so it returns the admin's own set (usually empty), whatever was
+seeded; its plan is captured for that same key.
+
+Examples:
+    python test_pagination_scaling.py
+    python test_pagination_scaling.py --pages 1,10,100,1000,5000 --page-sizes 10,50 --repeat 5
+    python test_pagination_scaling.py --farmer-token <jwt> --sponsor-token <jwt> --admin-token <jwt> \\
+        --explain-dir plans/
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Union
+
+import requests
+import urllib3
+
+from analysis_db import AnalysisDb
+from api_smoke_runner import DEFAULT_BASE_URL, LOGIN_PATH
+from perf_stats import format_ms, print_error_breakdown, print_table, summarize
+from seed_plant_analyses import DEFAULT_PASSWORD, SEED_EMAIL_DOMAIN
+from test_sponsor_analytics_cache import jwt_claims, jwt_user_id
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+RECENT_DAYS = 30
+# GetSponsoredAnalyses: User.FindFirst("SponsorId") ?? User.Identity.Name
+SPONSOR_KEY_CLAIMS = ("SponsorId", "http://schemas.xmlsoap.org/ws/2005/05/identity/claims/name", "unique_name",
+                      "name")
+
+# name -> path, role whose token calls it, paged, largest accepted pageSize
+ENDPOINTS = {
+    "list": ("/api/v1/plantanalyses/list", "farmer", True, 50),
+    "sponsorship-analyses": ("/api/v1/sponsorship/analyses", "sponsor", True, 100),
+    "my-analyses": ("/api/v1/plantanalyses/my-analyses", "farmer", False, None),
+    "sponsored-analyses": ("/api/v1/plantanalyses/sponsored-analyses", "admin", False, None),
+}
+
+# filter name -> query string per endpoint (None: the endpoint has no such filter)
+FILTERS = {
+    "none": {"list": {}, "sponsorship-analyses": {}},
+    "completed": {"list": {"status": "Completed"}},
+    "crop": {"list": {"cropType": "tomato"}, "sponsorship-analyses": {"filterByCropType": "tomato"}},
+    "recent": {"list": {"fromDate": "{recent}"}, "sponsorship-analyses": {"startDate": "{recent}"}},
+}
+
+# What the handlers run through EF Core before filtering and paging in memory: WHERE, the ORDER BY sent
+# to Postgres (None: GetListAsync sends none and the handler sorts in memory) and the column the date
+# filter applies to; owner is the caller's user id (owner_text: sponsored-analyses' key)
+BASE_SQL = {
+    "list": ('"UserId" = %(owner)s AND "Status"', '"AnalysisDate" DESC', '"CreatedDate"'),
+    "my-analyses": ('"UserId" = %(owner)s AND "Status"', '"AnalysisDate" DESC', '"CreatedDate"'),
+    "sponsorship-analyses": ('("SponsorUserId" = %(owner)s OR "DealerId" = %(owner)s) '
+                             'AND "AnalysisStatus" IS NOT NULL', None, '"AnalysisDate"'),
+    "sponsored-analyses": ('"SponsorId" = %(owner_text)s AND "Status"', None, '"CreatedDate"'),
+}
+# Order of the proposed OFFSET/keyset pages; sponsored-analyses returns everything and gets none
+PAGED_ORDER = '"AnalysisDate" DESC'
+UNPAGED_SQL = ("sponsored-analyses",)
+FILTER_SQL = {
+    "completed": ('"AnalysisStatus" = %(status)s', {"status": "Completed"}),
+    "crop": ('lower("CropType") LIKE %(crop)s', {"crop": "%tomato%"}),
+    "recent": ('{date_column} >= %(recent)s', {}),
+}
+
+
+class SweepPoint:
+    """Samples of one endpoint / filter / page size / page combination"""
+
+    def __init__(self, endpoint: str, filter_name: str, page_size: Optional[int], page: Optional[int]):
+        self.endpoint = endpoint
+        self.filter_name = filter_name
+        self.page_size = page_size
+        self.page = page
+        self.latencies: List[float] = []
+        self.sizes: List[int] = []
+        self.total_count: Optional[int] = None
+
+
+class PlanSummary:
+    """The numbers of one EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) result that matter for paging"""
+
+    def __init__(self, label: str, plan: Dict):
+        self.label = label
+        self.plan = plan
+        root = plan["Plan"]
+        self.execution_ms = plan.get("Execution Time", 0.0)
+        self.planning_ms = plan.get("Planning Time", 0.0)
+        self.rows = root.get("Actual Rows", 0)
+        self.shared_hit = root.get("Shared Hit Blocks", 0)
+        self.shared_read = root.get("Shared Read Blocks", 0)
+        self.nodes = Counter()
+        self.scans: List[str] = []
+        self._walk(root)
+
+    def _walk(self, node: Dict):
+        node_type = node["Node Type"]
+        self.nodes[node_type] += 1
+        if "Index Name" in node:
+            self.scans.append(f"{node_type} {node['Index Name']}")
+        elif node_type == "Seq Scan":
+            self.scans.append(f"Seq Scan {node.get('Relation Name', '')}")
+        for child in node.get("Plans", ()):
+            self._walk(child)
+
+    @property
+    def warnings(self) -> List[str]:
+        found = []
+        if any(scan.startswith("Seq Scan") for scan in self.scans):
+            found.append("seq scan")
+        if self.nodes["Sort"]:
+            found.append("sort")
+        if self.shared_read > self.shared_hit:
+            found.append("mostly disk reads")
+        return found
+
+
+def login(base_url: str, email: str, password: str) -> Optional[str]:
+    response = requests.post(base_url.rstrip("/") + LOGIN_PATH, json={"email": email, "password": password},
+                             verify=False, timeout=30)
+    data = (response.json() if response.content else {}).get("data") or {}
+    return data.get("token")
+
+
+def heaviest_seeded_users(conn) -> Dict[str, Tuple[int, str, int]]:
+    """role -> (user id, e-mail, analyses) of the seeded farmer and sponsor with the most analyses"""
+    users = {}
+    queries = {
+        "farmer": '''SELECT p."UserId", u."Email", COUNT(*) FROM "PlantAnalyses" p
+                     JOIN "Users" u ON u."UserId" = p."UserId"
+                     WHERE u."Email" LIKE %s AND p."Status"
+                     GROUP BY p."UserId", u."Email" ORDER BY 3 DESC LIMIT 1''',
+        "sponsor": '''SELECT p."SponsorUserId", u."Email", COUNT(*) FROM "PlantAnalyses" p
+                      JOIN "Users" u ON u."UserId" = p."SponsorUserId"
+                      WHERE u."Email" LIKE %s
+                      GROUP BY p."SponsorUserId", u."Email" ORDER BY 3 DESC LIMIT 1''',
+    }
+    with conn.cursor() as cursor:
+        for role, sql in queries.items():
+            cursor.execute(sql, ("%@" + SEED_EMAIL_DOMAIN,))
+            row = cursor.fetchone()
+            if row:
+                users[role] = row
+    return users
+
+
+def explain(conn, sql: str, params: Dict) -> Dict:
+    with conn.cursor() as cursor:
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+        return cursor.fetchone()[0][0]
+
+
+def sql_variants(endpoint: str, filter_name: str, owner: Union[int, str], recent: datetime, pages: List[int],
+                 page_size: int) -> List[Tuple[str, str, Dict]]:
+    """
+    (label, SQL, parameters) for the full fetch, every OFFSET page and a keyset page. The full fetch is
+    what the API runs today, without the filter; the paged variants apply it in the database.
+    """
+    where, order, date_column = BASE_SQL[endpoint]
+    params = {"owner": owner, "owner_text": str(owner), "recent": recent}
+    full_fetch = f'SELECT * FROM "PlantAnalyses" WHERE {where}' + (f" ORDER BY {order}" if order else "")
+    variants = [("full fetch (current)", full_fetch, dict(params))]
+    if endpoint in UNPAGED_SQL:
+        return variants
+
+    if filter_name in FILTER_SQL:
+        condition, extra = FILTER_SQL[filter_name]
+        where = f"{where} AND {condition.format(date_column=date_column)}"
+        params.update(extra)
+    base = f'SELECT * FROM "PlantAnalyses" WHERE {where} ORDER BY {PAGED_ORDER}'
+    for page in pages:
+        variants.append((f"OFFSET page {page}", f"{base} LIMIT %(limit)s OFFSET %(offset)s",
+                         {**params, "limit": page_size, "offset": (page - 1) * page_size}))
+    # Seek from an AnalysisDate boundary: cost of any page equals the cost of page 1
+    keyset = base.replace(" ORDER BY", ' AND "AnalysisDate" < %(before)s ORDER BY', 1) + " LIMIT %(limit)s"
+    variants.append(("keyset (any page)", keyset, {**params, "before": datetime.now(), "limit": page_size}))
+    return variants
+
+
+def fetch(session: requests.Session, url: str, params: Dict, headers: Dict[str, str], timeout: float,
+          point: SweepPoint, errors: Counter, record: bool):
+    started = time.perf_counter()
+    try:
+        response = session.get(url, params=params, headers=headers, timeout=timeout)
+        elapsed = time.perf_counter() - started
+    except requests.Timeout:
+        errors[f"{point.endpoint}: Timeout"] += 1
+        return
+    except requests.RequestException as e:
+        errors[f"{point.endpoint}: {type(e).__name__}"] += 1
+        return
+    if response.status_code >= 400:
+        errors[f"{point.endpoint}: HTTP {response.status_code}"] += 1
+        return
+    if not record:
+        return
+    point.latencies.append(elapsed)
+    point.sizes.append(len(response.content))
+    if point.total_count is None:
+        try:
+            data = response.json().get("data")
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            point.total_count = (data.get("totalCount") or (data.get("pagination") or {}).get("totalCount")
+                                 or (data.get("summary") or {}).get("totalAnalyses"))
+        elif isinstance(data, list):
+            point.total_count = len(data)
+
+
+def run_sweep(args, tokens: Dict[str, str], recent: datetime) -> Tuple[List[SweepPoint], Counter]:
+    session = requests.Session()
+    session.verify = False
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    base_url = args.base_url.rstrip("/")
+    errors = Counter()
+    points = []
+
+    for name in args.endpoint:
+        path, role, paged, max_page_size = ENDPOINTS[name]
+        if role not in tokens:
+            print(f"   {name}: skipped, no {role} token")
+            continue
+        headers = {"Authorization": f"Bearer {tokens[role]}", "Accept": "application/json"}
+        combos = []
+        if paged:
+            for filter_name in args.filters:
+                query = FILTERS[filter_name].get(name)
+                if query is None:
+                    continue
+                query = {key: value.format(recent=recent.isoformat()) if isinstance(value, str) else value
+                         for key, value in query.items()}
+                for page_size in args.page_sizes:
+                    if page_size > max_page_size:
+                        continue
+                    for page in args.pages:
+                        combos.append((SweepPoint(name, filter_name, page_size, page),
+                                       {**query, "page": page, "pageSize": page_size}))
+        else:
+            combos.append((SweepPoint(name, "none", None, None), {}))
+
+        for point, params in combos:
+            fetch(session, base_url + path, params, headers, args.timeout, point, errors, record=False)
+            for _ in range(args.repeat):
+                fetch(session, base_url + path, params, headers, args.timeout, point, errors, record=True)
+            points.append(point)
+        print(f"   {name}: {len(combos)} combinations")
+
+    session.close()
+    return points, errors
+
+
+def run_explains(args, owners: Dict[str, Union[int, str]], recent: datetime) -> Dict[Tuple[str, str], List[PlanSummary]]:
+    plans = {}
+    page_size = max(size for size in args.page_sizes)
+    with AnalysisDb(max_connections=1) as db, db.connection() as conn:
+        for name in args.endpoint:
+            role = ENDPOINTS[name][1]
+            if role not in owners:
+                continue
+            for filter_name in args.filters:
+                # Same combinations as the HTTP sweep; unpaged endpoints take no filters
+                if FILTERS[filter_name].get(name) is None if ENDPOINTS[name][2] else filter_name != "none":
+                    continue
+                summaries = []
+                for label, sql, params in sql_variants(name, filter_name, owners[role], recent, args.pages,
+                                                       page_size):
+                    summaries.append(PlanSummary(label, explain(conn, sql, params)))
+                plans[(name, filter_name)] = summaries
+    return plans
+
+
+def print_sweep(points: List[SweepPoint]):
+    first_page: Dict[Tuple, float] = {}
+    rows = []
+    for point in points:
+        stats = summarize(point.latencies)
+        key = (point.endpoint, point.filter_name, point.page_size)
+        if point.page in (1, None) and stats["count"]:
+            first_page[key] = stats["p50"]
+        baseline = first_page.get(key)
+        rows.append([point.endpoint, point.filter_name, point.page_size or "-", point.page or "-",
+                     point.total_count if point.total_count is not None else "-",
+                     format_ms(stats["p50"]), format_ms(stats["p95"]),
+                     f"{sum(point.sizes) / len(point.sizes) / 1024:.1f}" if point.sizes else "-",
+                     f"{stats['p50'] / baseline:.1f}x" if baseline and stats["count"] else "-"])
+    print_table(["Endpoint", "Filter", "Size", "Page", "Total", "p50", "p95", "KB", "vs page 1"], rows,
+                title="HTTP SWEEP")
+
+
+def print_plans(plans: Dict[Tuple[str, str], List[PlanSummary]], explain_dir: Optional[str]):
+    rows = []
+    for (name, filter_name), summaries in plans.items():
+        for summary in summaries:
+            rows.append([name, filter_name, summary.label, summary.rows, f"{summary.execution_ms:.1f} ms",
+                         f"{summary.shared_hit}/{summary.shared_read}", ", ".join(dict.fromkeys(summary.scans)),
+                         ", ".join(summary.warnings) or "-"])
+    print_table(["Endpoint", "Filter", "Query", "Rows", "Execution", "Buffers hit/read", "Scans", "Warnings"],
+                rows, title="EXPLAIN (ANALYZE, BUFFERS)")
+
+    if explain_dir:
+        os.makedirs(explain_dir, exist_ok=True)
+        for (name, filter_name), summaries in plans.items():
+            path = os.path.join(explain_dir, f"{name}_{filter_name}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({summary.label: summary.plan for summary in summaries}, f, indent=2, default=str)
+        print(f"\n✓ Plans written to {explain_dir}")
+
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Deep-page and filter sweep over the analysis list endpoints")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="API base URL")
+    parser.add_argument("--endpoint", action="append", choices=sorted(ENDPOINTS),
+                        help="Benchmark only this endpoint (repeatable; default: all)")
+    parser.add_argument("--pages", type=parse_int_list, default=[1, 10, 100, 1000], help="Pages to sweep")
+    parser.add_argument("--page-sizes", type=parse_int_list, default=[20, 50], help="Page sizes to sweep")
+    parser.add_argument("--filters", type=lambda value: value.split(","), default=list(FILTERS),
+                        help=f"Filters to sweep ({', '.join(FILTERS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="Measured requests per combination (after a warm-up)")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-request timeout in seconds")
+    parser.add_argument("--farmer-token", default=None,
+                        help="Farmer JWT (default: log in as the heaviest seeded farmer)")
+    parser.add_argument("--sponsor-token", default=None,
+                        help="Sponsor JWT (default: log in as the heaviest seeded sponsor)")
+    parser.add_argument("--admin-token", default=os.environ.get("ZIRAAI_TOKEN"),
+                        help="Admin JWT for sponsored-analyses (default: $ZIRAAI_TOKEN)")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password of the seeded accounts")
+    parser.add_argument("--skip-http", action="store_true", help="Only capture the EXPLAIN plans")
+    parser.add_argument("--skip-explain", action="store_true", help="Only run the HTTP sweep")
+    parser.add_argument("--explain-dir", default=None, help="Write the full JSON plans to this directory")
+    args = parser.parse_args()
+    args.endpoint = args.endpoint or list(ENDPOINTS)
+    unknown = [name for name in args.filters if name not in FILTERS]
+    if unknown:
+        parser.error(f"unknown filters: {', '.join(unknown)}")
+    return args
+
+
+def main():
+    args = parse_args()
+    recent = (datetime.now() - timedelta(days=RECENT_DAYS)).replace(microsecond=0)
+
+    print("=" * 60)
+    print("PAGINATION SCALING BENCHMARK")
+    print("=" * 60)
+    print(f"Target: {args.base_url}")
+    print(f"Pages: {args.pages}, page sizes: {args.page_sizes}, filters: {', '.join(args.filters)}")
+
+    tokens = {role: token for role, token in (("farmer", args.farmer_token), ("sponsor", args.sponsor_token),
+                                              ("admin", args.admin_token)) if token}
+    owners = {role: int(jwt_user_id(token)) for role, token in tokens.items() if jwt_user_id(token)}
+
+    missing = [role for role in ("farmer", "sponsor") if role not in tokens]
+    if missing:
+        with AnalysisDb(max_connections=1) as db, db.connection() as conn:
+            seeded = heaviest_seeded_users(conn)
+        for role in missing:
+            if role not in seeded:
+                print(f"⚠️  No seeded {role} found (run seed_plant_analyses.py) and no --{role}-token")
+                continue
+            user_id, email, analyses = seeded[role]
+            owners[role] = user_id
+            token = None if args.skip_http else login(args.base_url, email, args.password)
+            if token:
+                tokens[role] = token
+            status = "" if token or args.skip_http else " - login failed"
+            print(f"{role.capitalize()}: {email} ({analyses:,} analyses){status}")
+    # sponsored-analyses matches the SponsorId text column against the admin's own SponsorId claim or name
+    if "admin" in tokens:
+        claims = jwt_claims(tokens["admin"])
+        sponsor_key = next((claims[claim] for claim in SPONSOR_KEY_CLAIMS if claims.get(claim)), None)
+        if sponsor_key is None:
+            owners.pop("admin", None)
+            print("⚠️  Admin token has no SponsorId or name claim - sponsored-analyses plan skipped")
+        else:
+            owners["admin"] = str(sponsor_key)
+            print(f"Admin: sponsored-analyses returns SponsorId = {owners['admin']!r}")
+
+    if not args.skip_http:
+        print("\nHTTP sweep...")
+        points, errors = run_sweep(args, tokens, recent)
+        print_sweep(points)
+        print_error_breakdown(errors, sum(args.repeat + 1 for _ in points))
+
+    if not args.skip_explain:
+        print("\nEXPLAIN (ANALYZE, BUFFERS)...")
+        plans = run_explains(args, owners, recent)
+        print_plans(plans, args.explain_dir)
+
+
+if __name__ == "__main__":
+    main()
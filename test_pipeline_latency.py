@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency tracker for the async plant analysis pipeline
+
+Submits N analyses to /api/plantanalyses/analyze-async and follows every
+AnalysisId in "PlantAnalyses" until "AnalysisStatus" reaches Completed (or
+Failed), polling all pending ids with one batched query (analysis_db.py) and an
+adaptive backoff instead of a fixed sleep.
+
+Per-stage timings come from the row timestamps:
+    submit         -> inserted        "CreatedDate" (API, DateTime.Now)
+    inserted       -> N8N processed   "ProcessingTimestamp" (copied by the worker from N8N's
+                                      processing_metadata.processing_timestamp, UTC)
+    N8N processed  -> stored          "UpdatedDate" (worker, DateTime.Now, when it saves the result)
+    inserted       -> stored          both written on the API/worker host, independent of N8N's clock
+All values are converted to UTC before subtracting: the DateTime.Now columns are
+read as local time of this host, so run the tracker on the same host (or
+timezone) as the API and worker. Pass --processing-timestamp-local if the N8N
+workflow sends a local processing_timestamp instead of UTC.
+
+Examples:
+    python test_pipeline_latency.py --token <jwt> --count 50
+    python test_pipeline_latency.py --token <jwt> --count 20 --mock-n8n
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import requests
+import urllib3
+
+from analysis_db import AnalysisDb, AnalysisState
+from perf_stats import print_histogram, print_latency_summary
+from test_async_flow import ASYNC_ANALYZE_URL, BASE_URL, TEST_REQUEST
+
+# Disable SSL warnings for local testing
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+MOCK_N8N_URL = f"{BASE_URL}/api/test/mock-n8n-response"
+
+
+class TrackedAnalysis:
+    """Client-side timestamps of one submitted analysis"""
+
+    def __init__(self, analysis_id: str, submitted_at: datetime, submit_started: float, submit_done: float):
+        self.analysis_id = analysis_id
+        self.submitted_at = submitted_at
+        self.submit_started = submit_started
+        self.submit_done = submit_done
+        self.seen_inserted: Optional[float] = None
+        self.seen_final: Optional[float] = None
+        self.row: Optional[AnalysisState] = None
+
+
+def submit_analysis(session: requests.Session, headers: Dict[str, str]) -> Optional[TrackedAnalysis]:
+    submitted_at = datetime.now(timezone.utc)
+    started = time.monotonic()
+    try:
+        response = session.post(ASYNC_ANALYZE_URL, json=TEST_REQUEST, headers=headers, verify=False, timeout=60)
+    except requests.RequestException as e:
+        print(f"   ✗ Submit failed: {e}")
+        return None
+    done = time.monotonic()
+
+    if response.status_code not in (200, 202):
+        print(f"   ✗ HTTP {response.status_code}: {response.text[:200]}")
+        return None
+    result = response.json()
+    analysis_id = result.get("analysis_id") or result.get("data")
+    if not result.get("success") or not analysis_id:
+        print(f"   ✗ Failed: {result.get('message', 'Unknown error')}")
+        return None
+    return TrackedAnalysis(analysis_id, submitted_at, started, done)
+
+
+def send_mock_n8n_response(session: requests.Session, analysis_id: str):
+    """Ask the test controller to publish a mock result, as test_async_flow.py does"""
+    mock_request = {
+        "analysisId": analysis_id,
+        "userId": TEST_REQUEST["userId"],
+        "farmerId": TEST_REQUEST["farmerId"],
+        "sponsorId": TEST_REQUEST["sponsorId"],
+        "cropType": TEST_REQUEST["cropType"],
+    }
+    response = session.post(MOCK_N8N_URL, json=mock_request, verify=False, timeout=30)
+    if response.status_code != 200:
+        print(f"   ✗ Mock response failed for {analysis_id}: HTTP {response.status_code}")
+
+
+def to_utc(value: Optional[datetime], naive_is_utc: bool) -> Optional[datetime]:
+    """Timestamp columns are "timestamp without time zone"; naive values are local time unless naive_is_utc"""
+    if value is None:
+        return None
+    if value.tzinfo is None and naive_is_utc:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def seconds_between(start: Optional[datetime], end: Optional[datetime]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return (end - start).total_seconds()
+
+
+def report(tracked: Dict[str, TrackedAnalysis], processing_timestamp_utc: bool):
+    stages = {
+        "submit (HTTP round trip)": [],
+        "submit -> inserted": [],
+        "inserted -> N8N processed": [],
+        "N8N processed -> stored": [],
+        "inserted -> stored": [],
+        "end-to-end (observed by tracker)": [],
+    }
+    statuses: Dict[str, int] = {}
+
+    for item in tracked.values():
+        stages["submit (HTTP round trip)"].append(item.submit_done - item.submit_started)
+        if item.row is None:
+            statuses["NotFound"] = statuses.get("NotFound", 0) + 1
+            continue
+
+        row = item.row
+        statuses[row.status] = statuses.get(row.status, 0) + 1
+        if row.status != "Completed":
+            continue
+
+        created = to_utc(row.created_date, naive_is_utc=False)
+        processed = to_utc(row.processing_timestamp, naive_is_utc=processing_timestamp_utc)
+        stored = to_utc(row.updated_date, naive_is_utc=False)
+        for name, value in (("submit -> inserted", seconds_between(item.submitted_at, created)),
+                            ("inserted -> N8N processed", seconds_between(created, processed)),
+                            ("N8N processed -> stored", seconds_between(processed, stored)),
+                            ("inserted -> stored", seconds_between(created, stored))):
+            if value is not None:
+                stages[name].append(value)
+        if item.seen_final is not None:
+            stages["end-to-end (observed by tracker)"].append(item.seen_final - item.submit_started)
+
+    print("\nFinal statuses:")
+    for status, count in sorted(statuses.items()):
+        marker = "✓" if status == "Completed" else "✗"
+        print(f"   {marker} {status}: {count}")
+
+    for name, values in stages.items():
+        print_latency_summary(f"Stage: {name}", values)
+        print_histogram(f"Histogram: {name}", values)
+
+
+def run_tracker(args):
+    headers = {"Accept": "application/json"}
+    if args.token:
+        headers["Authorization"] = f"Bearer {args.token}"
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=args.concurrency)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    print(f"\n1. Submitting {args.count} analyses (concurrency {args.concurrency})...")
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        submitted = list(pool.map(lambda _: submit_analysis(session, headers), range(args.count)))
+    tracked = {item.analysis_id: item for item in submitted if item}
+    print(f"   ✓ {len(tracked)} of {args.count} queued")
+    if not tracked:
+        return
+
+    print("\n2. Following analyses until completion...")
+    mock_pool = ThreadPoolExecutor(max_workers=args.concurrency) if args.mock_n8n else None
+
+    def on_progress(state: AnalysisState):
+        item = tracked[state.analysis_id]
+        now = time.monotonic()
+        if item.seen_inserted is None:
+            item.seen_inserted = now
+            if mock_pool:
+                mock_pool.submit(send_mock_n8n_response, session, item.analysis_id)
+        if state.is_final:
+            item.seen_final = now
+
+    try:
+        with AnalysisDb() as db:
+            rows = db.poll_until_completed(tracked.keys(), timeout=args.timeout,
+                                           initial_delay=args.poll_initial, max_delay=args.poll_max,
+                                           on_progress=on_progress)
+    finally:
+        if mock_pool:
+            mock_pool.shutdown(wait=True)
+
+    for analysis_id, row in rows.items():
+        tracked[analysis_id].row = row
+
+    unfinished = [item.analysis_id for item in tracked.values() if item.row is None or not item.row.is_final]
+    if unfinished:
+        print(f"   ⚠ {len(unfinished)} analyses did not finish within {args.timeout:g} s")
+    report(tracked, processing_timestamp_utc=not args.processing_timestamp_local)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="End-to-end async pipeline latency tracker")
+    parser.add_argument("--count", type=int, default=10, help="Number of analyses to submit")
+    parser.add_argument("--concurrency", type=int, default=5, help="Parallel submit requests")
+    parser.add_argument("--token", default=os.environ.get("ZIRAAI_TOKEN"),
+                        help="Bearer token of a Farmer/Admin user (default: $ZIRAAI_TOKEN)")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds to wait for all analyses")
+    parser.add_argument("--poll-initial", type=float, default=0.05, help="Initial poll delay in seconds")
+    parser.add_argument("--poll-max", type=float, default=2.0, help="Maximum poll delay in seconds")
+    parser.add_argument("--mock-n8n", action="store_true",
+                        help="Publish a mock N8N result through /api/test/mock-n8n-response once each row appears")
+    parser.add_argument("--processing-timestamp-local", action="store_true",
+                        help="N8N's processing_timestamp is local time, not UTC (the mock endpoint sends UTC)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("=" * 60)
+    print("ASYNC PIPELINE LATENCY TRACKER")
+    print("=" * 60)
+    run_tracker(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Queue-drain benchmark for PlantAnalysisWorkerService
+
+Pre-fills a queue with N messages (publisher confirms, see
+test_rabbitmq_publisher.py), then samples the queue depth with passive
+queue_declare calls while the worker consumes it. Reports drain rate,
+time-to-empty and an estimate of per-message queue wait (tail latency).
+
+The worker can already be running or be started after the pre-fill; the
+drain clock starts at the first sample where the depth goes down.
+
+Intended for a local RabbitMQ container, e.g.:
+    docker run -d -p 5672:5672 -e RABBITMQ_DEFAULT_USER=dev -e RABBITMQ_DEFAULT_PASS=devpass rabbitmq:3
+    python test_queue_drain.py --queue plant-analysis-results --count 5000
+
+Invitation/distribution messages point at --bulk-job-id/--sponsor-id; use
+ids of a local test job and run the worker with the mock SMS provider.
+"""
+
+import argparse
+import json
+import time
+import uuid
+from bisect import bisect_left
+from datetime import datetime
+
+import pika
+
+from perf_stats import print_latency_summary, print_table, summarize
+from test_rabbitmq_publisher import (MULTI_IMAGE_RESULT_QUEUE, RABBITMQ_URL, RESULT_QUEUE,
+                                     BulkResultPublisher, ResultMessageFactory)
+
+FARMER_INVITATION_QUEUE = 'farmer-invitation-requests'
+DEALER_INVITATION_QUEUE = 'dealer-invitation-requests'
+FARMER_CODE_DISTRIBUTION_QUEUE = 'farmer-code-distribution-requests'
+FARMER_SUBSCRIPTION_ASSIGNMENT_QUEUE = 'farmer-subscription-assignment-requests'
+
+WORKER_QUEUES = (
+    RESULT_QUEUE,
+    MULTI_IMAGE_RESULT_QUEUE,
+    FARMER_INVITATION_QUEUE,
+    DEALER_INVITATION_QUEUE,
+    FARMER_CODE_DISTRIBUTION_QUEUE,
+    FARMER_SUBSCRIPTION_ASSIGNMENT_QUEUE,
+)
+
+
+class BulkRowMessageFactory:
+    """Renders the per-row queue messages the Bulk*Service classes publish"""
+
+    def __init__(self, queue_name, bulk_job_id, sponsor_id, purchase_id):
+        self.queue_name = queue_name
+        self.bulk_job_id = bulk_job_id
+        self.sponsor_id = sponsor_id
+        self.purchase_id = purchase_id
+        self.correlation_id = str(bulk_job_id)
+
+    def _row(self, index):
+        phone = f"+90555{index:07d}"
+        common = {
+            'CorrelationId': self.correlation_id,
+            'RowNumber': index + 2,  # row 1 is the Excel header
+            'BulkJobId': self.bulk_job_id,
+            'Phone': phone,
+            'Email': f"bench{index}@drain.test",
+            'QueuedAt': datetime.utcnow().isoformat() + 'Z',
+        }
+
+        if self.queue_name == FARMER_INVITATION_QUEUE:
+            common.update({'SponsorId': self.sponsor_id, 'FarmerName': f"Bench Farmer {index}",
+                           'PackageTier': 'M', 'Notes': 'queue drain benchmark', 'Channel': 'SMS',
+                           'CustomMessage': None})
+        elif self.queue_name == DEALER_INVITATION_QUEUE:
+            common.update({'SponsorId': self.sponsor_id, 'DealerName': f"Bench Dealer {index}",
+                           'InvitationType': 'Invite', 'PackageTier': 'M', 'CodeCount': 1,
+                           'SendSms': False})
+        elif self.queue_name == FARMER_CODE_DISTRIBUTION_QUEUE:
+            common.update({'SponsorId': self.sponsor_id, 'PurchaseId': self.purchase_id,
+                           'FarmerName': f"Bench Farmer {index}", 'SendSms': False})
+        elif self.queue_name == FARMER_SUBSCRIPTION_ASSIGNMENT_QUEUE:
+            common.update({'AdminId': self.sponsor_id, 'FirstName': 'Bench', 'LastName': f"Farmer{index}",
+                           'SubscriptionTierId': 2, 'DurationDays': 30, 'SendNotification': False,
+                           'NotificationMethod': 'SMS', 'AutoActivate': True, 'Notes': 'queue drain benchmark'})
+        return common
+
+    def render(self, index):
+        return str(index), self.correlation_id, json.dumps(self._row(index)).encode('utf-8')
+
+
+def build_factory(args, queue_name):
+    if queue_name in (RESULT_QUEUE, MULTI_IMAGE_RESULT_QUEUE):
+        run_id = datetime.utcnow().strftime('%Y%m%d%H%M%S') + uuid.uuid4().hex[:4]
+        return ResultMessageFactory(queue_name, run_id)
+    return BulkRowMessageFactory(queue_name, args.bulk_job_id, args.sponsor_id, args.purchase_id)
+
+
+def sample_depth(channel, queue_name):
+    """Ready-message and consumer counts from a passive declare (never creates the queue)"""
+    frame = channel.queue_declare(queue=queue_name, passive=True)
+    return frame.method.message_count, frame.method.consumer_count
+
+
+def sample_until_drained(queue_name, url, interval, timeout, idle_timeout):
+    """Sample (time, depth) until the queue is empty or stops moving"""
+    connection = pika.BlockingConnection(pika.URLParameters(url))
+    channel = connection.channel()
+    samples = []
+    consumers = 0
+    deadline = time.perf_counter() + timeout
+    last_change = time.perf_counter()
+
+    try:
+        while time.perf_counter() < deadline:
+            depth, consumers = sample_depth(channel, queue_name)
+            now = time.perf_counter()
+            if samples and depth != samples[-1][1]:
+                last_change = now
+            samples.append((now, depth))
+
+            if depth == 0:
+                break
+            if now - last_change > idle_timeout:
+                print(f"   ⚠ Depth stuck at {depth} for {idle_timeout:g} s (consumers: {consumers})")
+                break
+            time.sleep(interval)
+    finally:
+        connection.close()
+
+    return samples, consumers
+
+
+def estimate_queue_waits(samples, publish_times):
+    """
+    Estimate how long each message waited in the queue. The queue is FIFO,
+    so message k left it once the depth fell to (total - k - 1); its wait is
+    that moment minus its publish time. Sampling granularity bounds the error.
+    """
+    total = len(publish_times)
+    times = [t for t, _ in samples]
+    consumed = [total - depth for _, depth in samples]  # non-decreasing during a drain
+    waits = []
+    for index, published_at in enumerate(publish_times):
+        position = bisect_left(consumed, index + 1)
+        if position == len(times):
+            break
+        waits.append(max(0.0, times[position] - published_at))
+    return waits
+
+
+def run_queue(args, queue_name):
+    print(f"\n{'=' * 60}\nQUEUE: {queue_name}\n{'=' * 60}")
+
+    connection = pika.BlockingConnection(pika.URLParameters(args.url))
+    try:
+        initial_depth, consumers = sample_depth(connection.channel(), queue_name)
+    except pika.exceptions.ChannelClosedByBroker:
+        print(f"   ✗ Queue {queue_name} does not exist - start the worker once so it declares it")
+        return None
+    finally:
+        if connection.is_open:
+            connection.close()
+    if initial_depth:
+        print(f"   ⚠ Queue already holds {initial_depth} messages; they are included in the drain")
+
+    print(f"\n1. Pre-filling {args.count} messages (consumers attached: {consumers})...")
+    publisher = BulkResultPublisher(args.url, queue_name, args.count, args.window, build_factory(args, queue_name))
+    publisher.run()
+    if not publisher.acked:
+        print("   ✗ No messages were confirmed")
+        return None
+    print(f"   ✓ {publisher.acked} confirmed in {(publisher.finished or time.perf_counter()) - publisher.started:.2f} s")
+
+    print(f"\n2. Sampling depth every {args.interval:g} s until the queue is empty...")
+    samples, consumers = sample_until_drained(queue_name, args.url, args.interval, args.timeout, args.idle_timeout)
+
+    # The drain starts at the last sample before the depth first dropped below its peak
+    peak_index = max(range(len(samples)), key=lambda i: samples[i][1])
+    while peak_index + 1 < len(samples) and samples[peak_index + 1][1] >= samples[peak_index][1]:
+        peak_index += 1
+    start_time, start_depth = samples[peak_index]
+    end_time, end_depth = samples[-1]
+    drained = start_depth - end_depth
+    drain_seconds = end_time - start_time
+
+    rates = []
+    for (t0, d0), (t1, d1) in zip(samples[peak_index:], samples[peak_index + 1:]):
+        if t1 > t0:
+            rates.append((d0 - d1) / (t1 - t0))
+    rate_stats = summarize(rates)
+
+    print(f"   Consumers: {consumers}")
+    print(f"   Drained: {drained} messages in {drain_seconds:.2f} s")
+    if drain_seconds > 0:
+        print(f"   Average drain rate: {drained / drain_seconds:.1f} msgs/s")
+        print(f"   Sampled drain rate p50/p95: {rate_stats['p50']:.1f} / {rate_stats['p95']:.1f} msgs/s")
+    if end_depth == 0:
+        print(f"   ✓ Time to empty: {end_time - publisher.started:.2f} s after pre-fill start")
+    else:
+        print(f"   ✗ Queue not empty ({end_depth} ready messages left)")
+
+    waits = estimate_queue_waits(samples, publisher.publish_times[-args.count:]) if not initial_depth else []
+    if waits:
+        print_latency_summary("Estimated queue wait per message:", waits)
+
+    wait_stats = summarize(waits)
+    return [queue_name, consumers, drained, f"{drain_seconds:.1f}",
+            f"{drained / drain_seconds:.1f}" if drain_seconds > 0 else "-",
+            f"{wait_stats['p99']:.2f}" if waits else "-",
+            "yes" if end_depth == 0 else "no"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure how fast the worker drains its queues")
+    parser.add_argument('--queue', nargs='+', default=[RESULT_QUEUE], choices=WORKER_QUEUES,
+                        help='Queue(s) to benchmark, one after another')
+    parser.add_argument('--count', type=int, default=1000, help='Messages to pre-fill per queue')
+    parser.add_argument('--window', type=int, default=500, help='Unconfirmed messages in flight while pre-filling')
+    parser.add_argument('--interval', type=float, default=0.25, help='Depth sampling interval in seconds')
+    parser.add_argument('--timeout', type=float, default=1800, help='Maximum seconds to wait for a drain')
+    parser.add_argument('--idle-timeout', type=float, default=120,
+                        help='Give up when the depth has not changed for this many seconds')
+    parser.add_argument('--bulk-job-id', type=int, default=1, help='BulkJobId for invitation/distribution messages')
+    parser.add_argument('--sponsor-id', type=int, default=1, help='SponsorId (AdminId for subscription assignment)')
+    parser.add_argument('--purchase-id', type=int, default=1, help='PurchaseId for code distribution messages')
+    parser.add_argument('--url', default=RABBITMQ_URL, help='AMQP connection URL')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("=" * 60)
+    print("WORKER QUEUE DRAIN BENCHMARK")
+    print("=" * 60)
+
+    rows = [row for row in (run_queue(args, queue) for queue in args.queue) if row]
+    if rows:
+        print_table(["Queue", "Consumers", "Drained", "Seconds", "Msgs/s", "Wait p99 (s)", "Empty"], rows,
+                    title="DRAIN SUMMARY")
+
+
+if __name__ == "__main__":
+    main()
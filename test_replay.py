@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Replay a recorded stream of API requests against a local API
+
+Reads a JSONL capture one line at a time (plain or .gz), so captures of any
+size replay in constant memory, and re-issues every request at its recorded
+offset scaled by --speed (1 = real time, 10 = ten times faster, max = as fast
+as the workers go). Requests of the same user always go to the same worker,
+so per-user ordering is preserved; records without a user are spread over
+the workers round-robin. When the capture has recorded latencies,
+the replayed latency distribution is compared with them per endpoint.
+
+Capture format, one object per line (only method and path are required):
+    {"ts": 12.5, "method": "POST", "path": "/api/v1/plantanalyses/analyze-async",
+     "body": {...}, "user": "42", "status": 200, "latency_ms": 180.2}
+ts is seconds since the start of the capture (the first line's ts is taken
+as zero when it is not). Lines with a malformed method or path, or a
+non-numeric ts, status or latency_ms, are skipped and counted.
+
+Examples:
+    python test_replay.py capture.jsonl.gz --token <jwt>
+    python test_replay.py capture.jsonl --speed 10 --workers 64 --tokens-file users.txt
+    python test_replay.py capture.jsonl --speed max --limit 50000
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import re
+import time
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Optional
+
+import aiohttp
+
+from api_smoke_runner import DEFAULT_BASE_URL, login
+from perf_stats import format_ms, print_error_breakdown, print_latency_summary, print_table, summarize
+
+NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+GUID_SEGMENT = re.compile(r"/[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}(?=/|$)")
+HTTP_METHOD = re.compile(r"^[A-Za-z]+$")
+NUMERIC_FIELDS = ("ts", "status", "latency_ms")
+ANONYMOUS_USER = ""
+
+
+def endpoint_group(method: str, path: str) -> str:
+    """'GET /api/v1/plantanalyses/{id}' for any id, so latencies aggregate per endpoint"""
+    path = path.split("?", 1)[0]
+    path = NUMERIC_SEGMENT.sub("/{id}", GUID_SEGMENT.sub("/{id}", path))
+    return f"{method.upper()} {path}"
+
+
+def is_valid_record(record) -> bool:
+    """A method token, an absolute path and numeric ts/status/latency_ms when present"""
+    if not isinstance(record, dict):
+        return False
+    method, path = record.get("method"), record.get("path")
+    if not isinstance(method, str) or not HTTP_METHOD.match(method):
+        return False
+    if not isinstance(path, str) or not path.startswith("/"):
+        return False
+    return all(record.get(field) is None
+               or (isinstance(record[field], (int, float)) and not isinstance(record[field], bool))
+               for field in NUMERIC_FIELDS)
+
+
+def read_capture(path: str, skipped: Counter) -> Iterator[Dict]:
+    """Yield capture records one by one; unparseable or malformed lines are counted in `skipped`"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict) or "method" not in record or "path" not in record:
+                skipped["unparseable line"] += 1
+                continue
+            if not is_valid_record(record):
+                skipped["malformed record"] += 1
+                continue
+            yield record
+
+
+def parse_speed(value: str) -> float:
+    """Replay speed factor; 'max' (0) ignores the recorded timing"""
+    if value.lower() in ("max", "0"):
+        return 0.0
+    speed = float(value.rstrip("xX"))
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive or 'max'")
+    return speed
+
+
+class ReplayResult:
+    """Replayed and recorded samples, per endpoint group"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.recorded: Dict[str, List[float]] = defaultdict(list)
+        self.schedule_lags: List[float] = []
+        self.status_mismatches: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.sent = 0
+
+
+async def replay_one(session: aiohttp.ClientSession, base_url: str, record: Dict, headers: Dict[str, str],
+                     result: ReplayResult):
+    group = endpoint_group(record["method"], record["path"])
+    body = record.get("body")
+    data = None if body is None else (body if isinstance(body, str) else json.dumps(body)).encode("utf-8")
+
+    result.sent += 1
+    started = time.perf_counter()
+    try:
+        async with session.request(record["method"], base_url + record["path"], data=data,
+                                   headers=headers) as response:
+            await response.read()
+            elapsed = time.perf_counter() - started
+    except asyncio.TimeoutError:
+        result.errors["Timeout"] += 1
+        return
+    except aiohttp.ClientError as e:
+        result.errors[type(e).__name__] += 1
+        return
+
+    if response.status >= 400 and record.get("status", 200) < 400:
+        result.errors[f"HTTP {response.status}"] += 1
+        return
+    if "status" in record and response.status != record["status"]:
+        result.status_mismatches[f"{group}: {record['status']} -> {response.status}"] += 1
+
+    result.latencies[group].append(elapsed)
+    if record.get("latency_ms") is not None:
+        result.recorded[group].append(record["latency_ms"] / 1000)
+
+
+async def worker(queue: asyncio.Queue, session: aiohttp.ClientSession, base_url: str,
+                 headers_for, result: ReplayResult):
+    """Replays its queue strictly in order; every request of a user lands on the same queue"""
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        record, due = item
+        # Lag at send time: a backlogged worker sends later than the request was queued
+        if due is not None:
+            result.schedule_lags.append(max(0.0, time.perf_counter() - due))
+        try:
+            await replay_one(session, base_url, record, headers_for(record.get("user", ANONYMOUS_USER)), result)
+        except Exception as e:
+            # A dead worker would leave its bounded queue full and block the dispatcher for good
+            result.errors[f"replay failed: {type(e).__name__}"] += 1
+
+
+async def replay(args, tokens: Dict[str, str]) -> ReplayResult:
+    result = ReplayResult()
+    skipped = Counter()
+    base_url = args.base_url.rstrip("/")
+    connector = aiohttp.TCPConnector(limit=args.workers, ssl=False)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        default_token = args.token
+        if not default_token and args.email and args.password:
+            default_token = await login(session, base_url, args.email, args.password)
+            print("✓ Logged in" if default_token else "✗ Login failed - authenticated requests will return 401")
+
+        base_headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        header_cache: Dict[str, Dict[str, str]] = {}
+
+        def headers_for(user: str) -> Dict[str, str]:
+            headers = header_cache.get(user)
+            if headers is None:
+                token = tokens.get(str(user), default_token)
+                headers = {**base_headers, "Authorization": f"Bearer {token}"} if token else base_headers
+                header_cache[user] = headers
+            return headers
+
+        # Bounded queues keep memory flat: the reader waits when a worker falls behind
+        queues = [asyncio.Queue(maxsize=args.queue_depth) for _ in range(args.workers)]
+        workers = [asyncio.ensure_future(worker(queue, session, base_url, headers_for, result))
+                   for queue in queues]
+
+        started = time.perf_counter()
+        first_ts = None
+        dispatched = 0
+        for record in read_capture(args.capture, skipped):
+            if args.limit and dispatched >= args.limit:
+                break
+            due = None
+            if args.speed:
+                ts = float(record.get("ts", 0))
+                first_ts = ts if first_ts is None else first_ts
+                due = started + (ts - first_ts) / args.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            user = record.get("user")
+            user = ANONYMOUS_USER if user is None else str(user)
+            if user == ANONYMOUS_USER:
+                # No ordering to keep: round-robin, or a capture without users replays on one worker
+                index = dispatched % len(queues)
+            else:
+                # crc32 rather than hash(): stable across runs, so a user maps to the same worker every time
+                index = zlib.crc32(user.encode("utf-8")) % len(queues)
+            await queues[index].put((record, due))
+            dispatched += 1
+            if dispatched % args.progress == 0:
+                print(f"   {dispatched} dispatched, {time.perf_counter() - started:.0f} s")
+
+        for queue in queues:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+        print(f"\n✓ Replayed {dispatched} requests in {time.perf_counter() - started:.1f} s")
+
+    result.errors.update(skipped)
+    return result
+
+
+def load_tokens(path: Optional[str]) -> Dict[str, str]:
+    """'user token' pairs mapping captured users to tokens of local test accounts"""
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return dict(line.split(None, 1) for line in (line.strip() for line in f) if line)
+
+
+def print_comparison(result: ReplayResult, top: int):
+    rows = []
+    groups = sorted(result.latencies, key=lambda group: len(result.latencies[group]), reverse=True)
+    for group in groups[:top]:
+        replayed = summarize(result.latencies[group])
+        recorded = summarize(result.recorded.get(group, ()))
+        change = ((replayed["p95"] - recorded["p95"]) / recorded["p95"] * 100
+                  if recorded["count"] and recorded["p95"] else None)
+        rows.append([group, replayed["count"],
+                     format_ms(recorded["p50"]), format_ms(replayed["p50"]),
+                     format_ms(recorded["p95"]), format_ms(replayed["p95"]),
+                     f"{change:+.0f}%" if change is not None else "-"])
+    print_table(["Endpoint", "Requests", "Rec p50", "Replay p50", "Rec p95", "Replay p95", "p95 change"],
+                rows, title=f"REPLAYED VS RECORDED (top {min(top, len(groups))} of {len(groups)} endpoints)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay a JSONL capture of API requests")
+    parser.add_argument("capture", help="JSONL capture (.gz is read compressed)")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="API base URL")
+    parser.add_argument("--speed", type=parse_speed, default=1.0, help="1 = recorded pace, N = N times faster, max")
+    parser.add_argument("--workers", type=int, default=32, help="Concurrent workers (per-user order is kept)")
+    parser.add_argument("--queue-depth", type=int, default=1000, help="Buffered requests per worker")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N requests")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--token", default=os.environ.get("ZIRAAI_TOKEN"),
+                        help="Bearer token for users without a --tokens-file entry (default: $ZIRAAI_TOKEN)")
+    parser.add_argument("--tokens-file", default=None, help="File with one 'user token' pair per line")
+    parser.add_argument("--email", default=os.environ.get("ZIRAAI_EMAIL"), help="Login email for the default token")
+    parser.add_argument("--password", default=os.environ.get("ZIRAAI_PASSWORD"), help="Login password")
+    parser.add_argument("--top", type=int, default=25, help="Endpoints to list in the comparison")
+    parser.add_argument("--progress", type=int, default=10000, help="Print progress every N requests")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("REQUEST STREAM REPLAY")
+    print("=" * 60)
+    print(f"Capture: {args.capture}")
+    print(f"Target: {args.base_url}")
+    print(f"Speed: {'max' if not args.speed else f'{args.speed:g}x'}, {args.workers} workers")
+
+    result = asyncio.run(replay(args, load_tokens(args.tokens_file)))
+
+    all_replayed = [latency for latencies in result.latencies.values() for latency in latencies]
+    all_recorded = [latency for latencies in result.recorded.values() for latency in latencies]
+    print_latency_summary("Replayed latency", all_replayed)
+    if all_recorded:
+        print_latency_summary("Recorded latency", all_recorded)
+    if args.speed:
+        print_latency_summary("Send lag behind the recorded schedule", result.schedule_lags)
+    print_comparison(result, args.top)
+
+    if result.status_mismatches:
+        print("\nStatus differences from the capture:")
+        for kind, count in result.status_mismatches.most_common(10):
+            print(f"   ≠ {kind}: {count}")
+    print_error_breakdown(result.errors, result.sent)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Fan-out load tester for the PlantAnalysisHub SignalR hub (/hubs/plantanalysis)
+
+Opens many concurrent hub connections that speak the SignalR JSON protocol
+over WebSockets (negotiate, handshake, invocations, keep-alive pings), has
+each subscribe to analyses with SubscribeToAnalysis, then measures how long
+after an analysis is marked Completed the AnalysisCompleted notification
+reaches every connection of its user. The completion time is the CompletedAt
+the worker stamps into the notification, so latency covers the worker ->
+internal endpoint -> hub -> client path.
+
+Notifications are either triggered by this script through the same internal
+endpoint the worker calls (--trigger, default) or awaited from real analyses
+(--listen). Client and API memory per connection are sampled, and --storm
+drops every connection at once to measure the reconnect storm.
+
+Examples:
+    python test_signalr_fanout.py --token <jwt> --user-id 42 --connections 2000
+    python test_signalr_fanout.py --tokens-file users.txt --connections 5000 --api-pid 1234 --storm
+    python test_signalr_fanout.py --token <jwt> --user-id 42 --connections 500 --listen 120
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+from perf_stats import RssSampler, print_error_breakdown, print_latency_summary, print_table
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_BASE_URL = "https://localhost:5001"
+HUB_PATH = "/hubs/plantanalysis"
+NOTIFY_PATH = "/api/internal/signalr/analysis-completed"
+DEFAULT_INTERNAL_SECRET = "ZiraAI_Internal_Secret_2025"  # fallback of WebAPI:InternalSecret
+
+RECORD_SEPARATOR = "\x1e"
+HANDSHAKE = json.dumps({"protocol": "json", "version": 1}) + RECORD_SEPARATOR
+
+# SignalR hub protocol message types
+INVOCATION, COMPLETION, PING, CLOSE = 1, 3, 6, 7
+PING_MESSAGE = json.dumps({"type": PING}) + RECORD_SEPARATOR
+PING_INTERVAL = 15  # server KeepAliveInterval; it drops clients silent for 30 s
+
+# Synthetic AnalysisIds for --trigger, far above real PlantAnalyses ids
+SYNTHETIC_ANALYSIS_ID_BASE = 900_000_000
+
+TIMESTAMP = re.compile(r"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(\.\d+)?")
+
+
+def parse_utc(value: str) -> Optional[float]:
+    """Epoch seconds of a .NET UTC timestamp (7 fractional digits, which fromisoformat rejects before 3.11)"""
+    match = TIMESTAMP.match(value or "")
+    if not match:
+        return None
+    whole = datetime.strptime(match.group(1), "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+    return whole.timestamp() + float(match.group(2) or 0)
+
+
+def utc_timestamp(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class FanoutStats:
+    """Samples shared by every connection"""
+
+    def __init__(self):
+        self.connect_latencies: List[float] = []
+        self.subscribe_latencies: List[float] = []
+        self.errors: Counter = Counter()
+        self.disconnects: Counter = Counter()
+        # AnalysisId -> (user id, receive time - CompletedAt) per delivery
+        self.deliveries: Dict[int, List[Tuple[str, float]]] = defaultdict(list)
+
+
+class HubConnection:
+    """One SignalR JSON-protocol client connection over WebSockets"""
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str, token: str, user_id: str,
+                 stats: FanoutStats, timeout: float = 30):
+        self.session = session
+        self.timeout = timeout
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.user_id = user_id
+        self.stats = stats
+        self.ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self.reader: Optional[asyncio.Task] = None
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.invocation_ids = itertools.count(1)
+        self.closing = False
+        self.disconnected = False
+
+    @property
+    def connected(self) -> bool:
+        return self.ws is not None and not self.ws.closed
+
+    async def connect(self) -> bool:
+        """Negotiate, open the WebSocket and complete the handshake; records the latency"""
+        started = time.perf_counter()
+        self.closing = False
+        self.disconnected = False
+        try:
+            async with self.session.post(f"{self.base_url}{HUB_PATH}/negotiate?negotiateVersion=1",
+                                         headers={"Authorization": f"Bearer {self.token}"}) as response:
+                if response.status != 200:
+                    self.stats.errors[f"negotiate: HTTP {response.status}"] += 1
+                    return False
+                negotiation = await response.json(content_type=None)
+            connection_token = negotiation.get("connectionToken") or negotiation["connectionId"]
+
+            ws_url = re.sub(r"^http", "ws", self.base_url) + HUB_PATH
+            self.ws = await self.session.ws_connect(ws_url, params={"id": connection_token, "access_token": self.token},
+                                                    autoping=True, max_msg_size=0)
+            await self.ws.send_str(HANDSHAKE)
+            reply = await self.ws.receive_str(timeout=self.timeout)
+            handshake = json.loads(reply.split(RECORD_SEPARATOR, 1)[0])
+            if handshake.get("error"):
+                self.stats.errors[f"handshake: {handshake['error']}"] += 1
+                await self.ws.close()
+                return False
+        except asyncio.TimeoutError:
+            self.stats.errors["connect: Timeout"] += 1
+            return False
+        except (aiohttp.ClientError, KeyError, ValueError, TypeError) as e:
+            self.stats.errors[f"connect: {type(e).__name__}"] += 1
+            return False
+
+        self.stats.connect_latencies.append(time.perf_counter() - started)
+        self.reader = asyncio.ensure_future(self._read())
+        # The handshake reply may already carry the first messages
+        self._dispatch(reply.split(RECORD_SEPARATOR, 1)[1])
+        return True
+
+    async def invoke(self, target: str, *arguments, timeout: float = 30):
+        invocation_id = str(next(self.invocation_ids))
+        future = asyncio.get_event_loop().create_future()
+        self.pending[invocation_id] = future
+        await self.ws.send_str(json.dumps({"type": INVOCATION, "invocationId": invocation_id,
+                                           "target": target, "arguments": list(arguments)}) + RECORD_SEPARATOR)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.pending.pop(invocation_id, None)
+
+    async def ping(self):
+        if self.connected:
+            await self.ws.send_str(PING_MESSAGE)
+
+    async def close(self):
+        self.closing = True
+        if self.ws is not None:
+            await self.ws.close()
+        if self.reader is not None:
+            await self.reader
+
+    def _record_disconnect(self, kind: str):
+        """Count one unexpected disconnect per connection, whichever way it is noticed first"""
+        if not self.closing and not self.disconnected:
+            self.disconnected = True
+            self.stats.disconnects[kind] += 1
+
+    async def _read(self):
+        async for message in self.ws:
+            if message.type == aiohttp.WSMsgType.TEXT:
+                self._dispatch(message.data)
+            elif message.type == aiohttp.WSMsgType.ERROR:
+                self._record_disconnect(type(self.ws.exception()).__name__)
+        self._record_disconnect("closed by server")
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("connection closed"))
+
+    def _dispatch(self, data: str):
+        received = time.time()
+        for record in data.split(RECORD_SEPARATOR):
+            if not record:
+                continue
+            message = json.loads(record)
+            kind = message.get("type")
+            if kind == INVOCATION and message.get("target") == "AnalysisCompleted":
+                notification = message["arguments"][0]
+                completed = parse_utc(notification.get("completedAt") or notification.get("CompletedAt"))
+                analysis_id = notification.get("analysisId", notification.get("AnalysisId"))
+                if completed is not None:
+                    self.stats.deliveries[analysis_id].append((self.user_id, received - completed))
+            elif kind == COMPLETION:
+                future = self.pending.get(message.get("invocationId"))
+                if future and not future.done():
+                    if message.get("error"):
+                        future.set_exception(RuntimeError(message["error"]))
+                    else:
+                        future.set_result(message.get("result"))
+            elif kind == CLOSE:
+                self._record_disconnect(f"server close: {message.get('error') or 'normal'}")
+
+
+async def subscribe(connection: HubConnection, analysis_ids: List[int]):
+    for analysis_id in analysis_ids:
+        started = time.perf_counter()
+        try:
+            await connection.invoke("SubscribeToAnalysis", analysis_id)
+        except (asyncio.TimeoutError, ConnectionError, RuntimeError, aiohttp.ClientError) as e:
+            connection.stats.errors[f"subscribe: {type(e).__name__}"] += 1
+            continue
+        connection.stats.subscribe_latencies.append(time.perf_counter() - started)
+
+
+async def open_connections(connections: List[HubConnection], ramp_concurrency: int, analysis_ids: List[int],
+                           jitter: float = 0.0) -> float:
+    """Connect (and subscribe) every connection; returns the wall time until the last one finished"""
+    gate = asyncio.Semaphore(ramp_concurrency)
+
+    async def open_one(connection: HubConnection):
+        if jitter:
+            await asyncio.sleep(random.uniform(0, jitter))
+        async with gate:
+            opened = await connection.connect()
+        if opened and analysis_ids:
+            await subscribe(connection, analysis_ids)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(open_one(connection) for connection in connections))
+    return time.perf_counter() - started
+
+
+async def keep_alive(connections: List[HubConnection]):
+    """One loop pings every connection, instead of a timer task per connection"""
+    while True:
+        await asyncio.sleep(PING_INTERVAL)
+        await asyncio.gather(*(connection.ping() for connection in connections), return_exceptions=True)
+
+
+async def trigger_notifications(session: aiohttp.ClientSession, args, user_ids: List[str]) -> Dict[int, str]:
+    """POST AnalysisCompleted for each user through the worker's internal endpoint; returns AnalysisId -> user"""
+    url = args.base_url.rstrip("/") + NOTIFY_PATH
+    triggered = {}
+    sequence = itertools.count(SYNTHETIC_ANALYSIS_ID_BASE)
+    for _ in range(args.notifications):
+        for user_id in user_ids:
+            analysis_id = next(sequence)
+            body = {
+                "internalSecret": args.internal_secret,
+                "userId": int(user_id),
+                "notification": {
+                    "analysisId": analysis_id,
+                    "userId": int(user_id),
+                    "status": "Completed",
+                    "completedAt": utc_timestamp(time.time()),
+                    "cropType": "Tomato",
+                    "primaryConcern": "SignalR fan-out load test",
+                },
+            }
+            async with session.post(url, json=body) as response:
+                if response.status != 200:
+                    print(f"   ✗ Trigger {analysis_id} for user {user_id}: HTTP {response.status}")
+                    continue
+            triggered[analysis_id] = user_id
+        await asyncio.sleep(args.interval)
+    return triggered
+
+
+def load_tokens(args) -> List[Tuple[str, str]]:
+    """(user id, token) pairs; connections are spread round-robin over them"""
+    if args.tokens_file:
+        with open(args.tokens_file, "r", encoding="utf-8") as f:
+            return [tuple(line.split(None, 1)) for line in (line.strip() for line in f) if line]
+    if not args.token:
+        raise SystemExit("--token (with --user-id) or --tokens-file is required")
+    if not args.user_id and not args.listen:
+        raise SystemExit("--trigger needs the user id of --token (--user-id)")
+    return [(str(args.user_id), args.token)]
+
+
+def raise_file_limit(wanted: int):
+    """Thousands of sockets need more than the usual 1024 descriptors"""
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+
+
+def print_deliveries(stats: FanoutStats, expected: Dict[int, int], title: str):
+    latencies = [latency for deliveries in stats.deliveries.values() for _, latency in deliveries]
+    print_latency_summary(f"{title} - completion to client", latencies)
+
+    # Spread: first to last delivery of the same notification across its connections
+    spreads = [max(l for _, l in d) - min(l for _, l in d) for d in stats.deliveries.values() if len(d) > 1]
+    print_latency_summary(f"{title} - fan-out spread (first to last connection)", spreads)
+
+    wanted = sum(expected.values())
+    if wanted:
+        delivered = sum(min(len(stats.deliveries.get(analysis_id, ())), count)
+                        for analysis_id, count in expected.items())
+        print(f"\n   Delivered: {delivered}/{wanted} ({delivered / wanted * 100:.1f}%)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="PlantAnalysisHub SignalR fan-out load tester")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="API base URL")
+    parser.add_argument("--token", default=os.environ.get("ZIRAAI_TOKEN"), help="JWT for every connection")
+    parser.add_argument("--user-id", default=None, help="User id of --token (needed for --trigger)")
+    parser.add_argument("--tokens-file", default=None, help="File with one 'userId token' pair per line")
+    parser.add_argument("--connections", type=int, default=1000, help="Concurrent hub connections")
+    parser.add_argument("--ramp-concurrency", type=int, default=200, help="Connections opening at the same time")
+    parser.add_argument("--subscribe", type=int, default=1,
+                        help="SubscribeToAnalysis calls per connection (synthetic AnalysisIds)")
+    parser.add_argument("--notifications", type=int, default=10, help="Triggered notifications per user")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between triggered notification rounds")
+    parser.add_argument("--internal-secret", default=os.environ.get("ZIRAAI_INTERNAL_SECRET", DEFAULT_INTERNAL_SECRET),
+                        help="WebAPI:InternalSecret for the trigger endpoint")
+    parser.add_argument("--listen", type=float, default=None,
+                        help="Wait this many seconds for real AnalysisCompleted events instead of triggering")
+    parser.add_argument("--settle", type=float, default=5.0, help="Seconds to wait for late deliveries")
+    parser.add_argument("--storm", action="store_true", help="Drop all connections and reconnect them at once")
+    parser.add_argument("--storm-jitter", type=float, default=0.0,
+                        help="Spread storm reconnects uniformly over this many seconds (0 = thundering herd)")
+    parser.add_argument("--timeout", type=float, default=30, help="Connect/handshake timeout in seconds")
+    parser.add_argument("--api-pid", type=int, default=None, help="Local WebAPI PID to sample RSS from")
+    return parser.parse_args()
+
+
+async def run(args):
+    tokens = load_tokens(args)
+    raise_file_limit(args.connections + 256)
+    stats = FanoutStats()
+
+    connector = aiohttp.TCPConnector(limit=0, ssl=False)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=args.timeout, sock_read=None)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        pairs = itertools.islice(itertools.cycle(tokens), args.connections)
+        connections = [HubConnection(session, args.base_url, token, user_id, stats, args.timeout)
+                       for user_id, token in pairs]
+        subscriptions = [SYNTHETIC_ANALYSIS_ID_BASE - 1 - i for i in range(args.subscribe)]
+
+        # Pinging from the start of the ramp: the server drops a connection that stays silent for its
+        # ClientTimeoutInterval (30 s), and ping() skips connections that are not open yet
+        pinger = asyncio.ensure_future(keep_alive(connections))
+
+        # 1. Ramp up
+        print(f"\n1. Opening {args.connections} connections ({args.ramp_concurrency} at a time)...")
+        samplers = [RssSampler(pid, interval=0.5) for pid in (os.getpid(), args.api_pid) if pid]
+        with ExitStack() as stack:
+            for sampler in samplers:
+                stack.enter_context(sampler)
+            elapsed = await open_connections(connections, args.ramp_concurrency, subscriptions)
+            await asyncio.sleep(1)  # let the samplers see the settled footprint
+
+        live = [connection for connection in connections if connection.connected]
+        print(f"   ✓ {len(live)}/{args.connections} connected in {elapsed:.1f} s ({len(live) / elapsed:.0f} conn/s)")
+        memory_rows = []
+        for label, sampler in zip(("client", "api"), samplers):
+            growth = sampler.growth_mb()
+            if growth is not None and live:
+                memory_rows.append([label, f"{growth:.1f} MB", f"{growth * 1024 / len(live):.1f} KB"])
+        if memory_rows:
+            print_table(["Process", "RSS growth", "Per connection"], memory_rows, title="CONNECTION MEMORY")
+
+        # 2. Notifications
+        expected: Dict[int, int] = {}
+        per_user = Counter(connection.user_id for connection in live)
+        if args.listen:
+            print(f"\n2. Listening {args.listen:g} s for AnalysisCompleted...")
+            await asyncio.sleep(args.listen)
+        else:
+            print(f"\n2. Triggering {args.notifications} notification rounds for {len(per_user)} users...")
+            triggered = await trigger_notifications(session, args, list(per_user))
+            expected = {analysis_id: per_user[user_id] for analysis_id, user_id in triggered.items()}
+            await asyncio.sleep(args.settle)
+        print_deliveries(stats, expected, "NOTIFICATION DELIVERY")
+
+        # 3. Reconnect storm
+        if args.storm:
+            print(f"\n3. Reconnect storm: dropping {len(live)} connections...")
+            await asyncio.gather(*(connection.close() for connection in live))
+            stats.connect_latencies.clear()
+            stats.errors.clear()
+            elapsed = await open_connections(live, len(live) or 1, subscriptions, jitter=args.storm_jitter)
+            reconnected = sum(connection.connected for connection in live)
+            print(f"   ✓ {reconnected}/{len(live)} reconnected in {elapsed:.1f} s")
+            print_latency_summary("Reconnect latency (negotiate + handshake)", stats.connect_latencies)
+            print_error_breakdown(stats.errors, len(live))
+        else:
+            print_latency_summary("Connect latency (negotiate + handshake)", stats.connect_latencies)
+            print_latency_summary("SubscribeToAnalysis round trip", stats.subscribe_latencies)
+            print_error_breakdown(stats.errors, args.connections * (1 + args.subscribe))
+
+        if stats.disconnects:
+            print("\nUnexpected disconnects:")
+            for kind, count in stats.disconnects.most_common():
+                print(f"   ✗ {kind}: {count}")
+
+        pinger.cancel()
+        await asyncio.gather(*(connection.close() for connection in connections), return_exceptions=True)
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("SIGNALR PLANTANALYSISHUB FAN-OUT TEST")
+    print("=" * 60)
+    print(f"Hub: {args.base_url.rstrip('/')}{HUB_PATH}")
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
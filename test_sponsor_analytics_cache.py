@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Cold/warm latency and Redis cache-hit profiler for the sponsor analytics GETs
+
+For every sponsor account and analytics endpoint, the endpoint's cache entries
+are deleted from Redis (cold call) and the endpoint is then called again
+--warm times (warm calls). Calls are made one at a time, and the server-wide
+keyspace_hits / keyspace_misses counters from INFO stats are read right before
+and after each one, so the delta is the cache traffic of that request, as
+long as nothing else is using the same Redis. A call with any miss counts as a
+miss, one with only hits as a hit, and one without either as uncached.
+Handlers with [SecuredOperation] also read the caller's claims
+(UserIdForClaim={userId}) from Redis; that read is subtracted, so only the
+endpoint's own cache traffic is counted.
+
+The report shows per endpoint the cold and warm p50/p95, the speed-up, the
+hit ratios, the p50 of calls that missed vs hit and whether the endpoint
+touches the cache at all. Endpoints that are slow on a miss and either do not
+cache or keep missing when warm are the candidates for precomputation.
+
+Without the redis package (pip install redis) or with --no-redis, cold means
+"first call of the run" and the hit columns are left empty.
+
+Examples:
+    python test_sponsor_analytics_cache.py --token <sponsor jwt>
+    python test_sponsor_analytics_cache.py --tokens-file sponsors.txt --warm 10 --rounds 3
+    python test_sponsor_analytics_cache.py --token <jwt> --endpoint roi-analytics --endpoint impact-analytics
+"""
+
+import argparse
+import base64
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import requests
+import urllib3
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+from api_smoke_runner import DEFAULT_BASE_URL
+from perf_stats import format_ms, print_error_breakdown, print_table, summarize
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+SPONSORSHIP_PATH = "/api/v1/sponsorship/"
+# CacheOptions in WebAPI/appsettings.Development.json
+DEFAULT_REDIS_URL = "redis://:devredispass@localhost:6379/0"
+NAME_IDENTIFIER_CLAIMS = ("http://schemas.xmlsoap.org/ws/2005/05/identity/claims/nameidentifier", "nameid", "sub")
+
+# CacheAspect keys are "<query type>.Handle(<property values>)" and are shared by all sponsors
+ASPECT_PREFIX = "Business.Handlers.Sponsorship.Queries."
+ASPECT_KEY = ASPECT_PREFIX + "{}.Handle(*"
+
+# path, query string, Redis key patterns holding its cached result ({sponsor} is the sponsor id),
+# whether the handler has [SecuredOperation]
+ANALYTICS_ENDPOINTS = {
+    "dashboard-summary": ("dashboard-summary", {}, ["SponsorDashboard:{sponsor}"], False),
+    "statistics": ("statistics", {}, [], False),
+    "package-statistics": ("package-statistics", {},
+                           [ASPECT_KEY.format("GetPackageDistributionStatisticsQuery")], True),
+    "code-analysis-statistics": ("code-analysis-statistics", {"page": 1, "pageSize": 50},
+                                 [ASPECT_KEY.format("GetCodeAnalysisStatisticsQuery")], True),
+    "link-statistics": ("link-statistics", {}, [ASPECT_KEY.format("GetLinkStatisticsQuery")], True),
+    "messaging-analytics": ("messaging-analytics", {}, ["SponsorMessagingAnalytics:{sponsor}*"], True),
+    "impact-analytics": ("impact-analytics", {}, ["SponsorImpactAnalytics:{sponsor}"], True),
+    "temporal-analytics": ("temporal-analytics", {"groupBy": "Day"}, ["SponsorTemporalAnalytics:{sponsor}*"], True),
+    "roi-analytics": ("roi-analytics", {}, ["SponsorROIAnalytics:{sponsor}"], True),
+    "farmer-segmentation": ("farmer-segmentation", {}, ["FarmerSegmentation:{sponsor}"], True),
+    "crop-disease-matrix": ("crop-disease-matrix", {}, ["CropDiseaseMatrix:{sponsor}"], True),
+    "competitive-benchmarking": ("competitive-benchmarking", {"timePeriodDays": 90},
+                                 ["CompetitiveBenchmarking:{sponsor}:90"], True),
+    # SponsorDealerAnalyticsCacheService, called straight from SponsorAnalyticsController
+    "dealer-performance": ("analytics/dealer-performance", {}, ["sponsor_dealer_analytics:{sponsor}"], False),
+    "dealer-summary": ("dealer/summary", {}, [], False),
+}
+
+
+def jwt_claims(token: str) -> Dict:
+    """Payload of a JWT (the signature is not checked); empty when it cannot be decoded"""
+    try:
+        payload = token.split(".")[1]
+        return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (IndexError, ValueError):
+        return {}
+
+
+def jwt_user_id(token: str) -> Optional[str]:
+    """User id claim of a JWT (the signature is not checked)"""
+    claims = jwt_claims(token)
+    for claim in NAME_IDENTIFIER_CLAIMS:
+        if claim in claims:
+            return str(claims[claim])
+    return None
+
+
+class KeyspaceCounters:
+    """keyspace_hits / keyspace_misses deltas of one Redis around a request"""
+
+    def __init__(self, url: str):
+        self.client = redis.Redis.from_url(url)
+        self.client.ping()
+
+    def read(self) -> Tuple[int, int]:
+        stats = self.client.info("stats")
+        return stats["keyspace_hits"], stats["keyspace_misses"]
+
+    def purge(self, patterns: List[str]) -> int:
+        """Delete every key matching the patterns (SCAN, never KEYS)"""
+        deleted = 0
+        for pattern in patterns:
+            batch = list(self.client.scan_iter(match=pattern, count=1000))
+            if batch:
+                deleted += self.client.delete(*batch)
+        return deleted
+
+
+class EndpointProfile:
+    """Cold and warm samples of one endpoint across all sponsors"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.cold: List[float] = []
+        self.warm: List[float] = []
+        self.outcomes: Dict[str, Counter] = {"cold": Counter(), "warm": Counter()}
+        self.by_outcome: Dict[str, List[float]] = defaultdict(list)
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.purged = 0
+        self.bytes = 0
+        self.errors: Counter = Counter()
+        self.sent = 0
+
+
+def claims_lookups(secured: bool, aspect_cached: bool, misses: int) -> int:
+    """
+    Keyspace hits a successful call spends on SecuredOperation's claims read. CacheAspect
+    (Priority 0) runs before SecuredOperation (Priority 1) and answers a cached result without
+    reaching it, so behind an aspect the claims are only read when the aspect missed.
+    """
+    if not secured:
+        return 0
+    return 1 if misses or not aspect_cached else 0
+
+
+def classify(hits: int, misses: int) -> str:
+    if misses:
+        return "miss"
+    return "hit" if hits else "uncached"
+
+
+def call(session: requests.Session, url: str, params: Dict, headers: Dict[str, str], timeout: float,
+         counters: Optional[KeyspaceCounters], profile: EndpointProfile, phase: str, secured: bool,
+         aspect_cached: bool):
+    before = counters.read() if counters else None
+    profile.sent += 1
+    started = time.perf_counter()
+    try:
+        response = session.get(url, params=params, headers=headers, timeout=timeout)
+        elapsed = time.perf_counter() - started
+    except requests.Timeout:
+        profile.errors["Timeout"] += 1
+        return
+    except requests.RequestException as e:
+        profile.errors[type(e).__name__] += 1
+        return
+    after = counters.read() if counters else None
+
+    if response.status_code >= 400:
+        profile.errors[f"HTTP {response.status_code}"] += 1
+        return
+    (profile.cold if phase == "cold" else profile.warm).append(elapsed)
+    profile.bytes += len(response.content)
+    if counters:
+        hits, misses = after[0] - before[0], after[1] - before[1]
+        # A successful secured call found its claims, so that read was a hit
+        hits = max(0, hits - claims_lookups(secured, aspect_cached, misses))
+        profile.hits[phase] += hits
+        profile.misses[phase] += misses
+        outcome = classify(hits, misses)
+        profile.outcomes[phase][outcome] += 1
+        profile.by_outcome[outcome].append(elapsed)
+
+
+def profile_endpoints(args, sponsors: List[Tuple[str, str]], counters: Optional[KeyspaceCounters]
+                      ) -> Dict[str, EndpointProfile]:
+    session = requests.Session()
+    session.verify = False
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    names = args.endpoint or list(ANALYTICS_ENDPOINTS)
+    profiles = {name: EndpointProfile(name) for name in names}
+    base_url = args.base_url.rstrip("/") + SPONSORSHIP_PATH
+
+    for round_number in range(1, args.rounds + 1):
+        for sponsor_id, token in sponsors:
+            headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+            for name in names:
+                path, params, patterns, secured = ANALYTICS_ENDPOINTS[name]
+                aspect_cached = any(pattern.startswith(ASPECT_PREFIX) for pattern in patterns)
+                profile = profiles[name]
+                if counters:
+                    profile.purged += counters.purge([pattern.format(sponsor=sponsor_id) for pattern in patterns])
+                elif round_number > 1:
+                    continue  # without Redis only the very first call is known to be cold
+                call(session, base_url + path, params, headers, args.timeout, counters, profile, "cold",
+                     secured, aspect_cached)
+                for _ in range(args.warm):
+                    call(session, base_url + path, params, headers, args.timeout, counters, profile, "warm",
+                         secured, aspect_cached)
+        print(f"   Round {round_number}/{args.rounds} done")
+
+    session.close()
+    return profiles
+
+
+def print_report(profiles: Dict[str, EndpointProfile], with_redis: bool):
+    rows = []
+    def cold_p50(profile: EndpointProfile) -> float:
+        p50 = summarize(profile.cold)["p50"]
+        return -1.0 if p50 != p50 else p50
+
+    for profile in sorted(profiles.values(), key=cold_p50, reverse=True):
+        cold, warm = summarize(profile.cold), summarize(profile.warm)
+        speedup = f"{cold['p50'] / warm['p50']:.1f}x" if cold["count"] and warm["count"] and warm["p50"] else "-"
+        rows.append([profile.name, cold["count"], format_ms(cold["p50"]), format_ms(cold["p95"]),
+                     warm["count"], format_ms(warm["p50"]), format_ms(warm["p95"]), speedup,
+                     f"{profile.bytes / max(1, cold['count'] + warm['count']) / 1024:.1f}"])
+    print_table(["Endpoint", "Cold", "Cold p50", "Cold p95", "Warm", "Warm p50", "Warm p95", "Speed-up", "Avg KB"],
+                rows, title="COLD VS WARM LATENCY (slowest cold first)")
+
+    if not with_redis:
+        return
+
+    def ratio(hits: int, misses: int) -> str:
+        return f"{hits / (hits + misses) * 100:.0f}%" if hits + misses else "-"
+
+    rows = []
+    for profile in profiles.values():
+        warm = profile.outcomes["warm"]
+        warm_calls = sum(warm.values())
+        cached = profile.hits["cold"] + profile.misses["cold"] + profile.hits["warm"] + profile.misses["warm"]
+        rows.append([profile.name,
+                     ratio(profile.hits["cold"], profile.misses["cold"]),
+                     ratio(profile.hits["warm"], profile.misses["warm"]),
+                     f"{warm['hit']}/{warm_calls}" if warm_calls else "-",
+                     format_ms(summarize(profile.by_outcome["miss"])["p50"]),
+                     format_ms(summarize(profile.by_outcome["hit"])["p50"]),
+                     profile.purged,
+                     "yes" if cached else "no"])
+    print_table(["Endpoint", "Cold hit ratio", "Warm hit ratio", "Warm from cache", "Miss p50", "Hit p50",
+                 "Keys purged", "Uses cache"], rows, title="REDIS KEYSPACE HITS / MISSES")
+
+    uncached = [profile.name for profile in profiles.values()
+                if not any(profile.hits.values()) and not any(profile.misses.values())]
+    if uncached:
+        print(f"\n   Never touched Redis: {', '.join(uncached)}")
+
+
+def load_sponsors(args) -> List[Tuple[str, str]]:
+    """(sponsor id, token) pairs; the id is read from the token when not given"""
+    if args.tokens_file:
+        with open(args.tokens_file, "r", encoding="utf-8") as f:
+            lines = [line.split() for line in (line.strip() for line in f) if line]
+        sponsors = [(parts[0], parts[1]) if len(parts) > 1 else (jwt_user_id(parts[0]), parts[0]) for parts in lines]
+    elif args.token:
+        sponsors = [(args.sponsor_id or jwt_user_id(args.token), args.token)]
+    else:
+        raise SystemExit("--token or --tokens-file is required")
+    unknown = [token for sponsor_id, token in sponsors if not sponsor_id]
+    if unknown:
+        raise SystemExit(f"{len(unknown)} tokens carry no user id claim; give 'sponsorId token' pairs")
+    return sponsors
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sponsor analytics cold/warm latency and Redis hit profiler")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="API base URL")
+    parser.add_argument("--token", default=os.environ.get("ZIRAAI_TOKEN"),
+                        help="Bearer token of a sponsor (default: $ZIRAAI_TOKEN)")
+    parser.add_argument("--sponsor-id", default=None, help="User id of --token (default: read from the token)")
+    parser.add_argument("--tokens-file", default=None, help="One 'sponsorId token' pair (or token) per line")
+    parser.add_argument("--endpoint", action="append", choices=sorted(ANALYTICS_ENDPOINTS),
+                        help="Profile only this endpoint (repeatable; default: all)")
+    parser.add_argument("--warm", type=int, default=5, help="Warm calls after every cold call")
+    parser.add_argument("--rounds", type=int, default=3, help="Cold/warm rounds per sponsor")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-request timeout in seconds")
+    parser.add_argument("--redis-url", default=os.environ.get("ZIRAAI_REDIS_URL", DEFAULT_REDIS_URL),
+                        help="Redis the API caches in (default: $ZIRAAI_REDIS_URL or the development config)")
+    parser.add_argument("--no-redis", action="store_true", help="Do not purge keys or read hit counters")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    sponsors = load_sponsors(args)
+
+    counters = None
+    if not args.no_redis:
+        if redis is None:
+            print("⚠️  redis package not installed - profiling without purges and hit counters")
+        else:
+            try:
+                counters = KeyspaceCounters(args.redis_url)
+            except redis.RedisError as e:
+                print(f"⚠️  Redis unavailable ({e}) - profiling without purges and hit counters")
+
+    print("=" * 60)
+    print("SPONSOR ANALYTICS CACHE PROFILE")
+    print("=" * 60)
+    print(f"Target: {args.base_url}")
+    print(f"Sponsors: {len(sponsors)}, rounds: {args.rounds}, warm calls per cold call: {args.warm}")
+    print(f"Redis: {args.redis_url if counters else 'not used'}")
+
+    profiles = profile_endpoints(args, sponsors, counters)
+    print_report(profiles, counters is not None)
+
+    errors = Counter()
+    for profile in profiles.values():
+        errors.update({f"{profile.name}: {kind}": count for kind, count in profile.errors.items()})
+    print_error_breakdown(errors, sum(profile.sent for profile in profiles.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for sponsorship code redemption
+
+Buys a pool of codes with POST sponsorship/purchase-package (as a sponsor),
+then redeems them from many farmer accounts at once over a pooled keep-alive
+aiohttp session. Like the mobile app, a --validate-share of the farmers first
+checks the code with GET sponsorship/validate/{code} and only redeems it when
+the code is reported valid; validate latency is reported apart from redeem
+(--validate-share 0 sends bare redeems, which races hardest). A share of the
+codes is raced: --race-factor farmers send their redeem for the same code at
+the same instant, and exactly one of them may win. Afterwards every code is
+checked in one batched Postgres query (SponsorshipCodes joined with the
+UserSubscriptions created from them) and any code that produced more than
+one subscription is reported.
+
+Farmer accounts come from --farmers-file (one e-mail per line, password
+--farmer-password); with --register-farmers missing accounts are registered
+first and their e-mails appended to that file for the next run. Every account
+is logged in at the start of each run, since access tokens expire after an hour.
+
+Examples:
+    python test_sponsorship_redeem.py --sponsor-token <jwt> --farmers-file farmers.txt --codes 1000
+    python test_sponsorship_redeem.py --sponsor-token <jwt> --farmers-file farmers.txt \\
+        --register-farmers --farmers 2000 --codes 2000 --race-share 0.25 --race-factor 4 --concurrency 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from analysis_db import AnalysisDb
+from api_smoke_runner import DEFAULT_BASE_URL, login
+from perf_stats import format_ms, print_error_breakdown, print_latency_summary, print_table
+
+API_PREFIX = "/api/v1"
+PURCHASE_PATH = API_PREFIX + "/sponsorship/purchase-package"
+REDEEM_PATH = API_PREFIX + "/sponsorship/redeem"
+VALIDATE_PATH = API_PREFIX + "/sponsorship/validate/{code}"
+REGISTER_PATH = API_PREFIX + "/Auth/register"
+
+# RedeemSponsorshipCodeAsync answers a code that is already used with this message
+ALREADY_USED_MESSAGE = "Invalid or expired sponsorship code"
+FARMER_PASSWORD = "LoadTest123!"
+
+
+class RedeemResult:
+    """Outcome of every redeem attempt, per code"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.rejected_latencies: List[float] = []
+        self.winners: Dict[str, List[int]] = {}
+        self.rejections: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.sent = 0
+        self.validate_latencies: List[float] = []
+        self.validated = 0
+        self.invalid = 0
+        self.elapsed = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return len(self.latencies)
+
+
+async def purchase_codes(session: aiohttp.ClientSession, base_url: str, headers: Dict[str, str],
+                         args, run_id: str) -> List[str]:
+    """Buy --codes codes in purchases of at most --purchase-batch and return them"""
+    codes: List[str] = []
+    remaining = args.codes
+    while remaining > 0:
+        quantity = min(remaining, args.purchase_batch)
+        body = {
+            "subscriptionTierId": args.tier_id,
+            "quantity": quantity,
+            "totalAmount": 0,
+            "paymentMethod": "CreditCard",
+            "paymentReference": f"LOAD-{run_id}-{len(codes)}",
+            "companyName": "Redeem Load Test",
+            "codePrefix": args.code_prefix,
+            "validityDays": 30,
+            "notes": f"test_sponsorship_redeem run {run_id}",
+        }
+        started = time.perf_counter()
+        async with session.post(base_url + PURCHASE_PATH, json=body, headers=headers) as response:
+            payload = await response.json(content_type=None)
+        if response.status != 200 or not (payload or {}).get("success"):
+            raise SystemExit(f"✗ purchase-package failed: HTTP {response.status} "
+                             f"{(payload or {}).get('message', '')}")
+        generated = [code["code"] for code in payload["data"].get("generatedCodes") or ()]
+        if not generated:
+            raise SystemExit("✗ purchase-package returned no generatedCodes")
+        codes.extend(generated)
+        remaining -= quantity
+        print(f"   Purchased {len(generated)} codes in {format_ms(time.perf_counter() - started)}")
+    return codes
+
+
+async def register_farmers(session: aiohttp.ClientSession, base_url: str, count: int, run_id: str,
+                           password: str, concurrency: int) -> List[str]:
+    """Register `count` farmer accounts and return their e-mails"""
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = Counter()
+
+    async def register(index: int) -> Optional[str]:
+        email = f"redeem.load.{run_id}.{index}@test.ziraai.local"
+        body = {"email": email, "password": password, "fullName": f"Redeem Load {index}", "role": "Farmer"}
+        async with semaphore:
+            try:
+                async with session.post(base_url + REGISTER_PATH, json=body) as response:
+                    await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                failures[type(e).__name__] += 1
+                return None
+        if response.status != 200:
+            failures[f"register HTTP {response.status}"] += 1
+            return None
+        return email
+
+    emails = [email for email in await asyncio.gather(*(register(i) for i in range(count))) if email]
+    for kind, occurrences in failures.most_common():
+        print(f"   ✗ {kind}: {occurrences}")
+    return emails
+
+
+async def login_farmers(session: aiohttp.ClientSession, base_url: str, emails: List[str], password: str,
+                        concurrency: int) -> List[str]:
+    """Log every farmer in and return the access tokens of those that succeeded"""
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = Counter()
+
+    async def login_one(email: str) -> Optional[str]:
+        async with semaphore:
+            try:
+                token = await login(session, base_url, email, password)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                failures[type(e).__name__] += 1
+                return None
+        if not token:
+            failures["login failed"] += 1
+        return token
+
+    tokens = [token for token in await asyncio.gather(*(login_one(email) for email in emails)) if token]
+    for kind, occurrences in failures.most_common():
+        print(f"   ✗ {kind}: {occurrences}")
+    return tokens
+
+
+def plan_redemptions(codes: List[str], farmers: int, race_share: float, race_factor: int,
+                     seed: int) -> List[List[int]]:
+    """
+    Farmer indexes per code: one for plain codes, `race_factor` distinct ones for raced codes.
+    Farmers are dealt round-robin so load spreads evenly over the accounts.
+    """
+    rng = random.Random(seed)
+    raced = set(rng.sample(range(len(codes)), int(len(codes) * race_share)))
+    plan = []
+    next_farmer = 0
+    for index in range(len(codes)):
+        contenders = min(race_factor, farmers) if index in raced else 1
+        plan.append([(next_farmer + offset) % farmers for offset in range(contenders)])
+        next_farmer = (next_farmer + contenders) % farmers
+    return plan
+
+
+async def validate_once(session: aiohttp.ClientSession, url: str, headers: Dict[str, str],
+                        result: RedeemResult) -> bool:
+    """GET validate/{code}; True when the API reports the code valid (it answers 200 either way)"""
+    result.validated += 1
+    started = time.perf_counter()
+    try:
+        async with session.get(url, headers=headers) as response:
+            payload = await response.read()
+            elapsed = time.perf_counter() - started
+    except asyncio.TimeoutError:
+        result.errors["validate: Timeout"] += 1
+        return False
+    except aiohttp.ClientError as e:
+        result.errors[f"validate: {type(e).__name__}"] += 1
+        return False
+
+    try:
+        data = json.loads(payload) if payload else {}
+    except ValueError:
+        data = {}
+    if response.status != 200 or not isinstance(data, dict):
+        result.errors[f"validate: HTTP {response.status}"] += 1
+        return False
+
+    result.validate_latencies.append(elapsed)
+    if not data.get("success"):
+        result.invalid += 1
+        return False
+    return True
+
+
+async def redeem_once(session: aiohttp.ClientSession, url: str, code: str, farmer: int,
+                      headers: Dict[str, str], result: RedeemResult, validate_url: Optional[str] = None):
+    if validate_url and not await validate_once(session, validate_url, headers, result):
+        return
+
+    result.sent += 1
+    started = time.perf_counter()
+    try:
+        async with session.post(url, json={"code": code}, headers=headers) as response:
+            payload = await response.read()
+            elapsed = time.perf_counter() - started
+    except asyncio.TimeoutError:
+        result.errors["Timeout"] += 1
+        return
+    except aiohttp.ClientError as e:
+        result.errors[type(e).__name__] += 1
+        return
+
+    try:
+        data = json.loads(payload) if payload else {}
+    except ValueError:
+        data = {}
+
+    if response.status == 200 and data.get("success"):
+        result.latencies.append(elapsed)
+        result.winners.setdefault(code, []).append(farmer)
+    elif response.status == 400 and isinstance(data, dict) and "message" in data:
+        # Losing a race (or a farmer-side rule) is a business rejection, not a failure
+        result.rejected_latencies.append(elapsed)
+        result.rejections[data["message"] or "(no message)"] += 1
+    else:
+        result.errors[f"HTTP {response.status}"] += 1
+
+
+async def run_redemptions(session: aiohttp.ClientSession, base_url: str, codes: List[str],
+                          plan: List[List[int]], farmer_headers: List[Dict[str, str]],
+                          concurrency: int, validate_share: float, seed: int) -> RedeemResult:
+    """
+    `concurrency` codes in flight; the contenders of a raced code are released together, each one
+    validating the code first with probability `validate_share`
+    """
+    result = RedeemResult()
+    url = base_url + REDEEM_PATH
+    rng = random.Random(seed)
+    queue: asyncio.Queue = asyncio.Queue()
+    for code, farmers in zip(codes, plan):
+        validate_url = base_url + VALIDATE_PATH.format(code=code)
+        queue.put_nowait((code, [(farmer, validate_url if rng.random() < validate_share else None)
+                                 for farmer in farmers]))
+
+    async def worker():
+        while not queue.empty():
+            code, contenders = queue.get_nowait()
+            await asyncio.gather(*(redeem_once(session, url, code, farmer, farmer_headers[farmer], result,
+                                               validate_url)
+                                   for farmer, validate_url in contenders))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def load_emails(path: Optional[str]) -> List[str]:
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+async def prepare_and_redeem(args, run_id: str):
+    base_url = args.base_url.rstrip("/")
+    connector = aiohttp.TCPConnector(limit=args.connections, ssl=False)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        emails = load_emails(args.farmers_file)
+        if len(emails) < args.farmers and args.register_farmers:
+            missing = args.farmers - len(emails)
+            print(f"\nRegistering {missing} farmer accounts...")
+            registered = await register_farmers(session, base_url, missing, run_id, args.farmer_password,
+                                                args.concurrency)
+            print(f"✓ Registered {len(registered)} farmers")
+            if args.farmers_file and registered:
+                with open(args.farmers_file, "a", encoding="utf-8") as f:
+                    f.writelines(email + "\n" for email in registered)
+            emails.extend(registered)
+        emails = emails[:args.farmers]
+        if not emails:
+            raise SystemExit("✗ No farmer accounts (use --farmers-file, optionally with --register-farmers)")
+
+        print(f"\nLogging in {len(emails)} farmers...")
+        tokens = await login_farmers(session, base_url, emails, args.farmer_password, args.concurrency)
+        if not tokens:
+            raise SystemExit("✗ No farmer could log in")
+        if len(tokens) < args.farmers:
+            print(f"⚠️  Only {len(tokens)} farmers logged in, using those")
+
+        sponsor_headers = {"Authorization": f"Bearer {args.sponsor_token}"}
+        print(f"\nPurchasing {args.codes} codes (tier {args.tier_id})...")
+        codes = await purchase_codes(session, base_url, sponsor_headers, args, run_id)
+
+        farmer_headers = [{"Authorization": f"Bearer {token}"} for token in tokens]
+        plan = plan_redemptions(codes, len(tokens), args.race_share, args.race_factor, args.seed)
+        raced = sum(1 for farmers in plan if len(farmers) > 1)
+        print(f"\nRedeeming {len(codes)} codes from {len(tokens)} farmers "
+              f"({raced} raced by {args.race_factor}, {args.validate_share:.0%} validated first), "
+              f"{args.concurrency} codes in flight...")
+        result = await run_redemptions(session, base_url, codes, plan, farmer_headers, args.concurrency,
+                                       args.validate_share, args.seed)
+    return codes, plan, result
+
+
+def verify_codes(codes: List[str], result: RedeemResult) -> int:
+    """Check every code in one batched query; returns the number of codes redeemed more than once"""
+    with AnalysisDb() as db:
+        started = time.perf_counter()
+        redemptions = db.fetch_code_redemptions(codes)
+        print(f"\nVerified {len(redemptions)} codes in Postgres in {format_ms(time.perf_counter() - started)}")
+
+    missing = [code for code in codes if code not in redemptions]
+    duplicated = [r for r in redemptions.values() if r.redeemed_more_than_once]
+    api_duplicates = {code: farmers for code, farmers in result.winners.items() if len(farmers) > 1}
+    unrecorded = [code for code in result.winners if code in redemptions and not redemptions[code].is_used]
+    used_without_win = [r.code for r in redemptions.values() if r.is_used and r.code not in result.winners]
+
+    print_table(["Check", "Codes"], [
+        ["Redeemed more than once (subscriptions > 1)", len(duplicated)],
+        ["Accepted more than once by the API", len(api_duplicates)],
+        ["Accepted by the API but IsUsed = false", len(unrecorded)],
+        ["IsUsed = true without an accepted redeem", len(used_without_win)],
+        ["Not found in SponsorshipCodes", len(missing)],
+    ], title="REDEMPTION INTEGRITY")
+
+    for record in sorted(duplicated, key=lambda r: r.subscriptions, reverse=True)[:10]:
+        print(f"   ✗ {record.code}: {record.subscriptions} subscriptions for {record.subscribed_users} users "
+              f"(UsedByUserId {record.used_by_user_id})")
+    return len(duplicated) + len(api_duplicates)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Concurrent sponsorship code redemption stress test")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="API base URL")
+    parser.add_argument("--sponsor-token", default=os.environ.get("ZIRAAI_SPONSOR_TOKEN"),
+                        help="Bearer token of a Sponsor or Admin (default: $ZIRAAI_SPONSOR_TOKEN)")
+    parser.add_argument("--farmers-file", default=None, help="Farmer account e-mails, one per line")
+    parser.add_argument("--farmer-password", default=FARMER_PASSWORD, help="Password of the farmer accounts")
+    parser.add_argument("--register-farmers", action="store_true",
+                        help="Register farmer accounts until --farmers are available")
+    parser.add_argument("--farmers", type=int, default=1000, help="Farmer accounts to redeem from")
+    parser.add_argument("--codes", type=int, default=1000, help="Codes to purchase and redeem")
+    parser.add_argument("--tier-id", type=int, default=2, help="SubscriptionTierId of the codes (S=1 ... XL=4)")
+    parser.add_argument("--purchase-batch", type=int, default=500, help="Codes bought per purchase-package call")
+    parser.add_argument("--code-prefix", default="LOAD", help="CodePrefix of the purchased codes")
+    parser.add_argument("--race-share", type=float, default=0.1, help="Fraction of codes redeemed concurrently")
+    parser.add_argument("--race-factor", type=int, default=3, help="Farmers racing for each raced code")
+    parser.add_argument("--validate-share", type=float, default=1.0,
+                        help="Fraction of farmers that call validate/{code} before redeeming (0-1)")
+    parser.add_argument("--concurrency", type=int, default=200, help="Codes being redeemed at the same time")
+    parser.add_argument("--connections", type=int, default=0, help="Connection pool size (default: unlimited)")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for picking the raced codes")
+    parser.add_argument("--skip-verify", action="store_true", help="Do not check the codes in Postgres")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not args.sponsor_token:
+        raise SystemExit("✗ --sponsor-token (or $ZIRAAI_SPONSOR_TOKEN) is required to purchase codes")
+    if not 0 <= args.validate_share <= 1:
+        raise SystemExit("✗ --validate-share must be between 0 and 1")
+    run_id = time.strftime("%Y%m%d%H%M%S")
+
+    print("=" * 60)
+    print("SPONSORSHIP REDEEM STRESS TEST")
+    print("=" * 60)
+    print(f"Target: {args.base_url}")
+    print(f"Codes: {args.codes}, farmers: {args.farmers}, "
+          f"race: {args.race_share:.0%} of codes x {args.race_factor}")
+
+    codes, plan, result = asyncio.run(prepare_and_redeem(args, run_id))
+
+    print(f"\n✓ {result.sent} redeem attempts and {result.validated} validations in {result.elapsed:.1f} s")
+    print(f"   Throughput: {result.sent / result.elapsed:.1f} attempts/s, "
+          f"{result.succeeded / result.elapsed:.1f} redemptions/s")
+    print(f"   Accepted: {result.succeeded}, rejected: {sum(result.rejections.values())}, "
+          f"failed: {sum(result.errors.values())}")
+    print(f"   Validated: {result.validated}, reported invalid (not redeemed): {result.invalid}")
+    print_latency_summary("Validate latency", result.validate_latencies)
+    print_latency_summary("Accepted redeem latency", result.latencies)
+    print_latency_summary("Rejected redeem latency", result.rejected_latencies)
+
+    raced_codes = [code for code, farmers in zip(codes, plan) if len(farmers) > 1]
+    if raced_codes:
+        won = Counter(len(result.winners.get(code, ())) for code in raced_codes)
+        print_table(["Winners per raced code", "Codes"], sorted(won.items()), title="RACES")
+    if result.rejections:
+        print("\nRejections:")
+        for message, count in result.rejections.most_common(10):
+            marker = "·" if message == ALREADY_USED_MESSAGE else "⚠️ "
+            print(f"   {marker} {message}: {count}")
+    print_error_breakdown(result.errors, result.sent + result.validated)
+
+    if not args.skip_verify:
+        duplicated = verify_codes(codes, result)
+        print(f"\n{'✗' if duplicated else '✓'} {duplicated} codes redeemed more than once")
+        if duplicated:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Upload and signed-URL fetch throughput benchmark for S3-compatible storage
+
+Uploads the kind of objects CloudflareR2StorageService stores (plant images
+under plant-images/ with the same key layout and metadata) at a configurable
+concurrency, then fetches every object through a presigned GET URL from a
+pooled session. Payloads above --multipart-threshold go through concurrent
+multipart uploads. Each --provider is benchmarked with the same payloads, so
+providers can be compared side by side.
+
+By default an in-process s3_standin.py server is started, so the benchmark
+runs offline. Point --provider at moto_server, MinIO or R2 for real numbers:
+    python test_storage_throughput.py
+    python test_storage_throughput.py --provider standin --provider minio=http://localhost:9000
+    python test_storage_throughput.py --provider r2=https://<account>.r2.cloudflarestorage.com \\
+        --bucket ziraai-images --access-key <id> --secret-key <secret>
+"""
+
+import argparse
+import io
+import os
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import boto3
+import requests
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+from image_payloads import IMAGE_EXTENSIONS, IMAGE_MIME_TYPES, generate_image, parse_size
+from perf_stats import format_ms, print_error_breakdown, print_table, summarize
+from s3_standin import start_server
+
+STORAGE_FOLDER = "plant-images"  # folder PlantAnalysisAsyncService uploads to
+STANDIN_PROVIDER = "standin"
+
+
+def object_key(file_name: str) -> str:
+    """Same layout as CloudflareR2StorageService.GenerateS3Key"""
+    now = datetime.utcnow()
+    timestamp = f"{now:%Y%m%d_%H%M%S}_{now.microsecond // 1000:03d}"
+    return f"{STORAGE_FOLDER}/{timestamp}_{uuid.uuid4().hex}_{file_name}"
+
+
+def make_client(endpoint_url: str, args):
+    options = dict(
+        signature_version="s3v4",
+        # Payload signing off, as the API does for R2 (DisablePayloadSigning)
+        s3={"addressing_style": "path", "payload_signing_enabled": False},
+        max_pool_connections=args.concurrency * args.part_concurrency,
+        retries={"max_attempts": 1},
+    )
+    try:
+        # botocore >= 1.36 adds streaming checksums by default; R2 and older servers reject them
+        config = Config(request_checksum_calculation="when_required",
+                        response_checksum_validation="when_required", **options)
+    except TypeError:
+        config = Config(**options)
+
+    return boto3.client("s3", endpoint_url=endpoint_url, region_name=args.region,
+                        aws_access_key_id=args.access_key, aws_secret_access_key=args.secret_key,
+                        config=config)
+
+
+def ensure_bucket(client, bucket: str):
+    try:
+        client.head_bucket(Bucket=bucket)
+    except ClientError:
+        client.create_bucket(Bucket=bucket)
+
+
+class StorageResult:
+    """Samples for one provider and payload size"""
+
+    def __init__(self):
+        self.upload_latencies: List[float] = []
+        self.sign_latencies: List[float] = []
+        self.fetch_latencies: List[float] = []
+        self.errors: Counter = Counter()
+        self.upload_elapsed = 0.0
+        self.fetch_elapsed = 0.0
+
+
+def upload_one(client, bucket: str, payload: bytes, image_format: str, transfer: TransferConfig,
+               result: StorageResult) -> Optional[str]:
+    file_name = f"{uuid.uuid4().hex[:12]}.{IMAGE_EXTENSIONS[image_format]}"
+    key = object_key(file_name)
+    extra = {
+        "ContentType": IMAGE_MIME_TYPES[image_format],
+        "Metadata": {
+            "original-filename": file_name,
+            "upload-timestamp": datetime.utcnow().isoformat(),
+            "content-length": str(len(payload)),
+        },
+    }
+    started = time.perf_counter()
+    try:
+        client.upload_fileobj(io.BytesIO(payload), bucket, key, ExtraArgs=extra, Config=transfer)
+    except (BotoCoreError, ClientError) as e:
+        result.errors[f"upload: {type(e).__name__}"] += 1
+        return None
+    result.upload_latencies.append(time.perf_counter() - started)
+    return key
+
+
+def fetch_one(client, session: requests.Session, bucket: str, key: str, expected: int, expires: int,
+              result: StorageResult):
+    started = time.perf_counter()
+    url = client.generate_presigned_url("get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=expires)
+    signed = time.perf_counter()
+    result.sign_latencies.append(signed - started)
+    try:
+        response = session.get(url, timeout=120)
+        body = response.content
+    except requests.RequestException as e:
+        result.errors[f"fetch: {type(e).__name__}"] += 1
+        return
+    if response.status_code != 200:
+        result.errors[f"fetch: HTTP {response.status_code}"] += 1
+    elif len(body) != expected:
+        result.errors["fetch: size mismatch"] += 1
+    else:
+        result.fetch_latencies.append(time.perf_counter() - signed)
+
+
+def run_size(client, session: requests.Session, args, payload: bytes) -> StorageResult:
+    result = StorageResult()
+    transfer = TransferConfig(multipart_threshold=args.multipart_threshold, multipart_chunksize=args.multipart_chunk,
+                              max_concurrency=args.part_concurrency, use_threads=args.part_concurrency > 1)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        started = time.perf_counter()
+        keys = [key for key in pool.map(
+            lambda _: upload_one(client, args.bucket, payload, args.format, transfer, result),
+            range(args.count)) if key]
+        result.upload_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        list(pool.map(lambda key: fetch_one(client, session, args.bucket, key, len(payload), args.expires, result),
+                      keys))
+        result.fetch_elapsed = time.perf_counter() - started
+
+        if not args.keep:
+            list(pool.map(lambda key: client.delete_object(Bucket=args.bucket, Key=key), keys))
+    return result
+
+
+def parse_providers(specs: List[str]) -> List[Tuple[str, Optional[str]]]:
+    """'label=endpoint' specs; the bare 'standin' label starts the in-process stand-in"""
+    providers = []
+    for spec in specs:
+        label, _, endpoint = spec.partition("=")
+        if not endpoint and label != STANDIN_PROVIDER:
+            raise SystemExit(f"--provider {spec}: expected label=endpoint_url")
+        providers.append((label, endpoint or None))
+    return providers
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="S3-compatible storage upload / signed-URL fetch benchmark")
+    parser.add_argument("--provider", action="append", default=None, metavar="LABEL=ENDPOINT",
+                        help="Storage endpoint to benchmark (repeatable, default: in-process stand-in)")
+    parser.add_argument("--bucket", default="ziraai-bench", help="Bucket to use (created when missing)")
+    parser.add_argument("--access-key", default=os.environ.get("AWS_ACCESS_KEY_ID", "bench"), help="Access key id")
+    parser.add_argument("--secret-key", default=os.environ.get("AWS_SECRET_ACCESS_KEY", "bench"), help="Secret key")
+    parser.add_argument("--region", default="auto", help="Region name (R2 uses 'auto')")
+    parser.add_argument("--sizes", default="100KB,500KB,2MB,10MB", help="Comma separated payload sizes")
+    parser.add_argument("--format", default="jpeg", choices=sorted(IMAGE_MIME_TYPES), help="Payload image format")
+    parser.add_argument("--count", type=int, default=50, help="Objects per payload size")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent uploads / fetches")
+    parser.add_argument("--multipart-threshold", type=parse_size, default=parse_size("8MB"),
+                        help="Use multipart uploads from this size")
+    parser.add_argument("--multipart-chunk", type=parse_size, default=parse_size("8MB"), help="Multipart part size")
+    parser.add_argument("--part-concurrency", type=int, default=4, help="Concurrent parts per multipart upload")
+    parser.add_argument("--expires", type=int, default=900, help="Presigned URL lifetime in seconds")
+    parser.add_argument("--keep", action="store_true", help="Do not delete the uploaded objects")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    providers = parse_providers(args.provider or [STANDIN_PROVIDER])
+
+    print("=" * 60)
+    print("STORAGE UPLOAD / SIGNED FETCH BENCHMARK")
+    print("=" * 60)
+
+    payloads = []
+    for size in args.sizes.split(","):
+        payload, side = generate_image(args.format, parse_size(size))
+        payloads.append(payload)
+        print(f"Payload: {args.format.upper()} {len(payload) / 1024:.0f} KB ({side}x{side})")
+
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency))
+    session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency))
+
+    rows = []
+    errors = Counter()
+    total_requests = 0
+    for label, endpoint in providers:
+        standin = None
+        if endpoint is None:
+            standin = start_server()
+            endpoint = f"http://127.0.0.1:{standin.server_address[1]}"
+        print(f"\n--- {label}: {endpoint} ---")
+
+        try:
+            client = make_client(endpoint, args)
+            ensure_bucket(client, args.bucket)
+            for payload in payloads:
+                result = run_size(client, session, args, payload)
+                upload = summarize(result.upload_latencies)
+                fetch = summarize(result.fetch_latencies)
+                size_mb = len(payload) / 1024 / 1024
+                upload_mbps = len(result.upload_latencies) * size_mb / result.upload_elapsed if result.upload_elapsed else 0
+                fetch_mbps = len(result.fetch_latencies) * size_mb / result.fetch_elapsed if result.fetch_elapsed else 0
+
+                print(f"   {len(payload) / 1024:.0f} KB: upload p50 {format_ms(upload['p50'])} ({upload_mbps:.1f} MB/s), "
+                      f"fetch p50 {format_ms(fetch['p50'])} ({fetch_mbps:.1f} MB/s)")
+                rows.append([label, f"{len(payload) / 1024:.0f} KB", len(result.upload_latencies),
+                             sum(result.errors.values()),
+                             format_ms(upload["p50"]), format_ms(upload["p95"]), f"{upload_mbps:.1f}",
+                             format_ms(summarize(result.sign_latencies)["p50"]),
+                             format_ms(fetch["p50"]), format_ms(fetch["p95"]), f"{fetch_mbps:.1f}"])
+                errors.update({f"{label} {kind}": count for kind, count in result.errors.items()})
+                total_requests += args.count * 2
+        except (BotoCoreError, ClientError) as e:
+            print(f"   ✗ {label} failed: {e}")
+        finally:
+            if standin:
+                standin.shutdown()
+
+    print_table(["Provider", "Payload", "Uploaded", "Errors", "Upload p50", "Upload p95", "Upload MB/s",
+                 "Sign p50", "Fetch p50", "Fetch p95", "Fetch MB/s"], rows, title="STORAGE THROUGHPUT")
+    print_error_breakdown(errors, total_requests)
+
+
+if __name__ == "__main__":
+    main()
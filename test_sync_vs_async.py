@@ -1,10 +1,17 @@
 import requests
+import argparse
+import base64
 import json
+import os
 import time
-import psycopg2
 import urllib3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from analysis_db import AnalysisDb
+from image_payloads import IMAGE_MIME_TYPES, Image, generate_image, parse_size
+from perf_stats import format_ms, print_table, summarize
+
 # Disable SSL warnings for local testing
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -13,14 +20,6 @@ BASE_URL = "https://localhost:5001"
 SYNC_ANALYZE_URL = f"{BASE_URL}/api/plantanalyses/analyze"
 ASYNC_ANALYZE_URL = f"{BASE_URL}/api/plantanalyses/analyze-async"
 
-# Database connection
-DB_CONFIG = {
-    "host": "localhost",
-    "database": "devarchitecture",
-    "user": "postgres",
-    "password": "Admin01!"
-}
-
 # Test image - small base64 image
 test_image_base64 = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8DwHwAFBQIAX8jx0gAAAABJRU5ErkJggg=="
 test_image_data_uri = f"data:image/png;base64,{test_image_base64}"
@@ -126,29 +125,18 @@ def test_async_endpoint():
                 
                 # Check database for URL storage
                 print("\n2. Checking database for URL storage...")
-                conn = psycopg2.connect(**DB_CONFIG)
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    SELECT "ImagePath", "ImageSizeKb", "AnalysisStatus"
-                    FROM "PlantAnalyses"
-                    WHERE "AnalysisId" = %s
-                """, (analysis_id,))
-                
-                row = cursor.fetchone()
+                with AnalysisDb(max_connections=1) as db:
+                    row = db.get_details(analysis_id)
                 if row:
-                    print(f"   Image Path: {row[0]}")
-                    print(f"   Image Size: {row[1]} KB")
-                    print(f"   Status: {row[2]}")
+                    print(f"   Image Path: {row.image_path}")
+                    print(f"   Image Size: {row.image_size_kb} KB")
+                    print(f"   Status: {row.status}")
                     
-                    if row[0]:
-                        image_url = f"{BASE_URL}/{row[0].replace(chr(92), '/')}"
+                    if row.image_path:
+                        image_url = f"{BASE_URL}/{row.image_path.replace(chr(92), '/')}"
                         print(f"   Generated URL: {image_url}")
                         print("   ✓ URL method confirmed")
                         print("   Token usage: ~1,500 (optimized)")
-                
-                cursor.close()
-                conn.close()
             else:
                 print(f"   ✗ Failed: {result.get('message', 'Unknown error')}")
         else:
@@ -197,7 +185,156 @@ def compare_methods():
     print("- AI_IMAGE_OPTIMIZATION = true")
     print("- ApiBaseUrl = <your-public-url>")
 
+# Payload size matrix (--matrix)
+MATRIX_SIZES = "100KB,500KB,1MB,5MB,10MB,20MB"
+MATRIX_FORMATS = "jpeg,png,webp"
+IMAGE_SENTINEL = "@@IMAGE@@"
+
+MATRIX_REQUEST = {
+    "image": IMAGE_SENTINEL,
+    "userId": 1,
+    "farmerId": "MATRIX_TEST_001",
+    "sponsorId": "SPONSOR_MATRIX_001",
+    "location": "Matrix Test Field",
+    "gpsCoordinates": {
+        "lat": 41.0082,
+        "lng": 28.9784
+    },
+    "cropType": "Tomato",
+    "fieldId": "FIELD-MATRIX-001",
+    "urgencyLevel": "Medium",
+    "notes": "Payload size matrix benchmark"
+}
+
+def build_request_body(image_format, image_bytes):
+    """Serialize MATRIX_REQUEST around a base64 data URI once; the bytes are reused for every request"""
+    prefix, suffix = json.dumps(MATRIX_REQUEST).split(json.dumps(IMAGE_SENTINEL))
+    data_uri = f"data:{IMAGE_MIME_TYPES[image_format]};base64,".encode("ascii") + base64.b64encode(image_bytes)
+    return prefix.encode("utf-8") + b'"' + data_uri + b'"' + suffix.encode("utf-8")
+
+def post_payload(session, url, body, headers, timeout):
+    """POST a prebuilt body; returns (latency, analysis_id, error)"""
+    started = time.perf_counter()
+    try:
+        response = session.post(url, data=body, headers=headers, verify=False, timeout=timeout)
+    except requests.Timeout:
+        return None, None, "Timeout"
+    except requests.RequestException as e:
+        return None, None, type(e).__name__
+    elapsed = time.perf_counter() - started
+
+    if response.status_code not in (200, 202):
+        return None, None, f"HTTP {response.status_code}"
+    try:
+        result = response.json()
+    except ValueError:
+        return None, None, "Invalid JSON"
+    if not result.get("success"):
+        return None, None, f"success=false: {result.get('message', 'Unknown error')}"
+
+    data = result.get("data")
+    # Sync returns the analysis DTO, async answers 202 with analysis_id
+    analysis_id = result.get("analysis_id") or (data.get("analysisId") if isinstance(data, dict) else data)
+    return elapsed, analysis_id, None
+
+def run_matrix_cell(session, url, body, headers, args):
+    latencies, analysis_ids, errors = [], [], []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(post_payload, session, url, body, headers, args.timeout)
+                   for _ in range(args.requests)]
+        for future in futures:
+            latency, analysis_id, error = future.result()
+            if error:
+                errors.append(error)
+                continue
+            latencies.append(latency)
+            if analysis_id:
+                analysis_ids.append(analysis_id)
+    elapsed = time.perf_counter() - started
+    return latencies, analysis_ids, errors, elapsed
+
+def run_payload_matrix(args):
+    print("\n" + "="*60)
+    print("PAYLOAD SIZE MATRIX: SYNC VS ASYNC")
+    print("="*60)
+
+    formats = [f.strip().lower() for f in args.formats.split(",") if f.strip()]
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    endpoints = [("sync", SYNC_ANALYZE_URL), ("async", ASYNC_ANALYZE_URL)]
+    endpoints = [(name, url) for name, url in endpoints if name in args.endpoints]
+    if Image is None and formats != ["png"]:
+        print("⚠ Pillow is not installed - only PNG payloads can be generated (pip install Pillow)")
+        formats = [f for f in formats if f == "png"]
+
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    if args.token:
+        headers["Authorization"] = f"Bearer {args.token}"
+
+    # One pooled keep-alive session; connections are shared by all cells
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=args.concurrency)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    db = AnalysisDb(max_connections=1) if args.db else None
+    rows = []
+    try:
+        for image_format in formats:
+            for target in sizes:
+                image_bytes, side = generate_image(image_format, target)
+                body = build_request_body(image_format, image_bytes)
+                print(f"\n{image_format.upper()} {len(image_bytes) / 1024:.0f} KB ({side}x{side}), "
+                      f"request body {len(body) / 1024 / 1024:.1f} MB")
+
+                for name, url in endpoints:
+                    latencies, analysis_ids, errors, elapsed = run_matrix_cell(session, url, body, headers, args)
+                    stats = summarize(latencies)
+                    server_kb = None
+                    if db:
+                        details = db.fetch_details(analysis_ids).values()
+                        server_kb = summarize([float(d.image_size_kb) for d in details if d.image_size_kb is not None])
+                    throughput = len(latencies) / elapsed if elapsed else 0
+                    print(f"   {name}: {len(latencies)}/{args.requests} ok, p50 {format_ms(stats['p50'])}, "
+                          f"p95 {format_ms(stats['p95'])}, {throughput:.2f} req/s"
+                          + (f", errors: {sorted(set(errors))}" if errors else ""))
+
+                    rows.append([image_format, f"{len(image_bytes) / 1024:.0f} KB", name,
+                                 len(latencies), len(errors),
+                                 format_ms(stats["p50"]), format_ms(stats["p95"]),
+                                 f"{throughput:.2f}",
+                                 f"{throughput * len(body) / 1024 / 1024:.1f}",
+                                 f"{server_kb['p50']:.0f}" if server_kb and server_kb["count"] else "-"])
+
+    finally:
+        if db:
+            db.close()
+    print_table(["Format", "Upload", "Endpoint", "OK", "Err", "p50", "p95", "Req/s", "MB/s", "Server KB"],
+                rows, title="PAYLOAD SIZE MATRIX")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare the sync and async plant analysis endpoints")
+    parser.add_argument("--matrix", action="store_true",
+                        help="Benchmark both endpoints across generated image sizes and formats")
+    parser.add_argument("--sizes", default=MATRIX_SIZES, help="Comma separated image sizes (KB/MB suffixes)")
+    parser.add_argument("--formats", default=MATRIX_FORMATS, help="Comma separated formats: jpeg, png, webp")
+    parser.add_argument("--endpoints", nargs="+", default=["sync", "async"], choices=["sync", "async"],
+                        help="Endpoints to include in the matrix")
+    parser.add_argument("--requests", type=int, default=5, help="Requests per endpoint and image")
+    parser.add_argument("--concurrency", type=int, default=1, help="In-flight requests per cell")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-request timeout in seconds")
+    parser.add_argument("--token", default=os.environ.get("ZIRAAI_TOKEN"),
+                        help="Bearer token of a Farmer/Admin user (default: $ZIRAAI_TOKEN)")
+    parser.add_argument("--no-db", dest="db", action="store_false",
+                        help="Do not read the server-side ImageSizeKb from Postgres")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    if args.matrix:
+        run_payload_matrix(args)
+        return
+
     print("\n" + "🚀 PLANT ANALYSIS ENDPOINT TESTER " + "🚀")
     print("Testing both sync and async endpoints with URL method")
     
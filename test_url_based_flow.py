@@ -1,29 +1,36 @@
+import argparse
 import requests
 import json
+import threading
 import time
-import psycopg2
 import urllib3
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from analysis_db import AnalysisDb
+from perf_stats import format_ms, print_error_breakdown, print_table, summarize
+
 # Disable SSL warnings for local testing
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # API endpoints
 BASE_URL = "https://localhost:5001"
 ASYNC_ANALYZE_URL = f"{BASE_URL}/api/plantanalyses/analyze-async"
+IMAGE_API_URL = f"{BASE_URL}/api/v1/plantanalyses/{{id}}/image"
 
-# Database connection
-DB_CONFIG = {
-    "host": "localhost",
-    "database": "devarchitecture",
-    "user": "postgres",
-    "password": "Admin01!"
-}
+PROBE_CHUNK_SIZE = 64 * 1024
 
 # Test image - small base64 image
 test_image_base64 = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8DwHwAFBQIAX8jx0gAAAABJRU5ErkJggg=="
 test_image_data_uri = f"data:image/png;base64,{test_image_base64}"
 
+def storage_url(image_path):
+    """Direct URL of a stored image: ImagePath is either absolute (R2/S3) or relative to wwwroot"""
+    if image_path.startswith(("http://", "https://")):
+        return image_path
+    return f"{BASE_URL}/{image_path.replace(chr(92), '/').lstrip('/')}"
+
 def test_url_based_flow():
     print("=" * 60)
     print("URL-BASED ASYNC PLANT ANALYSIS TEST")
@@ -44,7 +51,7 @@ def test_url_based_flow():
         "fieldId": "FIELD-URL-001",
         "urgencyLevel": "High",
         "notes": "Testing URL-based flow for AI optimization",
-        "altitude": 120.5,
+        "altitude": 120,  # int? Altitude: System.Text.Json rejects a fraction
         "temperature": 25.5,
         "humidity": 65.0,
         "weatherConditions": "Sunny",
@@ -55,6 +62,7 @@ def test_url_based_flow():
         }
     }
     
+    db = None
     try:
         # Step 1: Submit async analysis request
         print("\n1. Submitting async analysis request...")
@@ -79,33 +87,22 @@ def test_url_based_flow():
             
         # Step 2: Check database for initial record and image URL
         print("\n2. Checking database for URL-based record...")
-        conn = psycopg2.connect(**DB_CONFIG)
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT 
-                "Id", "AnalysisId", "ImagePath", "ImageSizeKb",
-                "AnalysisStatus", "FarmerId", "UserId"
-            FROM "PlantAnalyses"
-            WHERE "AnalysisId" = %s
-        """
-        
-        cursor.execute(query, (analysis_id,))
-        row = cursor.fetchone()
+        db = AnalysisDb(max_connections=1)
+        row = db.get_details(analysis_id)
         
         if row:
             print("   ✓ Initial record found in database")
-            print(f"   Database ID: {row[0]}")
-            print(f"   Analysis ID: {row[1]}")
-            print(f"   Image Path: {row[2]}")
-            print(f"   Image Size KB: {row[3]}")
-            print(f"   Status: {row[4]}")
-            print(f"   Farmer ID: {row[5]}")
-            print(f"   User ID: {row[6]}")
+            print(f"   Database ID: {row.id}")
+            print(f"   Analysis ID: {row.analysis_id}")
+            print(f"   Image Path: {row.image_path}")
+            print(f"   Image Size KB: {row.image_size_kb}")
+            print(f"   Status: {row.status}")
+            print(f"   Farmer ID: {row.farmer_id}")
+            print(f"   User ID: {row.user_id}")
             
             # Generate expected URL
-            if row[2]:
-                image_url = f"{BASE_URL}/{row[2].replace(chr(92), '/')}"
+            if row.image_path:
+                image_url = storage_url(row.image_path)
                 print(f"\n   Generated Image URL: {image_url}")
                 
                 # Test if image is accessible
@@ -178,21 +175,15 @@ def test_url_based_flow():
         
         # Step 5: Verify update
         print("\n5. Waiting for worker to process...")
-        time.sleep(3)
+        db.poll_until_completed([analysis_id], timeout=30)
         
-        cursor.execute("""
-            SELECT "AnalysisStatus", "PlantSpecies", "OverallHealthScore"
-            FROM "PlantAnalyses"
-            WHERE "AnalysisId" = %s
-        """, (analysis_id,))
-        
-        final_row = cursor.fetchone()
+        final_row = db.get_details(analysis_id)
         if final_row:
-            print(f"   Final Status: {final_row[0]}")
-            print(f"   Plant Species: {final_row[1]}")
-            print(f"   Health Score: {final_row[2]}")
+            print(f"   Final Status: {final_row.status}")
+            print(f"   Plant Species: {final_row.plant_species}")
+            print(f"   Health Score: {final_row.overall_health_score}")
             
-            if final_row[0] == "Completed":
+            if final_row.status == "Completed":
                 print("\n   ✅ SUCCESS: URL-based flow completed!")
                 print("   Benefits achieved:")
                 print("   - Token reduction: 99.6% (400K → 1.5K)")
@@ -200,15 +191,165 @@ def test_url_based_flow():
                 print("   - Processing speed: 10x faster")
                 print("   - No token limit errors")
         
-        cursor.close()
-        conn.close()
-        
     except Exception as e:
         print(f"\n❌ ERROR: {str(e)}")
         import traceback
         traceback.print_exc()
+    finally:
+        if db:
+            db.close()
+
+class ImageProbeResult:
+    """Samples for one image source (api or direct)"""
+
+    def __init__(self, source):
+        self.source = source
+        self.ttfb = []
+        self.total = []
+        self.bytes = 0
+        self.errors = Counter()
+        self.headers = Counter()          # cache header name -> responses carrying it
+        self.cache_control = Counter()
+        self.revalidations = Counter()    # "etag"/"ims" sent, "etag_304"/"ims_304" honoured
+        self.revalidation_latencies = []
+        self.elapsed = 0.0
+        self.lock = threading.Lock()      # probes record from the worker threads
+
+def timed_get(session, url, headers, timeout):
+    """GET streaming the body; returns (response, time to first byte, total time, bytes)"""
+    started = time.perf_counter()
+    with session.get(url, headers=headers, stream=True, timeout=timeout, verify=False) as response:
+        # With stream=True get() returns once the status line and headers are in
+        ttfb = time.perf_counter() - started
+        size = 0
+        for chunk in response.iter_content(PROBE_CHUNK_SIZE):
+            size += len(chunk)
+        return response, ttfb, time.perf_counter() - started, size
+
+def probe_image(session, url, headers, result, timeout):
+    try:
+        response, ttfb, total, size = timed_get(session, url, headers, timeout)
+    except requests.RequestException as e:
+        with result.lock:
+            result.errors[type(e).__name__] += 1
+        return
+    if response.status_code != 200:
+        with result.lock:
+            result.errors[f"HTTP {response.status_code}"] += 1
+        return
+
+    with result.lock:
+        result.ttfb.append(ttfb)
+        result.total.append(total)
+        result.bytes += size
+        for name in ("Cache-Control", "ETag", "Last-Modified", "Expires"):
+            if name in response.headers:
+                result.headers[name] += 1
+        result.cache_control[response.headers.get("Cache-Control", "(none)")] += 1
+
+    # Re-request with the validators the server handed out; 304 means it honours them
+    conditions = []
+    if "ETag" in response.headers:
+        conditions.append(("etag", {"If-None-Match": response.headers["ETag"]}))
+    if "Last-Modified" in response.headers:
+        conditions.append(("ims", {"If-Modified-Since": response.headers["Last-Modified"]}))
+    for kind, condition in conditions:
+        try:
+            revalidated, _, total, _ = timed_get(session, url, {**headers, **condition}, timeout)
+        except requests.RequestException as e:
+            with result.lock:
+                result.revalidations[kind] += 1
+                result.errors[f"{kind}: {type(e).__name__}"] += 1
+            continue
+        with result.lock:
+            result.revalidations[kind] += 1
+            if revalidated.status_code == 304:
+                result.revalidations[f"{kind}_304"] += 1
+                result.revalidation_latencies.append(total)
+
+def run_image_probe(args):
+    print("=" * 60)
+    print("STORED IMAGE FETCH PROBE")
+    print("=" * 60)
+
+    with AnalysisDb(max_connections=1) as db:
+        images = db.recent_images(args.samples)
+    print(f"Sampled {len(images)} recent analyses with an image")
+    if not images:
+        return
+
+    sources = ["api", "direct"] if args.source == "both" else [args.source]
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=args.concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    results = []
+    for source in sources:
+        result = ImageProbeResult(source)
+        urls = [IMAGE_API_URL.format(id=image.id) if source == "api" else storage_url(image.image_path)
+                for image in images] * args.repeat
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(lambda url: probe_image(session, url, headers, result, args.timeout), urls))
+        result.elapsed = time.perf_counter() - started
+        print(f"   {source}: {len(result.total)}/{len(urls)} fetched in {result.elapsed:.1f} s")
+        results.append(result)
+
+    rows = []
+    for result in results:
+        ttfb = summarize(result.ttfb)
+        total = summarize(result.total)
+        fetched = len(result.total)
+        rows.append([result.source, fetched, sum(result.errors.values()),
+                     format_ms(ttfb["p50"]), format_ms(ttfb["p95"]),
+                     format_ms(total["p50"]), format_ms(total["p95"]),
+                     f"{result.bytes / fetched / 1024:.0f}" if fetched else "-",
+                     f"{result.bytes / 1024 / 1024 / result.elapsed:.1f}" if result.elapsed else "-"])
+    print_table(["Source", "OK", "Err", "TTFB p50", "TTFB p95", "Total p50", "Total p95", "Avg KB", "MB/s"],
+                rows, title="IMAGE FETCH LATENCY")
+
+    def honoured(result, kind):
+        sent = result.revalidations[kind]
+        return f"{result.revalidations[kind + '_304']}/{sent}" if sent else "no validator"
+
+    rows = []
+    for result in results:
+        fetched = len(result.total) or 1
+        rows.append([result.source,
+                     result.cache_control.most_common(1)[0][0] if result.cache_control else "-",
+                     f"{result.headers['ETag'] / fetched * 100:.0f}%",
+                     f"{result.headers['Last-Modified'] / fetched * 100:.0f}%",
+                     honoured(result, "etag"), honoured(result, "ims"),
+                     format_ms(summarize(result.revalidation_latencies)["p50"])])
+    print_table(["Source", "Cache-Control", "ETag", "Last-Modified", "If-None-Match 304", "If-Modified-Since 304",
+                 "304 p50"], rows, title="CACHE HEADERS / CONDITIONAL GET")
+
+    errors = Counter()
+    for result in results:
+        errors.update({f"{result.source} {kind}": count for kind, count in result.errors.items()})
+    print_error_breakdown(errors, len(images) * args.repeat * len(results))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="URL-based async analysis flow test / stored image fetch probe")
+    parser.add_argument("--probe", action="store_true",
+                        help="Fetch images of recent analyses instead of running the flow test")
+    parser.add_argument("--source", choices=["api", "direct", "both"], default="both",
+                        help="Fetch through /plantanalyses/{id}/image, the storage URL in ImagePath, or both")
+    parser.add_argument("--samples", type=int, default=50, help="Recent analyses to sample")
+    parser.add_argument("--repeat", type=int, default=1, help="Fetches per image")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent fetches")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--token", default=None, help="Bearer token sent with every fetch")
+    return parser.parse_args()
 
 if __name__ == "__main__":
+    args = parse_args()
+    if args.probe:
+        run_image_probe(args)
+        raise SystemExit(0)
+
     test_url_based_flow()
     
     print("\n" + "=" * 60)
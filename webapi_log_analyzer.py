@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Summarize rotated Serilog text logs from WebAPIlogs in one streaming pass
+
+Each entry starts with '2025-09-30 12:15:07.161 +03:00 [Error] ' followed by
+the message, which for errors is a JSON payload with ExceptionMessage and
+MethodName. Files (plain or .gz) are read line by line and only the timestamp
+minute, level, MethodName, the request Type and the first line of
+ExceptionMessage are extracted - the Parameters payload is never decoded - so
+memory grows with the number of distinct minutes and methods, not with the
+size of the logs. Files are processed in parallel and their summaries merged.
+
+Reports error rates, the top failing methods and exceptions, and the minutes
+with bursts of transient failures (connection drops, timeouts, retries
+exhausted).
+
+Examples:
+    python webapi_log_analyzer.py
+    python webapi_log_analyzer.py /var/log/ziraai/*.txt.gz --top 20 --burst-threshold 5
+    python webapi_log_analyzer.py WebAPIlogs/prod --json summary.json
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+from fix_tracking import REPO_ROOT
+from perf_stats import print_table
+
+DEFAULT_LOG_DIRECTORY = os.path.join(REPO_ROOT, 'WebAPIlogs', 'dev')
+LOG_PATTERNS = ('*.txt', '*.txt.gz', '*.log', '*.log.gz')
+
+# '2025-09-30 12:15:07.161 +03:00 [Error] {...}'; group 1 is the minute
+ENTRY = re.compile(rb'^(\d{4}-\d\d-\d\d \d\d:\d\d):\d\d(?:\.\d+)? [+-]\d\d:\d\d \[(\w+)\] ')
+EXCEPTION_MESSAGE = re.compile(rb'"ExceptionMessage":"([^"\\]*(?:\\.[^"\\]*)*)"')
+METHOD_NAME = re.compile(rb'"MethodName":"([^"]*)"')
+REQUEST_TYPE = re.compile(rb'"Type":"([^"]*)"')
+# '[OPERATION_ERROR] {"Operation":"X.Handle","Exception":{"Type":"...","Message":"..."}}' from the logging aspect
+OPERATION_ERROR = b'[OPERATION_ERROR] '
+OPERATION = re.compile(rb'"Operation":"([^"]*)"')
+OPERATION_EXCEPTION = re.compile(rb'"Exception":\{"Type":"([^"]*)","Message":"([^"\\]*(?:\\.[^"\\]*)*)"')
+
+ERROR_LEVELS = frozenset(('Error', 'Fatal'))
+
+# Exception messages that point at a dependency hiccup rather than a bug
+TRANSIENT_MARKERS = (
+    'transient failure',
+    'timeout',
+    'timed out',
+    'connection refused',
+    'connection reset',
+    'broken pipe',
+    'too many clients',
+    '53300',  # postgres too_many_connections
+    '57P01',  # postgres admin_shutdown
+    '08006',  # postgres connection_failure
+    'BrokerUnreachable',
+    'AlreadyClosed',
+)
+EXCEPTION_KEY_LENGTH = 120
+
+
+@lru_cache(maxsize=4096)  # exception keys repeat heavily
+def is_transient(message):
+    lowered = message.lower()
+    return any(marker.lower() in lowered for marker in TRANSIENT_MARKERS)
+
+
+def exception_key(raw):
+    """First line of an escaped ExceptionMessage, trimmed to a groupable key"""
+    text = raw.decode('utf-8', 'replace').split('\\r\\n', 1)[0].split('\\n', 1)[0]
+    text = text.replace('\\"', '"').replace('\\\\', '\\')
+    return text[:EXCEPTION_KEY_LENGTH]
+
+
+class LogSummary:
+    """Counters for one or more log files; summaries of separate files merge losslessly"""
+
+    def __init__(self):
+        self.files = 0
+        self.lines = 0
+        self.entries = 0
+        self.levels = Counter()
+        self.errors_by_method = Counter()
+        self.errors_by_exception = Counter()
+        self.entries_per_minute = Counter()
+        self.errors_per_minute = Counter()
+        self.transient_per_minute = Counter()
+        self.transient_errors = 0
+        self.first_minute = None
+        self.last_minute = None
+
+    def merge(self, other):
+        self.files += other.files
+        self.lines += other.lines
+        self.entries += other.entries
+        self.transient_errors += other.transient_errors
+        for name in ('levels', 'errors_by_method', 'errors_by_exception', 'entries_per_minute',
+                     'errors_per_minute', 'transient_per_minute'):
+            getattr(self, name).update(getattr(other, name))
+        minutes = [m for m in (self.first_minute, other.first_minute, self.last_minute, other.last_minute) if m]
+        if minutes:
+            self.first_minute, self.last_minute = min(minutes), max(minutes)
+        return self
+
+    def add_error(self, minute, payload):
+        if payload.startswith(OPERATION_ERROR):
+            operation = OPERATION.search(payload)
+            exception = OPERATION_EXCEPTION.search(payload)
+            self.count_error(minute,
+                             operation.group(1).decode('utf-8', 'replace') if operation else '(unknown)',
+                             f"{exception.group(1).decode('utf-8', 'replace')}: {exception_key(exception.group(2))}"
+                             if exception else '(no Exception)')
+            return
+
+        method = METHOD_NAME.search(payload)
+        method = method.group(1).decode('utf-8', 'replace') if method else '(unknown)'
+        # MethodName is almost always Handle; the request type names the actual command/query
+        request_type = REQUEST_TYPE.search(payload)
+        if request_type:
+            method = f"{method} ({request_type.group(1).decode('utf-8', 'replace')})"
+        message = EXCEPTION_MESSAGE.search(payload)
+        self.count_error(minute, method, exception_key(message.group(1)) if message else '(no ExceptionMessage)')
+
+    def count_error(self, minute, method, key):
+        self.errors_by_method[method] += 1
+        self.errors_by_exception[key] += 1
+        self.errors_per_minute[minute] += 1
+        if is_transient(key):
+            self.transient_errors += 1
+            self.transient_per_minute[minute] += 1
+
+
+def open_log(path):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+def summarize_file(path):
+    """One streaming pass over a log file; runs in a worker process"""
+    summary = LogSummary()
+    summary.files = 1
+    with open_log(path) as f:
+        for line in f:
+            summary.lines += 1
+            match = ENTRY.match(line)
+            if not match:
+                continue  # blank separator or continuation line
+            minute = match.group(1).decode('ascii')
+            level = match.group(2).decode('ascii')
+            summary.entries += 1
+            summary.levels[level] += 1
+            summary.entries_per_minute[minute] += 1
+            if level in ERROR_LEVELS:
+                summary.add_error(minute, line[match.end():])
+
+    if summary.entries_per_minute:
+        summary.first_minute = min(summary.entries_per_minute)
+        summary.last_minute = max(summary.entries_per_minute)
+    return summary
+
+
+def collect_files(paths):
+    """Expand directories to their (rotated, optionally gzipped) log files, in name order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for pattern in LOG_PATTERNS:
+                files.extend(glob.glob(os.path.join(path, pattern)))
+        else:
+            files.extend(glob.glob(path) or [path])
+    return sorted(set(files))
+
+
+def summarize_files(files, jobs=None):
+    total = LogSummary()
+    if jobs == 1 or len(files) < 2:
+        for path in files:
+            total.merge(summarize_file(path))
+        return total
+
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for summary in pool.map(summarize_file, files, chunksize=max(1, len(files) // (jobs * 4))):
+            total.merge(summary)
+    return total
+
+
+def burst_windows(transient_per_minute, threshold):
+    """Merge consecutive minutes at or above the threshold into (first, last, errors) windows"""
+    windows = []
+    for minute in sorted(m for m, count in transient_per_minute.items() if count >= threshold):
+        count = transient_per_minute[minute]
+        if windows and minutes_apart(windows[-1][1], minute) <= 1:
+            first, _, total = windows[-1]
+            windows[-1] = (first, minute, total + count)
+        else:
+            windows.append((minute, minute, count))
+    return windows
+
+
+def minutes_apart(earlier, later):
+    # 'YYYY-MM-DD HH:MM' keys; only same-day neighbours need to merge
+    if earlier[:10] != later[:10]:
+        return 2
+    return (int(later[11:13]) * 60 + int(later[14:16])) - (int(earlier[11:13]) * 60 + int(earlier[14:16]))
+
+
+def print_summary(summary, top, burst_threshold):
+    errors = sum(summary.levels[level] for level in ERROR_LEVELS)
+    print(f"\nFiles: {summary.files}, lines: {summary.lines}, entries: {summary.entries}")
+    if summary.first_minute:
+        print(f"Span: {summary.first_minute} - {summary.last_minute}")
+    if summary.entries:
+        print(f"Error rate: {errors}/{summary.entries} entries ({errors / summary.entries * 100:.1f}%), "
+              f"{summary.transient_errors} transient")
+
+    print_table(['Level', 'Entries', 'Share'],
+                [[level, count, f"{count / summary.entries * 100:.1f}%"]
+                 for level, count in summary.levels.most_common()], title='LEVELS')
+    print_table(['Method (request type)', 'Errors'], summary.errors_by_method.most_common(top),
+                title=f"TOP {top} FAILING METHODS")
+    print_table(['Exception', 'Errors'], summary.errors_by_exception.most_common(top),
+                title=f"TOP {top} EXCEPTIONS")
+
+    windows = burst_windows(summary.transient_per_minute, burst_threshold)
+    rows = [[first if first == last else f"{first} - {last[11:]}", total,
+             sum(count for minute, count in summary.errors_per_minute.items() if first <= minute <= last)]
+            for first, last, total in sorted(windows, key=lambda window: window[2], reverse=True)[:top]]
+    print_table(['Window', 'Transient errors', 'All errors'], rows,
+                title=f"TRANSIENT FAILURE BURSTS (>= {burst_threshold}/min)")
+
+
+def to_dict(summary, top, burst_threshold):
+    return {
+        'files': summary.files,
+        'lines': summary.lines,
+        'entries': summary.entries,
+        'first_minute': summary.first_minute,
+        'last_minute': summary.last_minute,
+        'levels': dict(summary.levels),
+        'transient_errors': summary.transient_errors,
+        'top_methods': summary.errors_by_method.most_common(top),
+        'top_exceptions': summary.errors_by_exception.most_common(top),
+        'errors_per_minute': dict(sorted(summary.errors_per_minute.items())),
+        'bursts': [{'first': first, 'last': last, 'transient_errors': total}
+                   for first, last, total in burst_windows(summary.transient_per_minute, burst_threshold)],
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Streaming summary of WebAPI Serilog text logs')
+    parser.add_argument('paths', nargs='*', default=[DEFAULT_LOG_DIRECTORY],
+                        help='Log files, globs or directories (default: WebAPIlogs/dev)')
+    parser.add_argument('--top', type=int, default=10, help='Rows in the top-N tables')
+    parser.add_argument('--burst-threshold', type=int, default=3,
+                        help='Transient errors per minute that count as a burst')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--json', default=None, help='Also write the summary as JSON to this file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    files = collect_files(args.paths)
+    if not files:
+        raise SystemExit(f"No log files found in {', '.join(args.paths)}")
+
+    summary = summarize_files(files, args.jobs)
+    print_summary(summary, args.top, args.burst_threshold)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(to_dict(summary, args.top, args.burst_threshold), f, indent=2)
+        print(f"\n✓ Summary written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()